@@ -0,0 +1,292 @@
+import copy
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+from models.game import Game, TeamStats
+from data.nfl_data import get_team_by_abbreviation
+from data.game_history import (
+    GameHistoryEntry, GameHistoryStore, HeadToHeadRecord, get_game_history_store, _pair_key
+)
+from data.stats_aggregator import TeamStatsAggregator
+from prompts.prompt_generator import MatchupContext
+from agents.prediction_agent import PredictionAgent
+
+# Lower bound of each confidence bucket; predictions are clamped to 55-95
+CONFIDENCE_BUCKETS = (55, 60, 70, 80, 90)
+
+@dataclass
+class BacktestMetrics:
+    """Running totals for a set of scored predictions"""
+    games: int = 0
+    decided: int = 0  # games that did not end in a tie
+    correct: int = 0
+    brier_total: float = 0.0
+    spread_error_total: float = 0.0
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.decided if self.decided else 0.0
+
+    @property
+    def brier_score(self) -> float:
+        return self.brier_total / self.games if self.games else 0.0
+
+    @property
+    def spread_mae(self) -> float:
+        return self.spread_error_total / self.games if self.games else 0.0
+
+    def add(self, other: 'BacktestMetrics'):
+        """Fold another set of totals into this one"""
+        self.games += other.games
+        self.decided += other.decided
+        self.correct += other.correct
+        self.brier_total += other.brier_total
+        self.spread_error_total += other.spread_error_total
+
+@dataclass
+class SeasonBacktest:
+    season: int
+    overall: BacktestMetrics
+    buckets: Dict[int, BacktestMetrics]  # keyed by bucket lower bound
+
+@dataclass
+class BacktestReport:
+    seasons: List[SeasonBacktest]
+    overall: BacktestMetrics = field(default_factory=BacktestMetrics)
+    buckets: Dict[int, BacktestMetrics] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        """Format overall, per-bucket and per-season results as tables"""
+        header = f"{'':<10} {'Games':>6} {'Acc%':>6} {'Brier':>7} {'MAE':>6}"
+
+        def row(label: str, metrics: BacktestMetrics) -> str:
+            return (f"{label:<10} {metrics.games:>6} {metrics.accuracy * 100:>6.1f} "
+                    f"{metrics.brier_score:>7.4f} {metrics.spread_mae:>6.2f}")
+
+        lines = [f"📊 Backtest over {len(self.seasons)} seasons", header, row('Overall', self.overall), '',
+                 'By confidence', header]
+        for lower in CONFIDENCE_BUCKETS:
+            if lower in self.buckets:
+                upper = _bucket_upper(lower)
+                lines.append(row(f"{lower}-{upper}%", self.buckets[lower]))
+        lines += ['', 'By season', header]
+        lines += [row(str(season.season), season.overall) for season in self.seasons]
+        return '\n'.join(lines)
+
+def _bucket_upper(lower: int) -> int:
+    index = CONFIDENCE_BUCKETS.index(lower)
+    return CONFIDENCE_BUCKETS[index + 1] if index + 1 < len(CONFIDENCE_BUCKETS) else 100
+
+def confidence_bucket(confidence: float) -> int:
+    """Lower bound of the bucket a confidence falls in"""
+    bucket = CONFIDENCE_BUCKETS[0]
+    for lower in CONFIDENCE_BUCKETS:
+        if confidence >= lower:
+            bucket = lower
+    return bucket
+
+# Per pair (ordered by _pair_key): first team wins, second team wins, ties,
+# first team points, second team points, last meeting
+_PairTally = Tuple[int, int, int, int, int, Optional[GameHistoryEntry]]
+
+def _tally_game(tallies: Dict[Tuple[str, str], _PairTally], game: GameHistoryEntry):
+    key = _pair_key(game.home_team, game.away_team)
+    first_wins, second_wins, ties, first_points, second_points, _ = tallies.get(key, (0, 0, 0, 0, 0, None))
+    if key[0] == game.home_team:
+        first_score, second_score = game.home_score, game.away_score
+    else:
+        first_score, second_score = game.away_score, game.home_score
+    tallies[key] = (
+        first_wins + (first_score > second_score),
+        second_wins + (first_score < second_score),
+        ties + (first_score == second_score),
+        first_points + first_score,
+        second_points + second_score,
+        game
+    )
+
+def _head_to_head(team1: str, team2: str, tally: Optional[_PairTally]) -> HeadToHeadRecord:
+    """Head-to-head record from a tally, matching summarize_head_to_head"""
+    if tally is None or tally[5] is None:
+        return HeadToHeadRecord(team1, team2, 0, 0, 0,
+                                GameHistoryEntry('1970-01-01', team1, team2, 0, 0, 1, 1970, False), 20.0, 20.0)
+    first_wins, second_wins, ties, first_points, second_points, last_meeting = tally
+    played = first_wins + second_wins + ties
+    if _pair_key(team1, team2)[0] != team1:
+        first_wins, second_wins, first_points, second_points = second_wins, first_wins, second_points, first_points
+    return HeadToHeadRecord(team1, team2, first_wins, second_wins, ties, last_meeting,
+                            first_points / played, second_points / played)
+
+def _to_game(entry: GameHistoryEntry, with_score: bool) -> Game:
+    return Game(
+        home_team=entry.home_team,
+        away_team=entry.away_team,
+        date=datetime.strptime(entry.date, '%Y-%m-%d'),
+        home_score=entry.home_score if with_score else 0,
+        away_score=entry.away_score if with_score else 0,
+        week=entry.week,
+        season=entry.season,
+        is_playoffs=entry.is_playoffs,
+        weather=entry.weather
+    )
+
+def _score_prediction(metrics: BacktestMetrics, entry: GameHistoryEntry, predicted_home_win: bool,
+                      confidence: float, predicted_margin: int):
+    actual_margin = entry.home_score - entry.away_score
+    home_probability = confidence / 100 if predicted_home_win else 1 - confidence / 100
+    outcome = 1.0 if actual_margin > 0 else 0.0 if actual_margin < 0 else 0.5
+
+    metrics.games += 1
+    metrics.brier_total += (home_probability - outcome) ** 2
+    metrics.spread_error_total += abs(predicted_margin - actual_margin)
+    if actual_margin != 0:
+        metrics.decided += 1
+        metrics.correct += predicted_home_win == (actual_margin > 0)
+
+def _backtest_season(agent: PredictionAgent, season: int, games: List[GameHistoryEntry],
+                     tallies: Dict[Tuple[str, str], _PairTally],
+                     prior_stats: Dict[str, TeamStats]) -> SeasonBacktest:
+    """Replay one season day by day, predicting each game from results before its date"""
+    aggregator = TeamStatsAggregator()
+    overall = BacktestMetrics()
+    buckets: Dict[int, BacktestMetrics] = {}
+
+    def stats_for(team: str) -> TeamStats:
+        # Until a team has played this season, fall back to last season's final stats
+        stats = aggregator.get_team_stats(team)
+        if stats is None:
+            stats = prior_stats.get(team) or aggregator.stats_for(team)
+        return stats
+
+    for _, day in groupby(games, key=lambda entry: entry.date):
+        day = list(day)
+        for entry in day:
+            game = _to_game(entry, with_score=False)
+            context = MatchupContext(
+                home_team=get_team_by_abbreviation(entry.home_team),
+                away_team=get_team_by_abbreviation(entry.away_team),
+                home_stats=stats_for(entry.home_team),
+                away_stats=stats_for(entry.away_team),
+                head_to_head=_head_to_head(entry.home_team, entry.away_team,
+                                           tallies.get(_pair_key(entry.home_team, entry.away_team))),
+                home_recent_form='',
+                away_recent_form='',
+                weather=entry.weather,
+                week=entry.week,
+                season=entry.season,
+                is_playoffs=entry.is_playoffs
+            )
+            prediction = agent.generate_prediction(game, context)
+            predicted_margin = prediction.predicted_score['home'] - prediction.predicted_score['away']
+            bucket = buckets.setdefault(confidence_bucket(prediction.confidence), BacktestMetrics())
+            for metrics in (overall, bucket):
+                _score_prediction(metrics, entry, prediction.predicted_winner == entry.home_team,
+                                  prediction.confidence, predicted_margin)
+
+        # Results only become visible once every game on the date has been predicted
+        for entry in day:
+            _tally_game(tallies, entry)
+            game = _to_game(entry, with_score=True)
+            if game.is_completed():
+                aggregator.ingest(game)
+
+    return SeasonBacktest(season, overall, buckets)
+
+def _final_stats(games: List[GameHistoryEntry]) -> Dict[str, TeamStats]:
+    aggregator = TeamStatsAggregator()
+    for entry in games:
+        game = _to_game(entry, with_score=True)
+        if game.is_completed():
+            aggregator.ingest(game)
+    return aggregator.team_stats
+
+def _season_jobs(store: GameHistoryStore, seasons: List[int]):
+    """Stream (season, games, head-to-head tallies, prior stats) for each season in order"""
+    tallies: Dict[Tuple[str, str], _PairTally] = {}
+    prior_stats: Dict[str, TeamStats] = {}
+    for season in seasons:
+        games = store.get_season_games(season)
+        # Only the tallies for pairs meeting this season are shipped to the worker
+        pairs = {_pair_key(entry.home_team, entry.away_team) for entry in games}
+        yield season, games, {key: tallies[key] for key in pairs if key in tallies}, prior_stats
+        for entry in games:
+            _tally_game(tallies, entry)
+        prior_stats = _final_stats(games)
+
+def _prediction_only(agent: PredictionAgent) -> PredictionAgent:
+    """Copy of the agent without its LLM dispatcher, which backtests never call and can't be pickled"""
+    if getattr(agent, 'llm_dispatcher', None) is None:
+        return agent
+    agent = copy.copy(agent)
+    agent.llm_dispatcher = None
+    return agent
+
+def _picklable(agent: PredictionAgent) -> bool:
+    try:
+        pickle.dumps(agent)
+    except Exception as e:
+        print(f"⚠️  {type(agent).__name__} can't be sent to worker processes ({e}); backtesting in one process")
+        return False
+    return True
+
+# The agent a pool worker predicts with; shipped once per worker rather than per season
+_worker_agent: Optional[PredictionAgent] = None
+
+def _init_worker(agent: PredictionAgent):
+    global _worker_agent
+    _worker_agent = agent
+
+def _backtest_season_in_worker(season: int, games: List[GameHistoryEntry],
+                               tallies: Dict[Tuple[str, str], _PairTally],
+                               prior_stats: Dict[str, TeamStats]) -> SeasonBacktest:
+    return _backtest_season(_worker_agent, season, games, tallies, prior_stats)
+
+def run_backtest(agent: Optional[PredictionAgent] = None, store: Optional[GameHistoryStore] = None,
+                 seasons: Optional[List[int]] = None, workers: Optional[int] = None) -> BacktestReport:
+    """Replay history in date order and score the agent's point-in-time predictions.
+
+    Each game is predicted from season stats and head-to-head records built
+    only from games played before its date; teams that have not played yet
+    this season use last season's final stats. Seasons are streamed from
+    `store` (any object with get_seasons/get_season_games, e.g. a
+    HistoryArchive) and replayed on a process pool of `workers` (default:
+    CPU count). Each worker gets one copy of `agent` - for example a
+    subclass with changed weights - without its LLM dispatcher; an agent
+    that still can't be pickled is replayed in this process instead.
+    """
+    agent = _prediction_only(agent or PredictionAgent())
+    store = store or get_game_history_store()
+    seasons = sorted(seasons) if seasons is not None else store.get_seasons()
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers > 1 and not _picklable(agent):
+        workers = 1
+
+    report = BacktestReport(seasons=[])
+
+    def collect(result: SeasonBacktest):
+        report.seasons.append(result)
+        report.overall.add(result.overall)
+        for lower, metrics in result.buckets.items():
+            report.buckets.setdefault(lower, BacktestMetrics()).add(metrics)
+
+    if workers == 1:
+        for job in _season_jobs(store, seasons):
+            collect(_backtest_season(agent, *job))
+        return report
+
+    # At most two seasons per worker are in flight, bounding memory to a few seasons
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(agent,)) as pool:
+        pending = deque()
+        for job in _season_jobs(store, seasons):
+            pending.append(pool.submit(_backtest_season_in_worker, *job))
+            while len(pending) >= workers * 2:
+                collect(pending.popleft().result())
+        while pending:
+            collect(pending.popleft().result())
+
+    return report
@@ -0,0 +1,184 @@
+from typing import List, Dict, Tuple, TYPE_CHECKING
+from dataclasses import dataclass
+import numpy as np
+from models.game import Game, GamePrediction, TeamStats
+from models.compact import home_wins, recent_wins
+from data.nfl_data import get_team_stats, get_team_by_abbreviation
+from data.game_history import get_head_to_head_record
+
+if TYPE_CHECKING:
+    from agents.prediction_agent import PredictionAgent
+
+@dataclass
+class FactorArrays:
+    """The eight PredictionFactors components for a batch of games, one array each"""
+    home_field_advantage: np.ndarray
+    recent_form: np.ndarray
+    head_to_head_history: np.ndarray
+    offensive_strength: np.ndarray
+    defensive_strength: np.ndarray
+    injuries: np.ndarray
+    weather: np.ndarray
+    motivation: np.ndarray
+
+@dataclass
+class SlateInputs:
+    """Per-game model inputs gathered once per distinct team and matchup"""
+    home_stats: List[TeamStats]
+    away_stats: List[TeamStats]
+    home_points_for: np.ndarray
+    home_points_against: np.ndarray
+    away_points_for: np.ndarray
+    away_points_against: np.ndarray
+    home_home_wins: np.ndarray
+    home_form_wins: np.ndarray
+    away_form_wins: np.ndarray
+    home_injuries: np.ndarray
+    away_injuries: np.ndarray
+    h2h_win_diff: np.ndarray
+    h2h_games: np.ndarray
+    strong_home: np.ndarray
+    division_game: np.ndarray
+    is_playoffs: np.ndarray
+    has_weather: np.ndarray
+    temperature: np.ndarray
+    wind_speed: np.ndarray
+    precipitation: np.ndarray
+
+def gather_slate_inputs(agent: 'PredictionAgent', games: List[Game]) -> SlateInputs:
+    """Resolve stats, head-to-head records and team info once per team/matchup"""
+    team_stats: Dict[str, TeamStats] = {}
+    divisions: Dict[str, Tuple[str, str]] = {}
+    h2h: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    for game in games:
+        for team in (game.home_team, game.away_team):
+            if team not in team_stats:
+                team_stats[team] = get_team_stats(team)
+                team_obj = get_team_by_abbreviation(team)
+                if team_obj:
+                    divisions[team] = (team_obj.conference, team_obj.division)
+        matchup = (game.home_team, game.away_team)
+        if matchup not in h2h:
+            record = get_head_to_head_record(game.home_team, game.away_team)
+            h2h[matchup] = (record.team1_wins - record.team2_wins,
+                            record.team1_wins + record.team2_wins + record.ties)
+
+    def column(values, dtype=np.float64) -> np.ndarray:
+        return np.fromiter(values, dtype=dtype, count=len(games))
+
+    home = [team_stats[game.home_team] for game in games]
+    away = [team_stats[game.away_team] for game in games]
+    strong_home_stadiums = set(agent.STRONG_HOME_STADIUMS)
+
+    return SlateInputs(
+        home_stats=home,
+        away_stats=away,
+        home_points_for=column(stats.avg_points_for for stats in home),
+        home_points_against=column(stats.avg_points_against for stats in home),
+        away_points_for=column(stats.avg_points_for for stats in away),
+        away_points_against=column(stats.avg_points_against for stats in away),
+        home_home_wins=column((home_wins(stats) for stats in home), np.int64),
+        home_form_wins=column((recent_wins(stats) for stats in home), np.int64),
+        away_form_wins=column((recent_wins(stats) for stats in away), np.int64),
+        home_injuries=column((len(stats.injuries) for stats in home), np.int64),
+        away_injuries=column((len(stats.injuries) for stats in away), np.int64),
+        h2h_win_diff=column((h2h[(game.home_team, game.away_team)][0] for game in games), np.int64),
+        h2h_games=column((h2h[(game.home_team, game.away_team)][1] for game in games), np.int64),
+        strong_home=column((game.home_team in strong_home_stadiums for game in games), np.bool_),
+        division_game=column((
+            game.home_team in divisions and divisions.get(game.home_team) == divisions.get(game.away_team)
+            for game in games
+        ), np.bool_),
+        is_playoffs=column((bool(game.is_playoffs) for game in games), np.bool_),
+        has_weather=column((bool(game.weather) for game in games), np.bool_),
+        temperature=column(game.weather.temperature if game.weather else np.nan for game in games),
+        wind_speed=column(game.weather.wind_speed if game.weather else np.nan for game in games),
+        precipitation=column(game.weather.precipitation if game.weather else np.nan for game in games)
+    )
+
+def calculate_factor_arrays(agent: 'PredictionAgent', inputs: SlateInputs) -> FactorArrays:
+    """Vectorized equivalents of the PredictionAgent._calculate_* methods"""
+    home_field = (agent.HOME_FIELD_ADVANTAGE
+                  + np.where(inputs.strong_home, 1.5, 0.0)
+                  - np.where(inputs.home_home_wins < 3, 1.0, 0.0))
+
+    h2h = np.zeros(len(inputs.h2h_games))
+    played = inputs.h2h_games > 0
+    h2h[played] = (inputs.h2h_win_diff[played] / inputs.h2h_games[played]) * 2.0
+
+    # NaN comparisons are False, so games without weather get no adjustment
+    with np.errstate(invalid='ignore'):
+        temperature, wind, precipitation = inputs.temperature, inputs.wind_speed, inputs.precipitation
+        weather = -(np.where(temperature < 32, 2.0, np.where(temperature < 45, 1.0, 0.0))
+                    + np.where(wind > 20, 2.0, np.where(wind > 15, 1.0, 0.0))
+                    + np.where(precipitation > 50, 1.5, 0.0))
+    weather = np.where(inputs.has_weather, weather, 0.0)
+
+    return FactorArrays(
+        home_field_advantage=home_field,
+        recent_form=(inputs.home_form_wins - inputs.away_form_wins) * 1.5,
+        head_to_head_history=h2h,
+        offensive_strength=(inputs.home_points_for - inputs.away_points_for) * 0.3,
+        defensive_strength=(inputs.away_points_against - inputs.home_points_against) * 0.3,
+        injuries=inputs.home_injuries * -0.5 + inputs.away_injuries * 0.5,
+        weather=weather,
+        motivation=np.where(inputs.is_playoffs, 2.0, 0.0) + np.where(inputs.division_game, 1.5, 0.0)
+    )
+
+def calculate_expected_scores(inputs: SlateInputs, factors: FactorArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """Expected home and away scores, applying factors in the same order as _calculate_prediction"""
+    home = (inputs.home_points_for + (35 - inputs.away_points_against)) / 2
+    away = (inputs.away_points_for + (35 - inputs.home_points_against)) / 2
+
+    home = home + factors.home_field_advantage
+    for factor in (factors.recent_form, factors.head_to_head_history,
+                   factors.offensive_strength, factors.defensive_strength):
+        home = home + np.maximum(0, factor)
+        away = away + np.maximum(0, -factor)
+
+    home = home + factors.weather / 2
+    away = away + factors.weather / 2
+
+    home = home + np.maximum(0, factors.injuries)
+    away = away + np.maximum(0, -factors.injuries)
+    return home, away
+
+def predict_games(agent: 'PredictionAgent', games: List[Game]) -> List[GamePrediction]:
+    """Predict a batch of games with the same model as PredictionAgent.generate_prediction"""
+    from agents.prediction_agent import PredictionFactors
+
+    if not games:
+        return []
+
+    inputs = gather_slate_inputs(agent, games)
+    factors = calculate_factor_arrays(agent, inputs)
+    home_expected, away_expected = calculate_expected_scores(inputs, factors)
+
+    home_scores = np.rint(np.clip(home_expected, 7, 50)).astype(np.int64)
+    away_scores = np.rint(np.clip(away_expected, 7, 50)).astype(np.int64)
+    confidences = np.clip(60 + np.abs(home_scores - away_scores) * 2, 55, 95)
+
+    predictions = []
+    for i, game in enumerate(games):
+        game_factors = PredictionFactors(
+            home_field_advantage=float(factors.home_field_advantage[i]),
+            recent_form=float(factors.recent_form[i]),
+            head_to_head_history=float(factors.head_to_head_history[i]),
+            offensive_strength=float(factors.offensive_strength[i]),
+            defensive_strength=float(factors.defensive_strength[i]),
+            injuries=float(factors.injuries[i]),
+            weather=float(factors.weather[i]),
+            motivation=float(factors.motivation[i])
+        )
+        home_score = int(home_scores[i])
+        away_score = int(away_scores[i])
+        predictions.append(GamePrediction(
+            predicted_winner=game.home_team if home_score > away_score else game.away_team,
+            confidence=int(confidences[i]),
+            predicted_score={"home": home_score, "away": away_score},
+            key_factors=agent._generate_key_factors(game_factors, inputs.home_stats[i], inputs.away_stats[i]),
+            reasoning=agent._generate_reasoning(game, game_factors, home_score, away_score)
+        ))
+
+    return predictions
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from utils import metrics
+
+DEFAULT_CACHE_DIR = os.environ.get('NFL_LLM_CACHE_DIR', os.path.join('.cache', 'llm'))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def completion_key(model: str, params: Dict[str, Any], messages: Any) -> str:
+    """Content address of a completion request: model, sampling parameters and messages"""
+    canonical = json.dumps({'model': model, 'params': params, 'messages': messages},
+                           sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class LLMResponseCache:
+    """Persistent content-addressed cache of LLM completions.
+
+    Each response is stored as a file named by the hash of its request
+    and mirrored in an in-memory LRU, so repeated prompts are answered
+    from memory without touching disk or the API. When the files exceed
+    `max_bytes`, the least recently used are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_memory_entries: int = 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_entries = max_memory_entries
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._index: Optional['OrderedDict[str, int]'] = None  # key -> file size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        """Scan the cache directory once, ordering entries by last use (lock held)"""
+        if self._index is not None:
+            return
+        entries = []
+        if self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.json'):
+                        try:
+                            stat = os.stat(os.path.join(root, name))
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def _remember(self, key: str, content: str):
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached completion, or None"""
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                if self._index is not None and key in self._index:
+                    self._index.move_to_end(key)
+                self.hits += 1
+                metrics.count('cache_requests_total', cache='llm', result='hit')
+                return content
+        if not self.directory:
+            with self._lock:
+                self.misses += 1
+            metrics.count('cache_requests_total', cache='llm', result='miss')
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = json.load(f)['content']
+            os.utime(path)  # mtime doubles as last-use time for eviction
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            metrics.count('cache_requests_total', cache='llm', result='miss')
+            return None
+
+        metrics.count('cache_requests_total', cache='llm', result='hit')
+        with self._lock:
+            self.hits += 1
+            self._remember(key, content)
+            if self._index is not None and key in self._index:
+                self._index.move_to_end(key)
+        return content
+
+    def put(self, key: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store a completion, evicting least recently used entries past max_bytes"""
+        with self._lock:
+            self._remember(key, content)
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        payload = json.dumps({'content': content, 'stored_at': time.time(), **(metadata or {})}).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write LLM cache entry: {e}")
+            return
+
+        with self._lock:
+            self._load_index()
+            self._total_bytes += len(payload) - self._index.pop(key, 0)
+            self._index[key] = len(payload)
+            evicted = self._evict()
+        for evicted_key in evicted:
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def _evict(self) -> Tuple[str, ...]:
+        """Drop least recently used entries until under max_bytes (lock held)"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._memory.pop(key, None)
+            evicted.append(key)
+        return tuple(evicted)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total_bytes
+
+    def clear(self, remove_files: bool = False):
+        """Drop in-memory entries, and optionally the on-disk cache"""
+        with self._lock:
+            self._memory.clear()
+            self._index = None
+        if remove_files and self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.json'):
+                        os.remove(os.path.join(root, name))
+
+_default_cache: Optional[LLMResponseCache] = None
+
+def get_llm_cache() -> LLMResponseCache:
+    """Shared completion cache used by PredictionAgent"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMResponseCache()
+    return _default_cache
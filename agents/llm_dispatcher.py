@@ -0,0 +1,180 @@
+import asyncio
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+from agents.llm_cache import LLMResponseCache, completion_key
+from utils import metrics
+
+DEFAULT_MODEL = "gpt-4"
+SYSTEM_PROMPT = ("You are an expert NFL analyst with deep knowledge of team statistics, player performance, "
+                 "and game dynamics. Provide detailed, data-driven predictions.")
+
+if TYPE_CHECKING:
+    import openai
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> tuple:
+    """Transient failures worth retrying; anything else (bad request, auth) fails immediately"""
+    # openai takes ~0.5s to import, so it is loaded on first use rather than with this module
+    import openai
+    return (
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+@dataclass
+class LLMResult:
+    key: str
+    content: Optional[str]
+    latency: float  # seconds, across all attempts including backoff
+    attempts: int
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize_latencies(results: List[LLMResult]) -> str:
+    """One-line latency and failure summary for a batch of completions"""
+    if not results:
+        return "⏱️  No LLM requests"
+    latencies = sorted(result.latency for result in results)
+    failed = sum(1 for result in results if not result.ok)
+    retried = sum(1 for result in results if result.attempts > 1)
+    cached = sum(1 for result in results if result.cached)
+    return (f"⏱️  {len(results)} LLM requests: p50 {_percentile(latencies, 0.5):.2f}s, "
+            f"p95 {_percentile(latencies, 0.95):.2f}s, max {latencies[-1]:.2f}s"
+            f" ({cached} cached, {retried} retried, {failed} failed)")
+
+class LLMDispatcher:
+    """Runs chat completions concurrently on the async OpenAI client.
+
+    At most `max_concurrency` requests are in flight. Each attempt is
+    bounded by `timeout` seconds; transient failures (timeouts, connection
+    errors, 429s and 5xx) are retried up to `max_retries` times with full
+    jitter exponential backoff. Pass `base_url` to target a local fake
+    completion server in tests. With a `cache`, successful completions are
+    stored by request content and identical requests skip the API.
+
+    The concurrency semaphore and the HTTP client are bound to an event
+    loop, so each loop that uses the dispatcher (the CLI runs a fresh
+    asyncio.run per command) gets its own. A client passed in is used
+    as is on every loop.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 8, timeout: float = 60.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, max_tokens: int = 1000,
+                 temperature: float = 0.7, client: Optional['openai.AsyncOpenAI'] = None,
+                 cache: Optional[LLMResponseCache] = None):
+        # The client does not retry; retries happen here so latency covers every attempt
+        self._client_options = (None if client is not None else
+                                {'api_key': api_key, 'base_url': base_url, 'max_retries': 0, 'timeout': timeout})
+        if client is None:
+            import openai
+            client = openai.AsyncOpenAI(**self._client_options)
+        self.client = client  # used by the first loop; later loops get their own
+        self._client_claimed = False
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.cache = cache
+        # event loop -> (semaphore, client)
+        self._loop_state: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+    def _state(self) -> Tuple[asyncio.Semaphore, 'openai.AsyncOpenAI']:
+        """Semaphore and client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            client = self.client
+            if self._client_options is not None and self._client_claimed:
+                import openai
+                client = openai.AsyncOpenAI(**self._client_options)
+            self._client_claimed = True
+            state = self._loop_state[loop] = (asyncio.Semaphore(self.max_concurrency), client)
+        return state
+
+    async def close(self):
+        """Close the running loop's HTTP connections"""
+        state = self._loop_state.pop(asyncio.get_running_loop(), None)
+        await (state[1] if state else self.client).close()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _messages(prompt: str) -> list:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def cache_key(self, prompt: str) -> str:
+        """Content address of the request this dispatcher would send for a prompt"""
+        return completion_key(self.model, {'max_tokens': self.max_tokens, 'temperature': self.temperature},
+                              self._messages(prompt))
+
+    async def _create(self, client: 'openai.AsyncOpenAI', prompt: str) -> str:
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt),
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
+
+    async def complete(self, prompt: str, key: str = '', bypass_cache: bool = False) -> LLMResult:
+        """Run one completion with timeout and retries; errors are returned, not raised.
+
+        `bypass_cache` skips the cache lookup but still stores the fresh response.
+        """
+        start = time.perf_counter()
+        cache_key = self.cache_key(prompt) if self.cache is not None else None
+        if cache_key is not None and not bypass_cache:
+            content = self.cache.get(cache_key)
+            if content is not None:
+                return LLMResult(key, content, time.perf_counter() - start, 0, cached=True)
+
+        semaphore, client = self._state()
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                async with semaphore:
+                    with metrics.span('llm.request'):
+                        content = await asyncio.wait_for(self._create(client, prompt), self.timeout)
+                if cache_key is not None and content is not None:
+                    self.cache.put(cache_key, content, {'model': self.model})
+                return LLMResult(key, content, time.perf_counter() - start, attempts)
+            except retryable_errors() as e:
+                metrics.count('llm_errors_total', error=type(e).__name__)
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                if attempts > self.max_retries:
+                    return LLMResult(key, None, time.perf_counter() - start, attempts, error)
+            except Exception as e:
+                # Non-retryable API errors and malformed responses (e.g. no choices) fail this request only
+                metrics.count('llm_errors_total', error=type(e).__name__)
+                return LLMResult(key, None, time.perf_counter() - start, attempts, f"{type(e).__name__}: {e}")
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            await asyncio.sleep(self._backoff(attempts - 1))
+
+    async def complete_many(self, prompts: Iterable[Tuple[str, str]], bypass_cache: bool = False) -> List[LLMResult]:
+        """Run (key, prompt) pairs concurrently, returning results in input order"""
+        return list(await asyncio.gather(*(self.complete(prompt, key, bypass_cache) for key, prompt in prompts)))
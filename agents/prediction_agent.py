@@ -1,10 +1,17 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, List
 from dataclasses import dataclass
-import openai
 from models.game import Game, GamePrediction, TeamStats, WeatherConditions
+from models.compact import home_wins, recent_wins
 from data.nfl_data import get_team_stats, get_team_by_abbreviation
 from data.game_history import get_head_to_head_record, get_recent_performance
-from prompts.prompt_generator import generate_comprehensive_prompt, generate_quick_prompt
+from data.game_history import HeadToHeadRecord
+from prompts.prompt_generator import (
+    generate_comprehensive_prompt, generate_quick_prompt, generate_compact_prompt, get_matchup_context,
+    MatchupContext, DEFAULT_TOKEN_BUDGET
+)
+from agents.llm_dispatcher import LLMDispatcher, LLMResult, summarize_latencies
+from agents.llm_cache import get_llm_cache
+from utils import metrics
 
 @dataclass
 class PredictionFactors:
@@ -21,65 +28,92 @@ class PredictionAgent:
     """NFL Prediction Agent that generates game predictions"""
     
     HOME_FIELD_ADVANTAGE = 3.0  # Average points advantage for home team
+    STRONG_HOME_STADIUMS = ["SEA", "KC", "GB", "NO", "DEN"]
     
-    def __init__(self, openai_api_key: Optional[str] = None):
-        self.openai_client = None
-        if openai_api_key:
-            self.openai_client = openai.OpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: Optional[str] = None, llm_dispatcher: Optional[LLMDispatcher] = None):
+        self.llm_dispatcher = llm_dispatcher
+        if self.llm_dispatcher is None and openai_api_key:
+            self.llm_dispatcher = LLMDispatcher(api_key=openai_api_key, cache=get_llm_cache())
         print("NFL Prediction Agent initialized")
 
-    def generate_prediction(self, game: Game) -> GamePrediction:
+    def generate_prediction(self, game: Game, context: Optional[MatchupContext] = None) -> GamePrediction:
         """Generate a comprehensive prediction for a game"""
-        home_stats = get_team_stats(game.home_team)
-        away_stats = get_team_stats(game.away_team)
-        head_to_head = get_head_to_head_record(game.home_team, game.away_team)
-        
-        factors = self._analyze_prediction_factors(game, home_stats, away_stats)
-        prediction = self._calculate_prediction(game, home_stats, away_stats, factors)
+        with metrics.span('predict'):
+            context = context or get_matchup_context(game)
+            home_stats = context.home_stats
+            away_stats = context.away_stats
+            
+            with metrics.span('factors'):
+                factors = self._analyze_prediction_factors(game, home_stats, away_stats, context)
+            prediction = self._calculate_prediction(game, home_stats, away_stats, factors)
         
         return prediction
 
-    def generate_ai_prompt(self, game: Game, prompt_type: str = 'comprehensive') -> str:
-        """Generate AI prompt for external analysis"""
+    def generate_predictions(self, games: Iterable[Game]) -> List[GamePrediction]:
+        """Generate predictions for a slate or season of games in one vectorized pass.
+
+        Produces the same predictions as calling generate_prediction per game.
+        """
+        from agents.batch_prediction import predict_games
+        return predict_games(self, list(games))
+
+    def generate_ai_prompt(self, game: Game, prompt_type: str = 'comprehensive',
+                           token_budget: int = DEFAULT_TOKEN_BUDGET,
+                           context: Optional[MatchupContext] = None) -> str:
+        """Generate AI prompt for external analysis ('comprehensive', 'quick' or token-budgeted 'compact').
+
+        Pass the `context` already used for generate_prediction to render
+        the prompt from the same stats without resolving them again.
+        """
+        if prompt_type == 'compact':
+            return generate_compact_prompt(game, token_budget, context or get_matchup_context(game)).text
         if prompt_type == 'quick':
-            return generate_quick_prompt(game.home_team, game.away_team, game.week or 1)
-        return generate_comprehensive_prompt(game)
+            return generate_quick_prompt(game.home_team, game.away_team, game.week or 1,
+                                         context or get_matchup_context(game))
+        return generate_comprehensive_prompt(game, context)
 
-    async def get_ai_prediction(self, game: Game, prompt_type: str = 'comprehensive') -> Optional[str]:
-        """Get prediction from OpenAI API"""
-        if not self.openai_client:
+    async def get_ai_prediction(self, game: Game, prompt_type: str = 'comprehensive',
+                                bypass_cache: bool = False, context: Optional[MatchupContext] = None) -> Optional[str]:
+        """Get prediction from OpenAI API (cached by prompt unless bypass_cache)"""
+        if not self.llm_dispatcher:
             print("OpenAI client not configured. Please provide API key.")
             return None
         
-        try:
-            prompt = self.generate_ai_prompt(game, prompt_type)
-            
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert NFL analyst with deep knowledge of team statistics, player performance, and game dynamics. Provide detailed, data-driven predictions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"Error getting AI prediction: {e}")
-            return None
+        prompt = self.generate_ai_prompt(game, prompt_type, context=context)
+        result = await self.llm_dispatcher.complete(prompt, game.get_matchup(), bypass_cache)
+        if not result.ok:
+            print(f"Error getting AI prediction: {result.error}")
+        return result.content
+
+    async def get_ai_predictions(self, games: Iterable[Game], prompt_type: str = 'comprehensive',
+                                 token_budget: int = DEFAULT_TOKEN_BUDGET,
+                                 bypass_cache: bool = False) -> Dict[str, LLMResult]:
+        """Get OpenAI predictions for a slate of games concurrently, keyed by matchup"""
+        if not self.llm_dispatcher:
+            print("OpenAI client not configured. Please provide API key.")
+            return {}
+        
+        prompts = [(game.get_matchup(), self.generate_ai_prompt(game, prompt_type, token_budget)) for game in games]
+        results = await self.llm_dispatcher.complete_many(prompts, bypass_cache)
+        for result in results:
+            if not result.ok:
+                print(f"Error getting AI prediction for {result.key}: {result.error}")
+        print(summarize_latencies(results))
+        return {result.key: result for result in results}
 
-    def _analyze_prediction_factors(self, game: Game, home_stats: TeamStats, away_stats: TeamStats) -> PredictionFactors:
+    def _analyze_prediction_factors(self, game: Game, home_stats: TeamStats, away_stats: TeamStats,
+                                    context: Optional[MatchupContext] = None) -> PredictionFactors:
         """Analyze all factors that influence game outcome"""
+        context = context or get_matchup_context(game)
         return PredictionFactors(
-            home_field_advantage=self._calculate_home_field_advantage(game),
-            recent_form=self._calculate_recent_form_advantage(game.home_team, game.away_team),
-            head_to_head_history=self._calculate_head_to_head_advantage(game.home_team, game.away_team),
+            home_field_advantage=self._calculate_home_field_advantage(game, home_stats),
+            recent_form=self._calculate_recent_form_advantage(game.home_team, game.away_team, home_stats, away_stats),
+            head_to_head_history=self._calculate_head_to_head_advantage(game.home_team, game.away_team, context.head_to_head),
             offensive_strength=self._calculate_offensive_advantage(home_stats, away_stats),
             defensive_strength=self._calculate_defensive_advantage(home_stats, away_stats),
             injuries=self._calculate_injury_impact(home_stats, away_stats),
             weather=self._calculate_weather_impact(game.weather),
-            motivation=self._calculate_motivation_factor(game, home_stats, away_stats)
+            motivation=self._calculate_motivation_factor(game, home_stats, away_stats, context)
         )
 
     def _calculate_prediction(self, game: Game, home_stats: TeamStats, away_stats: TeamStats, 
@@ -139,36 +173,34 @@ class PredictionAgent:
             reasoning=reasoning
         )
 
-    def _calculate_home_field_advantage(self, game: Game) -> float:
+    def _calculate_home_field_advantage(self, game: Game, home_stats: Optional[TeamStats] = None) -> float:
         """Calculate home field advantage impact"""
         base_advantage = self.HOME_FIELD_ADVANTAGE
         
         # Boost for certain stadiums known for strong home advantage
-        strong_home_stadiums = ["SEA", "KC", "GB", "NO", "DEN"]
-        if game.home_team in strong_home_stadiums:
+        if game.home_team in self.STRONG_HOME_STADIUMS:
             base_advantage += 1.5
         
         # Reduce for teams with poor home records
-        home_stats = get_team_stats(game.home_team)
-        home_wins = int(home_stats.home_record.split('-')[0]) if '-' in home_stats.home_record else 4
-        if home_wins < 3:
+        home_stats = home_stats or get_team_stats(game.home_team)
+        if home_wins(home_stats) < 3:
             base_advantage -= 1.0
         
         return base_advantage
 
-    def _calculate_recent_form_advantage(self, home_team: str, away_team: str) -> float:
+    def _calculate_recent_form_advantage(self, home_team: str, away_team: str,
+                                         home_stats: Optional[TeamStats] = None,
+                                         away_stats: Optional[TeamStats] = None) -> float:
         """Calculate advantage based on recent form"""
-        home_stats = get_team_stats(home_team)
-        away_stats = get_team_stats(away_team)
-        
-        home_wins = home_stats.last_five_games.count('W')
-        away_wins = away_stats.last_five_games.count('W')
+        home_stats = home_stats or get_team_stats(home_team)
+        away_stats = away_stats or get_team_stats(away_team)
         
-        return (home_wins - away_wins) * 1.5
+        return (recent_wins(home_stats) - recent_wins(away_stats)) * 1.5
 
-    def _calculate_head_to_head_advantage(self, home_team: str, away_team: str) -> float:
+    def _calculate_head_to_head_advantage(self, home_team: str, away_team: str,
+                                          h2h: Optional[HeadToHeadRecord] = None) -> float:
         """Calculate historical head-to-head advantage"""
-        h2h = get_head_to_head_record(home_team, away_team)
+        h2h = h2h or get_head_to_head_record(home_team, away_team)
         
         if h2h.team1 == home_team:
             win_diff = h2h.team1_wins - h2h.team2_wins
@@ -220,7 +252,8 @@ class PredictionAgent:
         
         return impact
 
-    def _calculate_motivation_factor(self, game: Game, home_stats: TeamStats, away_stats: TeamStats) -> float:
+    def _calculate_motivation_factor(self, game: Game, home_stats: TeamStats, away_stats: TeamStats,
+                                     context: Optional[MatchupContext] = None) -> float:
         """Calculate motivation factors (playoffs, division games, etc.)"""
         motivation = 0
         
@@ -228,8 +261,11 @@ class PredictionAgent:
             motivation += 2
         
         # Division rivalry games
-        home_team_obj = get_team_by_abbreviation(game.home_team)
-        away_team_obj = get_team_by_abbreviation(game.away_team)
+        if context:
+            home_team_obj, away_team_obj = context.home_team, context.away_team
+        else:
+            home_team_obj = get_team_by_abbreviation(game.home_team)
+            away_team_obj = get_team_by_abbreviation(game.away_team)
         
         if home_team_obj and away_team_obj:
             if (home_team_obj.conference == away_team_obj.conference and 
@@ -0,0 +1,169 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models.game import Game
+from data.nfl_data import TEAMS
+from agents.prediction_agent import PredictionAgent
+from agents.batch_prediction import gather_slate_inputs, calculate_factor_arrays, calculate_expected_scores
+
+PLAYOFF_SEEDS = 7
+DIVISION_WINNER_SEEDS = 4
+DEFAULT_SCORE_SD = 13.5  # Standard deviation of an NFL game margin around the spread
+SIMULATION_CHUNK = 10_000  # Simulations per vectorized block, bounds memory per worker
+
+@dataclass
+class SeasonSimulationResult:
+    n_simulations: int
+    teams: List[str]
+    expected_wins: Dict[str, float]
+    playoff_probability: Dict[str, float]
+    division_probability: Dict[str, float]
+    seed_probabilities: Dict[str, List[float]]  # index 0 is the 1 seed
+
+    def summary(self) -> str:
+        """Format the results as a table sorted by playoff odds"""
+        lines = [f"📈 Season simulation ({self.n_simulations:,} runs)",
+                 f"{'Team':<5} {'Wins':>5} {'Div%':>6} {'Playoff%':>9} {'#1 Seed%':>9}"]
+        for team in sorted(self.teams, key=lambda t: -self.playoff_probability[t]):
+            lines.append(f"{team:<5} {self.expected_wins[team]:>5.1f} {self.division_probability[team] * 100:>6.1f} "
+                         f"{self.playoff_probability[team] * 100:>9.1f} {self.seed_probabilities[team][0] * 100:>9.1f}")
+        return '\n'.join(lines)
+
+@dataclass
+class _SimulationSetup:
+    margin_means: np.ndarray      # expected home margin per remaining game
+    home_incidence: np.ndarray    # [game, team] 1 where the team is at home
+    away_incidence: np.ndarray    # [game, team] 1 where the team is away
+    base_wins: np.ndarray         # wins (ties count half) already banked per team
+    base_point_diff: np.ndarray
+    divisions: List[np.ndarray]   # team indexes per division
+    conferences: List[np.ndarray]  # team indexes per conference
+    score_sd: float
+
+def _build_setup(agent: PredictionAgent, games: List[Game], base_records: Optional[Dict[str, Tuple[int, int, int]]],
+                 score_sd: float) -> Tuple[List[str], _SimulationSetup]:
+    teams = [team.abbreviation for team in TEAMS]
+    team_index = {team: i for i, team in enumerate(teams)}
+    base_wins = np.zeros(len(teams))
+    base_point_diff = np.zeros(len(teams))
+    for team, (wins, _, ties) in (base_records or {}).items():
+        if team in team_index:
+            base_wins[team_index[team]] = wins + ties / 2
+
+    remaining = []
+    for game in games:
+        if game.home_team not in team_index or game.away_team not in team_index:
+            continue
+        if game.is_completed():
+            home, away = team_index[game.home_team], team_index[game.away_team]
+            margin = game.home_score - game.away_score
+            base_wins[home] += 1.0 if margin > 0 else 0.5 if margin == 0 else 0.0
+            base_wins[away] += 1.0 if margin < 0 else 0.5 if margin == 0 else 0.0
+            base_point_diff[home] += margin
+            base_point_diff[away] -= margin
+        else:
+            remaining.append(game)
+
+    home_incidence = np.zeros((len(remaining), len(teams)), dtype=np.float32)
+    away_incidence = np.zeros((len(remaining), len(teams)), dtype=np.float32)
+    margin_means = np.zeros(len(remaining))
+    if remaining:
+        # The batch model's expected scores (clamped like _calculate_prediction, before rounding)
+        inputs = gather_slate_inputs(agent, remaining)
+        home_expected, away_expected = calculate_expected_scores(inputs, calculate_factor_arrays(agent, inputs))
+        margin_means = np.clip(home_expected, 7, 50) - np.clip(away_expected, 7, 50)
+        rows = np.arange(len(remaining))
+        home_incidence[rows, [team_index[game.home_team] for game in remaining]] = 1
+        away_incidence[rows, [team_index[game.away_team] for game in remaining]] = 1
+
+    division_keys = sorted({(team.conference, team.division) for team in TEAMS})
+    divisions = [np.array([team_index[team.abbreviation] for team in TEAMS if (team.conference, team.division) == key])
+                 for key in division_keys]
+    conferences = [np.array([team_index[team.abbreviation] for team in TEAMS if team.conference == conference])
+                   for conference in sorted({team.conference for team in TEAMS})]
+
+    return teams, _SimulationSetup(margin_means, home_incidence, away_incidence, base_wins, base_point_diff,
+                                   divisions, conferences, score_sd)
+
+def _simulate_shard(setup: _SimulationSetup, n_simulations: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """Run a block of simulations and return per-team counts"""
+    rng = np.random.default_rng(seed)
+    team_count = len(setup.base_wins)
+    wins_total = np.zeros(team_count)
+    division_counts = np.zeros(team_count, dtype=np.int64)
+    seed_counts = np.zeros((team_count, PLAYOFF_SEEDS), dtype=np.int64)
+    incidence_diff = setup.home_incidence - setup.away_incidence
+
+    done = 0
+    while done < n_simulations:
+        block = min(SIMULATION_CHUNK, n_simulations - done)
+        margins = rng.normal(setup.margin_means, setup.score_sd, size=(block, len(setup.margin_means))).astype(np.float32)
+        home_won = (margins > 0).astype(np.float32)
+        wins = setup.base_wins + home_won @ setup.home_incidence + (1 - home_won) @ setup.away_incidence
+        point_diff = setup.base_point_diff + margins @ incidence_diff
+        wins_total += wins.sum(axis=0)
+
+        # Rank by wins, then point differential, then a random draw for exact ties
+        score = wins + np.clip(point_diff, -999, 999) / 2000.0 + rng.random((block, team_count)) * 1e-6
+
+        division_winner = np.zeros((block, team_count), dtype=bool)
+        for division in setup.divisions:
+            best = division[np.argmax(score[:, division], axis=1)]
+            division_winner[np.arange(block), best] = True
+        division_counts += division_winner.sum(axis=0)
+
+        for conference in setup.conferences:
+            conference_score = score[:, conference]
+            winners = division_winner[:, conference]
+            ranked_winners = np.argsort(-np.where(winners, conference_score, -np.inf), axis=1)[:, :DIVISION_WINNER_SEEDS]
+            ranked_wild_cards = np.argsort(-np.where(winners, -np.inf, conference_score), axis=1)[
+                :, :PLAYOFF_SEEDS - DIVISION_WINNER_SEEDS]
+            seeded = conference[np.concatenate([ranked_winners, ranked_wild_cards], axis=1)]
+            for seed_position in range(PLAYOFF_SEEDS):
+                seed_counts[:, seed_position] += np.bincount(seeded[:, seed_position], minlength=team_count)
+
+        done += block
+
+    return {'wins': wins_total, 'division': division_counts, 'seeds': seed_counts}
+
+def simulate_season(games: List[Game], n_simulations: int = 100_000, workers: Optional[int] = None,
+                    seed: Optional[int] = None, base_records: Optional[Dict[str, Tuple[int, int, int]]] = None,
+                    score_sd: float = DEFAULT_SCORE_SD,
+                    agent: Optional[PredictionAgent] = None) -> SeasonSimulationResult:
+    """Play out a season's schedule many times and estimate playoff odds.
+
+    Completed games count as played; each remaining game's home margin is
+    drawn from a normal distribution centred on the prediction model's
+    expected score difference. `base_records` adds (wins, losses, ties)
+    banked before the given games. Simulations are split across a process
+    pool of `workers` (default: CPU count).
+    """
+    agent = agent or PredictionAgent()
+    teams, setup = _build_setup(agent, games, base_records, score_sd)
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, n_simulations))
+    shard_sizes = [n_simulations // workers + (1 if i < n_simulations % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    if workers == 1:
+        shards = [_simulate_shard(setup, shard_sizes[0], seeds[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_simulate_shard, [setup] * workers, shard_sizes, seeds))
+
+    wins = sum(shard['wins'] for shard in shards)
+    division = sum(shard['division'] for shard in shards)
+    seed_counts = sum(shard['seeds'] for shard in shards)
+
+    return SeasonSimulationResult(
+        n_simulations=n_simulations,
+        teams=teams,
+        expected_wins={team: float(wins[i] / n_simulations) for i, team in enumerate(teams)},
+        playoff_probability={team: float(seed_counts[i].sum() / n_simulations) for i, team in enumerate(teams)},
+        division_probability={team: float(division[i] / n_simulations) for i, team in enumerate(teams)},
+        seed_probabilities={team: [float(count / n_simulations) for count in seed_counts[i]]
+                            for i, team in enumerate(teams)}
+    )
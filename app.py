@@ -5,20 +5,38 @@ An application to predict NFL game outcomes using AI agents.
 """
 
 import sys
-import asyncio
 from datetime import datetime
-from typing import Optional
-from utils.scheduler import NFLScheduler
-from agents.prediction_agent import PredictionAgent
-from models.game import Game
-from prompts.prompt_generator import generate_comprehensive_prompt, generate_quick_prompt
+from typing import TYPE_CHECKING, List, Optional
+
+# Heavy modules (requests, openai, numpy, the prediction stack) are imported
+# by the commands that use them, so --help and --api-status start instantly.
+# benchmarks/startup.py tracks the per-command startup time.
+if TYPE_CHECKING:
+    from utils.scheduler import NFLScheduler
+    from agents.prediction_agent import PredictionAgent
 
 class NFLPredictionApp:
     """Main NFL Prediction Application"""
     
     def __init__(self):
-        self.scheduler = NFLScheduler()
-        self.prediction_agent = PredictionAgent()
+        self._scheduler: Optional['NFLScheduler'] = None
+        self._prediction_agent: Optional['PredictionAgent'] = None
+
+    @property
+    def scheduler(self) -> 'NFLScheduler':
+        """Scheduler, built on first use"""
+        if self._scheduler is None:
+            from utils.scheduler import NFLScheduler
+            self._scheduler = NFLScheduler()
+        return self._scheduler
+
+    @property
+    def prediction_agent(self) -> 'PredictionAgent':
+        """Prediction agent, built on first use"""
+        if self._prediction_agent is None:
+            from agents.prediction_agent import PredictionAgent
+            self._prediction_agent = PredictionAgent()
+        return self._prediction_agent
 
     def init(self):
         """Initialize the application"""
@@ -47,23 +65,23 @@ class NFLPredictionApp:
         print('   python app.py --help          (Show help)')
         print('   python app.py --live-scores   (Show live scores)')
         print('   python app.py --api-status    (Check API status)')
+        print('   python app.py --accuracy      (Show prediction accuracy)')
+        print('   python app.py --backtest      (Backtest predictions against game history)')
+        print('   python app.py --week 5 --profile         (Profile any command; --profile=sample for low overhead)')
+        print('   python app.py --week 5 --live            (Use live ESPN team stats instead of static data)')
+        print('   NFL_PROMPT_OUTPUT=archive     (Append prompts to generated-prompts/prompts.jsonl.gz)')
+        print('   NFL_METRICS_FILE=metrics.json (Record timings and counters; .prom for Prometheus text)')
 
-    def start_automated_predictions(self):
+    async def start_automated_predictions(self):
         """Start automated prediction scheduling"""
         print('\n🤖 Starting automated prediction system...')
-        self.scheduler.schedule_predictions()
         print('✅ Automated predictions are now running!')
-        print('📅 Next prediction will run on Tuesday at 10:00 AM ET')
-        
-        # Keep the process running
         print('\n👀 Press Ctrl+C to stop the automated predictions')
-        try:
-            while True:
-                pass
-        except KeyboardInterrupt:
-            print('\n\n👋 Stopping NFL Prediction App...')
-            print('🏈 Thanks for using the NFL Prediction App!')
-            sys.exit(0)
+        
+        # Sleeps until the next scheduled job; Ctrl+C/SIGTERM stops it cleanly
+        await self.scheduler.run_automated()
+        print('\n\n👋 Stopping NFL Prediction App...')
+        print('🏈 Thanks for using the NFL Prediction App!')
 
     async def predict_current_week(self):
         """Run predictions for the current week using real NFL schedule"""
@@ -89,6 +107,9 @@ class NFLPredictionApp:
 
     def generate_game_prompt(self, home_team: str, away_team: str, week: int = 1):
         """Generate a prompt for a specific matchup"""
+        from models.game import Game
+        from prompts.prompt_archive import PROMPT_OUTPUT, get_prompt_archive
+        from prompts.prompt_generator import generate_comprehensive_prompt
         print(f'\n📝 Generating prediction prompt for {away_team} @ {home_team}...')
         
         game = Game(
@@ -106,7 +127,15 @@ class NFLPredictionApp:
         print(prompt)
         print('=' * 50)
         
+        if PROMPT_OUTPUT == 'archive':
+            with get_prompt_archive() as archive:
+                archive.append(game, prompt)
+            print(f'💾 Archived prompt in: {archive.path}')
+            return
+        
         # Save to file
+        import os
+        os.makedirs('generated-prompts', exist_ok=True)
         filename = f'week{week}_{away_team}@{home_team}_{datetime.now().strftime("%Y-%m-%d")}.txt'
         with open(f'generated-prompts/{filename}', 'w', encoding='utf-8') as f:
             f.write(prompt)
@@ -115,12 +144,21 @@ class NFLPredictionApp:
 
     def show_prediction_accuracy(self):
         """Show prediction accuracy statistics"""
-        self.scheduler.show_prediction_accuracy()
+        from data.prediction_ledger import get_prediction_ledger
+        from utils.reports import print_prediction_accuracy
+        print_prediction_accuracy(get_prediction_ledger())
 
     def set_current_week(self, week: int):
         """Set the current week"""
         self.scheduler.set_current_week(week)
 
+    def run_backtest(self, workers: Optional[int] = None):
+        """Replay game history and score point-in-time predictions"""
+        from agents.backtest import run_backtest
+        print('\n📊 Backtesting predictions against game history...')
+        report = run_backtest(self.prediction_agent, workers=workers)
+        print(report.summary())
+
     def show_help(self):
         """Show help information"""
         print('\n❓ NFL PREDICTION APP HELP')
@@ -152,40 +190,54 @@ class NFLPredictionApp:
 
     def show_live_scores(self):
         """Show live scores"""
-        self.scheduler.show_live_scores()
+        from utils.reports import print_live_scores
+        print_live_scores()
 
     def check_api_status(self):
         """Check API status"""
-        self.scheduler.check_api_status()
+        from utils.reports import print_api_status
+        print_api_status()
 
-async def main():
-    """Main application entry point"""
-    app = NFLPredictionApp()
-    
-    # Parse command line arguments
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
+def _run(coroutine):
+    """Run an async command; asyncio is only loaded for commands that need it"""
+    import asyncio
+    return asyncio.run(coroutine)
+
+def run_command(app: NFLPredictionApp, argv: List[str]):
+    """Dispatch one command line (argv[0] is the program name)"""
+    if len(argv) > 1:
+        arg = argv[1].lower()
         
         if arg == '--auto':
-            app.start_automated_predictions()
+            _run(app.start_automated_predictions())
         elif arg == '--predict-week':
-            await app.predict_current_week()
-        elif arg == '--week' and len(sys.argv) > 2:
+            _run(app.predict_current_week())
+        elif arg == '--week' and len(argv) > 2:
             try:
-                week = int(sys.argv[2])
-                await app.predict_specific_week(week)
+                week = int(argv[2])
             except ValueError:
                 print('❌ Invalid week number. Please provide a valid integer.')
+            else:
+                _run(app.predict_specific_week(week))
         elif arg == '--help':
             app.show_help()
         elif arg == '--live-scores':
             app.show_live_scores()
         elif arg == '--api-status':
             app.check_api_status()
-        elif arg == '--prompt' and len(sys.argv) > 4:
-            home_team = sys.argv[2].upper()
-            away_team = sys.argv[3].upper()
-            week = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+        elif arg == '--accuracy':
+            app.show_prediction_accuracy()
+        elif arg == '--backtest':
+            try:
+                workers = int(argv[2]) if len(argv) > 2 else None
+            except ValueError:
+                print('❌ Invalid worker count. Please provide a valid integer.')
+            else:
+                app.run_backtest(workers)
+        elif arg == '--prompt' and len(argv) > 4:
+            home_team = argv[2].upper()
+            away_team = argv[3].upper()
+            week = int(argv[4]) if len(argv) > 4 else 1
             app.generate_game_prompt(home_team, away_team, week)
         else:
             print('❌ Unknown command. Use --help for available options.')
@@ -193,5 +245,39 @@ async def main():
         # Interactive mode
         app.init()
 
+def _pop_profile_mode(argv: List[str]) -> Optional[str]:
+    """Remove a --profile or --profile=MODE flag from argv, returning the mode"""
+    for index, arg in enumerate(argv[1:], start=1):
+        if arg == '--profile' or arg.startswith('--profile='):
+            del argv[index]
+            return arg.partition('=')[2] or 'deterministic'
+    return None
+
+def _pop_live_flag(argv: List[str]) -> bool:
+    """Remove a --live flag from argv, returning whether it was given"""
+    if '--live' in argv[1:]:
+        argv.remove('--live')
+        return True
+    return False
+
+def main():
+    """Main application entry point"""
+    app = NFLPredictionApp()
+    argv = list(sys.argv)
+    if _pop_live_flag(argv):
+        from data.nfl_data import set_live_data_enabled
+        set_live_data_enabled(True)
+    profile_mode = _pop_profile_mode(argv)
+    if profile_mode is None:
+        run_command(app, argv)
+        return
+    
+    from utils.profiling import PROFILE_MODES, profile_command
+    if profile_mode not in PROFILE_MODES:
+        print(f"❌ Unknown profile mode '{profile_mode}'. Use --profile or --profile=sample.")
+        return
+    with profile_command(' '.join(argv[1:]) or 'interactive', profile_mode):
+        run_command(app, argv)
+
 if __name__ == '__main__':
-    asyncio.run(main())
+    main()
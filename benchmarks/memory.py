@@ -0,0 +1,91 @@
+"""
+Memory benchmark for the compact history rows in models.compact.
+
+Writes a synthetic history to a CSV, loads it with read_history_csv the
+way an imported history is loaded, and reports the bytes retained per
+row by GameHistoryEntry and by CompactHistoryEntry, as traced by
+tracemalloc. Usage:
+
+    python -m benchmarks.memory [--seasons N] [--teams N] [--json PATH]
+"""
+
+import csv
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, List, Optional
+
+from data.history_archive import read_history_csv
+from data.synthetic_history import generate_synthetic_history
+from models.compact import compact_history
+
+CSV_COLUMNS = ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'week', 'season', 'is_playoffs']
+
+def traced_bytes(build: Callable[[], list]) -> int:
+    """Bytes still allocated after build() returns, i.e. held by its result"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+def run_memory_benchmark(seasons: int = 10, teams: int = 32) -> dict:
+    """Per-row memory of dataclass and compact history rows loaded from a CSV"""
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'history.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for entry in generate_synthetic_history(seasons, teams):
+                writer.writerow([getattr(entry, column) for column in CSV_COLUMNS])
+        rows = len(read_history_csv(path))
+        full_bytes = traced_bytes(lambda: read_history_csv(path))
+        compact_bytes = traced_bytes(lambda: compact_history(read_history_csv(path)))
+    return {
+        'seasons': seasons,
+        'teams': teams,
+        'rows': rows,
+        'entry_bytes_per_row': round(full_bytes / rows, 1),
+        'compact_bytes_per_row': round(compact_bytes / rows, 1),
+        'compact_ratio': round(compact_bytes / full_bytes, 3)
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    seasons, teams, json_path = 10, 32, None
+    try:
+        while args:
+            flag, value, args = args[0], args[1], args[2:]
+            if flag == '--seasons':
+                seasons = int(value)
+            elif flag == '--teams':
+                teams = int(value)
+            elif flag == '--json':
+                json_path = value
+            else:
+                raise ValueError(flag)
+    except (IndexError, ValueError):
+        print("Usage: python -m benchmarks.memory [--seasons N] [--teams N] [--json PATH]")
+        return 1
+
+    result = run_memory_benchmark(seasons, teams)
+    print(f"\n🧮 HISTORY ROW MEMORY ({result['rows']} rows, {seasons} seasons x {teams} teams)")
+    print(f"   GameHistoryEntry    {result['entry_bytes_per_row']:>7.1f} bytes/row")
+    print(f"   CompactHistoryEntry {result['compact_bytes_per_row']:>7.1f} bytes/row "
+          f"({result['compact_ratio'] * 100:.0f}%)")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'result': result}, f, indent=2)
+        print(f"💾 Saved results to: {json_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
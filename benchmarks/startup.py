@@ -0,0 +1,100 @@
+"""
+Startup-time benchmark for the app.py CLI.
+
+Runs each command in a fresh interpreter several times and reports the
+wall time from process start to exit, alongside a bare `python -c pass`
+baseline. Usage:
+
+    python -m benchmarks.startup [--runs N] [--json PATH]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(REPO_ROOT, 'app.py')
+CHEAP_BUDGET_MS = 100.0  # target for commands that only print
+
+# (name, argv after app.py, cheap?) -- None runs the interpreter baseline
+COMMANDS = [
+    ('python', None, True),
+    ('interactive', [], True),
+    ('--help', ['--help'], True),
+    ('--api-status', ['--api-status'], True),
+    ('--live-scores', ['--live-scores'], True),
+    ('--accuracy', ['--accuracy'], True),
+    ('--prompt', ['--prompt', 'KC', 'BUF', '1'], False),
+]
+
+def time_command(argv: Optional[List[str]], runs: int, env: Dict[str, str]) -> List[float]:
+    """Wall time in milliseconds of each run of one command"""
+    command = [sys.executable, '-c', 'pass'] if argv is None else [sys.executable, APP] + argv
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def run_startup_benchmark(runs: int = 5) -> List[dict]:
+    """Time every CLI command; writes from --prompt go to a throwaway archive"""
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, NFL_PROMPT_OUTPUT='archive', NFL_PREDICTION_LEDGER=os.path.join(scratch, 'ledger.jsonl'),
+                   NFL_PROMPT_ARCHIVE=os.path.join(scratch, 'prompts.jsonl.gz'))
+        # Warm the OS file cache and .pyc files so the first run isn't an outlier
+        time_command(['--help'], 1, env)
+        results = []
+        for name, argv, cheap in COMMANDS:
+            timings = time_command(argv, runs, env)
+            results.append({
+                'command': name,
+                'runs': runs,
+                'median_ms': round(statistics.median(timings), 1),
+                'min_ms': round(min(timings), 1),
+                'max_ms': round(max(timings), 1),
+                'budget_ms': CHEAP_BUDGET_MS if cheap else None
+            })
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    runs, json_path = 5, None
+    try:
+        while args:
+            flag, value, args = args[0], args[1], args[2:]
+            if flag == '--runs':
+                runs = int(value)
+            elif flag == '--json':
+                json_path = value
+            else:
+                raise ValueError(flag)
+    except (IndexError, ValueError):
+        print("Usage: python -m benchmarks.startup [--runs N] [--json PATH]")
+        return 1
+
+    results = run_startup_benchmark(runs)
+    print(f"\n⏱️  CLI STARTUP ({runs} runs each, median)")
+    over_budget = 0
+    for result in results:
+        budget = result['budget_ms']
+        flag = ''
+        if budget is not None:
+            flag = '✅' if result['median_ms'] <= budget else '❌'
+            over_budget += result['median_ms'] > budget
+        print(f"   {result['command']:<14} {result['median_ms']:>7.1f}ms  "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}) {flag}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"💾 Saved results to: {json_path}")
+    return 1 if over_budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
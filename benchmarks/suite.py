@@ -0,0 +1,285 @@
+"""
+Micro and macro benchmarks at synthetic data scales.
+
+Each benchmark runs against a deterministic synthetic game history (and,
+for the ESPN parser, synthetic scoreboard payloads) at every scale in
+SCALES, and results are written as JSON. Usage:
+
+    python -m benchmarks.suite [--quick] [--only NAME[,NAME]] [--json PATH] [--compare BASELINE.json]
+
+--compare exits non-zero if any benchmark is more than --threshold
+(default 25%) slower than the same benchmark and scale in the baseline.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import weakref
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data.game_history import GameHistoryStore, get_game_history_store, set_game_history_store
+from data.synthetic_history import REGULAR_SEASON_WEEKS, generate_synthetic_history, synthetic_team_abbreviations
+from models.game import Game
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = [(1, 32), (10, 32), (50, 32), (1, 320), (10, 320), (50, 320)]  # (seasons, teams)
+QUICK_SCALES = [(1, 32), (10, 32), (10, 320)]
+SEED = 2025
+MIN_TIME = 0.2       # seconds per timed batch; loop counts are calibrated to reach it
+REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+
+@dataclass
+class BenchmarkResult:
+    benchmark: str
+    seasons: int
+    teams: int
+    games: int       # history size at this scale
+    loops: int       # operations per timed batch
+    median_us: float
+    min_us: float
+    stdev_us: float
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return (self.benchmark, self.seasons, self.teams)
+
+def time_operation(operation: Callable[[int], None], min_time: float = MIN_TIME,
+                   repeat: int = REPEAT) -> Tuple[int, List[float]]:
+    """Calibrate a loop count like timeit.autorange, then time `repeat` batches.
+
+    `operation(i)` runs one operation; `i` lets it vary its input. Returns
+    the loop count and per-operation times in seconds.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(loops):
+            operation(i)
+        if time.perf_counter() - start >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(loops):
+            operation(i)
+        timings.append((time.perf_counter() - start) / loops)
+    return loops, timings
+
+def synthetic_espn_scoreboard(season: int, week: int, team_count: int, seed: int = SEED) -> dict:
+    """A deterministic ESPN scoreboard payload shaped like the site API response"""
+    rng = random.Random(seed * 1000 + season * 20 + week)
+    teams = synthetic_team_abbreviations(team_count)
+    rng.shuffle(teams)
+    kickoff = datetime(season, 9, 7, 17, 0) + timedelta(weeks=week - 1)
+    events = []
+    for index, (home, away) in enumerate(zip(teams[0::2], teams[1::2])):
+        events.append({
+            'id': f"{season}{week:02d}{index:03d}",
+            'date': (kickoff + timedelta(hours=3 * (index % 4))).strftime('%Y-%m-%dT%H:%MZ'),
+            'competitions': [{
+                'status': {'type': {'completed': True}},
+                'season': {'type': 2},
+                'competitors': [
+                    {'homeAway': 'home', 'score': str(rng.randint(3, 42)), 'team': {'abbreviation': home}},
+                    {'homeAway': 'away', 'score': str(rng.randint(3, 42)), 'team': {'abbreviation': away}},
+                ]
+            }]
+        })
+    return {'events': events}
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the app's progress prints while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def _real_matchups() -> List[Tuple[str, str]]:
+    """Matchups among the 32 real teams, which have stats at every scale"""
+    teams = synthetic_team_abbreviations(32)
+    return [(home, away) for home in teams for away in teams if home != away]
+
+def _games(matchups: List[Tuple[str, str]]) -> Callable[[int], Game]:
+    """A fresh Game per call, so per-game context caches miss as they would for a new slate"""
+    def make(i: int) -> Game:
+        home, away = matchups[i % len(matchups)]
+        return Game(home, away, datetime(2025, 9, 7) + timedelta(days=i % 120), week=i % 18 + 1, season=2025)
+    return make
+
+def bench_head_to_head(seasons: int, teams: int) -> Callable[[int], None]:
+    from data.game_history import get_head_to_head_record
+    matchups = _real_matchups()
+    return lambda i: get_head_to_head_record(*matchups[i % len(matchups)])
+
+def bench_team_history(seasons: int, teams: int) -> Callable[[int], None]:
+    from data.game_history import get_team_history
+    names = synthetic_team_abbreviations(32)
+    return lambda i: get_team_history(names[i % len(names)], seasons)
+
+def bench_generate_prediction(seasons: int, teams: int) -> Callable[[int], None]:
+    from agents.prediction_agent import PredictionAgent
+    with _quiet():
+        agent = PredictionAgent()
+    make = _games(_real_matchups())
+    return lambda i: agent.generate_prediction(make(i))
+
+def bench_comprehensive_prompt(seasons: int, teams: int) -> Callable[[int], None]:
+    from prompts.prompt_generator import generate_comprehensive_prompt
+    make = _games(_real_matchups())
+    return lambda i: generate_comprehensive_prompt(make(i))
+
+def bench_parse_espn(seasons: int, teams: int) -> Callable[[int], None]:
+    """Parse one week's scoreboard; payloads cycle through every week of every season"""
+    from utils.scheduler import NFLScheduler
+    with _quiet():
+        scheduler = NFLScheduler()
+    weeks = [(season, week) for season in range(2024 - seasons + 1, 2025)
+             for week in range(1, REGULAR_SEASON_WEEKS + 1)]
+    payloads = [(synthetic_espn_scoreboard(season, week, teams), week, season) for season, week in weeks]
+    return lambda i: scheduler._parse_espn_api_response(*payloads[i % len(payloads)])
+
+def bench_predict_specific_week(seasons: int, teams: int) -> Callable[[int], None]:
+    """The full weekly pipeline on the fallback schedule, writing to a scratch directory"""
+    from data.prediction_ledger import PredictionLedger
+    from utils.scheduler import NFLScheduler
+    scratch = tempfile.mkdtemp(prefix='nfl-bench-')
+    with _quiet():
+        scheduler = NFLScheduler()
+    scheduler.prediction_ledger = PredictionLedger(os.path.join(scratch, 'ledger.jsonl'))
+    scheduler.prompt_output = 'files'
+
+    def run(i: int):
+        cwd = os.getcwd()
+        os.chdir(scratch)  # prompt files go to ./generated-prompts
+        try:
+            asyncio.run(scheduler.predict_specific_week(i % 18 + 1))
+        finally:
+            os.chdir(cwd)
+    weakref.finalize(run, shutil.rmtree, scratch, True)
+    return run
+
+BENCHMARKS: Dict[str, Callable[[int, int], Callable[[int], None]]] = {
+    'get_head_to_head_record': bench_head_to_head,
+    'get_team_history': bench_team_history,
+    'generate_prediction': bench_generate_prediction,
+    'generate_comprehensive_prompt': bench_comprehensive_prompt,
+    'parse_espn_api_response': bench_parse_espn,
+    'predict_specific_week': bench_predict_specific_week,
+}
+
+def run_suite(scales: List[Tuple[int, int]] = SCALES, names: Optional[List[str]] = None,
+              min_time: float = MIN_TIME, repeat: int = REPEAT) -> List[BenchmarkResult]:
+    """Run the selected benchmarks at each scale against a synthetic history store"""
+    names = names or list(BENCHMARKS)
+    original_store = get_game_history_store()
+    results = []
+    try:
+        for seasons, teams in scales:
+            history = generate_synthetic_history(seasons, teams, seed=SEED)
+            set_game_history_store(GameHistoryStore(history))
+            for name in names:
+                operation = BENCHMARKS[name](seasons, teams)
+                with _quiet():
+                    loops, timings = time_operation(operation, min_time, repeat)
+                result = BenchmarkResult(
+                    name, seasons, teams, len(history), loops,
+                    round(statistics.median(timings) * 1e6, 3), round(min(timings) * 1e6, 3),
+                    round(statistics.stdev(timings) * 1e6, 3) if len(timings) > 1 else 0.0
+                )
+                results.append(result)
+                print(f"   {name:<30} {seasons:>3} seasons {teams:>4} teams  "
+                      f"{result.median_us:>12.2f}us  (min {result.min_us:.2f}, {loops} loops)", flush=True)
+    finally:
+        set_game_history_store(original_store)
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def results_document(results: List[BenchmarkResult]) -> dict:
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'results': [asdict(result) for result in results]
+    }
+
+def compare(results: List[BenchmarkResult], baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Benchmarks slower than the baseline's median by more than `threshold`"""
+    previous = {(entry['benchmark'], entry['seasons'], entry['teams']): entry['median_us']
+                for entry in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result.key)
+        if before and result.median_us > before * (1 + threshold):
+            regressions.append(f"{result.benchmark} ({result.seasons} seasons, {result.teams} teams): "
+                               f"{before:.2f}us -> {result.median_us:.2f}us (+{result.median_us / before - 1:.0%})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    usage = ("Usage: python -m benchmarks.suite [--quick] [--only NAME[,NAME]] [--json PATH] "
+             "[--compare BASELINE.json] [--threshold 0.25]")
+    scales, names, json_path, baseline_path, threshold = SCALES, None, None, None, DEFAULT_THRESHOLD
+    try:
+        while args:
+            flag, args = args[0], args[1:]
+            if flag == '--quick':
+                scales = QUICK_SCALES
+                continue
+            value, args = args[0], args[1:]
+            if flag == '--only':
+                names = value.split(',')
+                unknown = [name for name in names if name not in BENCHMARKS]
+                if unknown:
+                    raise ValueError(unknown)
+            elif flag == '--json':
+                json_path = value
+            elif flag == '--compare':
+                baseline_path = value
+            elif flag == '--threshold':
+                threshold = float(value)
+            else:
+                raise ValueError(flag)
+    except (IndexError, ValueError):
+        print(usage)
+        print(f"Benchmarks: {', '.join(BENCHMARKS)}")
+        return 1
+
+    print(f"\n⏱️  BENCHMARKS ({len(scales)} scales)")
+    results = run_suite(scales, names)
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results_document(results), f, indent=2)
+        print(f"💾 Saved results to: {json_path}")
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), threshold)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions over {threshold:.0%} against {baseline_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
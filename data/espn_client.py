@@ -0,0 +1,141 @@
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Iterable
+import requests
+from requests.adapters import HTTPAdapter
+from data.http_cache import HTTPResponseCache, get_http_cache
+from data.nfl_data import (
+    ESPN_SITE_API, ESPN_TEAM_MAPPING, DEFAULT_RECENT_FORM, ESPNRequestError,
+    parse_recent_games, parse_key_players, cache_team_recent_games, cache_team_key_players
+)
+
+@dataclass
+class TeamRefresh:
+    team: str
+    recent_form: str
+    key_players: List[str]
+    errors: List[str]
+
+class AsyncESPNClient:
+    """Async ESPN client with a shared keep-alive connection pool.
+
+    Requests run on a dedicated thread pool over one requests.Session whose
+    adapter keeps up to `max_concurrency` connections alive per host; a
+    semaphore bounds how many are in flight. `base_url` can point at a local
+    stub server for testing. Responses go through the conditional-request
+    HTTP cache, so unchanged schedules and rosters come back as 304s.
+    """
+
+    def __init__(self, base_url: str = ESPN_SITE_API, max_concurrency: int = 16, timeout: float = 10.0,
+                 http_cache: Optional[HTTPResponseCache] = None):
+        self.base_url = base_url.rstrip('/')
+        self.http_cache = http_cache or get_http_cache()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='espn-http')
+        # event loop -> semaphore; an asyncio.Semaphore is bound to the loop that first waits on it
+        self._semaphores: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self.request_count = 0
+
+    async def __aenter__(self) -> 'AsyncESPNClient':
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close pooled connections and worker threads"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """In-flight request limit for the given event loop"""
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def get_json(self, path: str, params: Optional[dict] = None) -> dict:
+        """GET a path (relative to base_url) or absolute URL and decode the JSON body"""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore(loop):
+            self.request_count += 1
+            response = await loop.run_in_executor(
+                self._executor,
+                partial(self.http_cache.get_json, self._url(path), params=params,
+                        timeout=self.timeout, session=self.session)
+            )
+        if response.status_code != 200:
+            raise ESPNRequestError(f"HTTP {response.status_code} for {self._url(path)}")
+        return response.data
+
+    async def fetch_team_recent_games(self, team_abbrev: str, limit: int = 5) -> str:
+        """Recent results for a team; raises on request failure"""
+        espn_team_id = ESPN_TEAM_MAPPING.get(team_abbrev)
+        if not espn_team_id:
+            return DEFAULT_RECENT_FORM
+        data = await self.get_json(f"teams/{espn_team_id}/schedule")
+        return parse_recent_games(data, espn_team_id, limit)
+
+    async def fetch_team_key_players(self, team_abbrev: str) -> List[str]:
+        """Key players for a team; raises on request failure"""
+        espn_team_id = ESPN_TEAM_MAPPING.get(team_abbrev)
+        if not espn_team_id:
+            return []
+        data = await self.get_json(f"teams/{espn_team_id}/roster")
+        return parse_key_players(data)
+
+    async def refresh_team(self, team_abbrev: str) -> TeamRefresh:
+        """Fetch a team's schedule and roster concurrently, falling back on errors"""
+        recent_form, key_players = await asyncio.gather(
+            self.fetch_team_recent_games(team_abbrev),
+            self.fetch_team_key_players(team_abbrev),
+            return_exceptions=True
+        )
+        errors = []
+        if isinstance(recent_form, Exception):
+            errors.append(f"schedule: {recent_form}")
+            recent_form = DEFAULT_RECENT_FORM
+        if isinstance(key_players, Exception):
+            errors.append(f"roster: {key_players}")
+            key_players = []
+        return TeamRefresh(team_abbrev, recent_form, key_players, errors)
+
+    async def refresh_all_teams(self, teams: Optional[Iterable[str]] = None) -> Dict[str, TeamRefresh]:
+        """Refresh schedules and rosters for every team in parallel"""
+        teams = list(teams) if teams is not None else list(ESPN_TEAM_MAPPING)
+        results = await asyncio.gather(*(self.refresh_team(team) for team in teams))
+        return {result.team: result for result in results}
+
+async def refresh_league_live_data(client: Optional[AsyncESPNClient] = None,
+                                   teams: Optional[Iterable[str]] = None) -> Dict[str, TeamRefresh]:
+    """Refresh every team's recent form and key players and load them into the live data cache"""
+    owns_client = client is None
+    client = client or AsyncESPNClient()
+    try:
+        start = time.perf_counter()
+        results = await client.refresh_all_teams(teams)
+        for team, result in results.items():
+            # Only successful fetches are cached; failures keep using the sync fallback path
+            if not any(error.startswith('schedule') for error in result.errors):
+                cache_team_recent_games(team, result.recent_form)
+            if not any(error.startswith('roster') for error in result.errors):
+                cache_team_key_players(team, result.key_players)
+        failed = sum(1 for result in results.values() if result.errors)
+        print(f"🌐 Refreshed {len(results)} teams in {time.perf_counter() - start:.2f}s"
+              f"{f' ({failed} with errors)' if failed else ''}")
+        return results
+    finally:
+        if owns_client:
+            client.close()
@@ -1,7 +1,9 @@
-from typing import List, Optional, Dict
+import heapq
+from typing import List, Optional, Dict, Iterable, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from models.game import WeatherConditions
+from utils import metrics
 
 @dataclass
 class GameHistoryEntry:
@@ -43,25 +45,31 @@ GAME_HISTORY: List[GameHistoryEntry] = [
     GameHistoryEntry('2023-01-21', 'KC', 'JAX', 27, 20, 19, 2023, True),
 ]
 
-def get_game_history() -> List[GameHistoryEntry]:
-    """Get all game history"""
-    return GAME_HISTORY
+CURRENT_HISTORY_SEASON = 2024
 
-def get_team_history(team_abbreviation: str, seasons: int = 3) -> List[GameHistoryEntry]:
-    """Get history for a specific team"""
-    return [
-        game for game in GAME_HISTORY
-        if (game.home_team == team_abbreviation or game.away_team == team_abbreviation)
-        and game.season >= (2024 - seasons + 1)
-    ]
+def first_history_season(seasons: int) -> int:
+    """Oldest season in a look-back of `seasons` seasons; later seasons are always included"""
+    return CURRENT_HISTORY_SEASON - seasons + 1
 
-def get_head_to_head_record(team1: str, team2: str) -> HeadToHeadRecord:
-    """Get head-to-head record between two teams"""
-    h2h_games = [
-        game for game in GAME_HISTORY
-        if {game.home_team, game.away_team} == {team1, team2}
-    ]
-    
+def most_recent_games(games: List[GameHistoryEntry], count: int) -> List[GameHistoryEntry]:
+    """The `count` latest games by date, most recent first (same-day games keep their order)"""
+    return sorted(games, key=lambda game: game.date, reverse=True)[:count]
+
+def _pair_key(team1: str, team2: str) -> Tuple[str, str]:
+    """Order-independent key for a matchup"""
+    return (team1, team2) if team1 <= team2 else (team2, team1)
+
+def _insert_by_date(games: List[GameHistoryEntry], game: GameHistoryEntry):
+    """Insert a game into a list kept ordered by date (oldest first)"""
+    # ISO dates compare correctly as strings; search from the end because
+    # history is almost always loaded and appended in date order
+    position = len(games)
+    while position > 0 and games[position - 1].date > game.date:
+        position -= 1
+    games.insert(position, game)
+
+def summarize_head_to_head(team1: str, team2: str, h2h_games: List[GameHistoryEntry]) -> HeadToHeadRecord:
+    """Build a head-to-head record from the pair's games, ordered oldest first"""
     if not h2h_games:
         # Return default record if no games found
         return HeadToHeadRecord(
@@ -74,45 +82,130 @@ def get_head_to_head_record(team1: str, team2: str) -> HeadToHeadRecord:
             avg_points_team1=20.0,
             avg_points_team2=20.0
         )
-    
+
     team1_wins = 0
     team2_wins = 0
     ties = 0
-    team1_points = []
-    team2_points = []
-    
+    team1_points = 0
+    team2_points = 0
+
     for game in h2h_games:
         if game.home_team == team1:
-            team1_points.append(game.home_score)
-            team2_points.append(game.away_score)
-            if game.home_score > game.away_score:
-                team1_wins += 1
-            elif game.home_score < game.away_score:
-                team2_wins += 1
-            else:
-                ties += 1
+            team1_score, team2_score = game.home_score, game.away_score
         else:  # team1 is away
-            team1_points.append(game.away_score)
-            team2_points.append(game.home_score)
-            if game.away_score > game.home_score:
-                team1_wins += 1
-            elif game.away_score < game.home_score:
-                team2_wins += 1
-            else:
-                ties += 1
-    
+            team1_score, team2_score = game.away_score, game.home_score
+        team1_points += team1_score
+        team2_points += team2_score
+        if team1_score > team2_score:
+            team1_wins += 1
+        elif team1_score < team2_score:
+            team2_wins += 1
+        else:
+            ties += 1
+
     return HeadToHeadRecord(
         team1=team1,
         team2=team2,
         team1_wins=team1_wins,
         team2_wins=team2_wins,
         ties=ties,
-        last_meeting=h2h_games[0],  # Most recent game
-        avg_points_team1=sum(team1_points) / len(team1_points) if team1_points else 20.0,
-        avg_points_team2=sum(team2_points) / len(team2_points) if team2_points else 20.0
+        last_meeting=h2h_games[-1],  # Most recent game
+        avg_points_team1=team1_points / len(h2h_games),
+        avg_points_team2=team2_points / len(h2h_games)
     )
 
+class GameHistoryStore:
+    """Game history indexed by season, team-season and matchup pair.
+
+    The season and pair indexes keep their games sorted by date (oldest
+    first); the team index keeps insertion order, which get_team_history
+    returns. Lookups cost O(k) in the number of matching games instead of
+    a scan of the whole history.
+    """
+
+    def __init__(self, games: Optional[Iterable[GameHistoryEntry]] = None):
+        self._games: List[GameHistoryEntry] = []
+        self._by_team_season: Dict[str, Dict[int, List[int]]] = {}  # positions in self._games
+        self._by_pair: Dict[Tuple[str, str], List[GameHistoryEntry]] = {}
+        self._by_season: Dict[int, List[GameHistoryEntry]] = {}
+        for game in games or []:
+            self.add_game(game)
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def add_game(self, game: GameHistoryEntry):
+        """Add a game to the store and its indexes"""
+        position = len(self._games)
+        self._games.append(game)
+        for team in {game.home_team, game.away_team}:
+            self._by_team_season.setdefault(team, {}).setdefault(game.season, []).append(position)
+        _insert_by_date(self._by_pair.setdefault(_pair_key(game.home_team, game.away_team), []), game)
+        _insert_by_date(self._by_season.setdefault(game.season, []), game)
+
+    def get_games(self) -> List[GameHistoryEntry]:
+        """Get all games in insertion order"""
+        return self._games
+
+    def get_seasons(self) -> List[int]:
+        """Get every season with games, oldest first"""
+        return sorted(self._by_season)
+
+    def get_season_games(self, season: int) -> List[GameHistoryEntry]:
+        """Get a season's games ordered by date"""
+        return list(self._by_season.get(season, []))
+
+    def get_team_history(self, team_abbreviation: str, seasons: int = 3) -> List[GameHistoryEntry]:
+        """Get a team's games from the last `seasons` seasons, in insertion order"""
+        team_seasons = self._by_team_season.get(team_abbreviation, {})
+        first_season = first_history_season(seasons)
+        runs = [positions for season, positions in team_seasons.items() if season >= first_season]
+        if len(runs) == 1:
+            return [self._games[position] for position in runs[0]]
+        return [self._games[position] for position in heapq.merge(*runs)]
+
+    def get_head_to_head_games(self, team1: str, team2: str) -> List[GameHistoryEntry]:
+        """Get all games between two teams, most recent first"""
+        return list(reversed(self._by_pair.get(_pair_key(team1, team2), [])))
+
+    def get_head_to_head_record(self, team1: str, team2: str) -> HeadToHeadRecord:
+        """Get head-to-head record between two teams"""
+        return summarize_head_to_head(team1, team2, self._by_pair.get(_pair_key(team1, team2), []))
+
+    def get_recent_performance(self, team: str, games: int = 5) -> List[GameHistoryEntry]:
+        """Get a team's most recent games in the current season"""
+        return most_recent_games(self.get_team_history(team, 1), games)
+
+_history_store = GameHistoryStore(GAME_HISTORY)
+
+def get_game_history_store() -> GameHistoryStore:
+    """Get the indexed store backing the module-level lookups"""
+    return _history_store
+
+def set_game_history_store(store: GameHistoryStore):
+    """Replace the store backing the module-level lookups (e.g. with an on-disk archive)"""
+    global _history_store
+    _history_store = store
+
+def add_game_to_history(game: GameHistoryEntry):
+    """Record a completed game in the history and its indexes"""
+    GAME_HISTORY.append(game)
+    _history_store.add_game(game)
+
+def get_game_history() -> List[GameHistoryEntry]:
+    """Get all game history"""
+    return GAME_HISTORY
+
+@metrics.timed('team_history')
+def get_team_history(team_abbreviation: str, seasons: int = 3) -> List[GameHistoryEntry]:
+    """Get history for a specific team"""
+    return _history_store.get_team_history(team_abbreviation, seasons)
+
+@metrics.timed('head_to_head')
+def get_head_to_head_record(team1: str, team2: str) -> HeadToHeadRecord:
+    """Get head-to-head record between two teams"""
+    return _history_store.get_head_to_head_record(team1, team2)
+
 def get_recent_performance(team: str, games: int = 5) -> List[GameHistoryEntry]:
     """Get recent performance for a team"""
-    team_games = get_team_history(team, 1)  # Current season only
-    return sorted(team_games, key=lambda x: x.date, reverse=True)[:games]
+    return _history_store.get_recent_performance(team, games)
@@ -0,0 +1,342 @@
+"""
+Compact on-disk archive of historical games.
+
+The archive is a single little-endian file of fixed-width sections:
+
+    header        magic, version, counts and section offsets
+    teams         8-byte NUL-padded abbreviations; a record's team id is its index
+    records       16-byte game records sorted by date
+    team index    (start, count) into the postings for every team id
+    pair index    (pair key, start, count) sorted by key, for every matchup played
+    postings      uint32 record numbers, date-ordered within each team/pair run
+
+Opening an archive reads only the header and the team table; every section
+is a zero-copy NumPy view over a read-only memory map, so a query only pages
+in its index entries, its postings run and the records it returns.
+
+Usage:
+    python -m data.history_archive OUTPUT.nflh [INPUT.csv]
+"""
+
+import csv
+import mmap
+import struct
+import sys
+from datetime import date
+from typing import List, Optional, Dict, Iterable
+import numpy as np
+from data.game_history import (
+    GameHistoryEntry, HeadToHeadRecord, GameHistoryStore, GAME_HISTORY, first_history_season,
+    most_recent_games, summarize_head_to_head, set_game_history_store
+)
+from data.history_columns import ColumnarHistory
+
+ARCHIVE_MAGIC = b'NFLHIST\0'
+ARCHIVE_VERSION = 1
+TEAM_NAME_SIZE = 8
+
+# magic, version, record size, team count, record count, pair count,
+# then offsets of the teams, records, team index, pair index and postings sections
+_HEADER = struct.Struct('<8sHHIQQQQQQQ')
+
+RECORD_DTYPE = np.dtype([
+    ('date', '<i4'),        # proleptic Gregorian ordinal
+    ('home', '<u2'),
+    ('away', '<u2'),
+    ('home_score', '<i2'),
+    ('away_score', '<i2'),
+    ('season', '<i2'),
+    ('week', 'u1'),
+    ('flags', 'u1'),
+])
+TEAM_INDEX_DTYPE = np.dtype([('start', '<u4'), ('count', '<u4')])
+PAIR_INDEX_DTYPE = np.dtype([('key', '<u4'), ('start', '<u4'), ('count', '<u4')])
+
+FLAG_PLAYOFFS = 1
+
+def _pair_id(team1: int, team2: int) -> int:
+    """Order-independent matchup key for two team ids"""
+    low, high = (team1, team2) if team1 <= team2 else (team2, team1)
+    return (low << 16) | high
+
+def write_history_archive(entries: Iterable[GameHistoryEntry], path: str) -> int:
+    """Write games to a binary archive, returning the number of records written.
+
+    Weather and attendance are not part of the fixed-width record and are dropped.
+    """
+    columns = ColumnarHistory.from_entries(entries)
+    team_count = len(columns.teams)
+    record_count = len(columns)
+    if team_count > 0xFFFF:
+        raise ValueError(f"Too many teams for archive format: {team_count}")
+
+    # Stable sort keeps the input order of same-day games, like GameHistoryStore
+    order = np.argsort(columns.dates, kind='stable')
+    records = np.zeros(record_count, dtype=RECORD_DTYPE)
+    records['date'] = columns.dates[order]
+    records['home'] = columns.home[order]
+    records['away'] = columns.away[order]
+    records['home_score'] = columns.home_score[order]
+    records['away_score'] = columns.away_score[order]
+    records['season'] = columns.season[order]
+    records['week'] = columns.week[order]
+    records['flags'] = np.where(columns.is_playoffs[order], FLAG_PLAYOFFS, 0)
+
+    home = records['home'].astype(np.int64)
+    away = records['away'].astype(np.int64)
+    record_numbers = np.arange(record_count, dtype=np.uint32)
+
+    # Team postings: each record appears under both teams, grouped by team and date-ordered
+    team_of = np.concatenate([home, away])
+    team_rows = np.concatenate([record_numbers, record_numbers])
+    team_order = np.lexsort((team_rows, team_of))
+    team_postings = team_rows[team_order]
+    team_counts = np.bincount(team_of, minlength=team_count)
+    team_index = np.zeros(team_count, dtype=TEAM_INDEX_DTYPE)
+    team_index['start'] = np.concatenate([[0], np.cumsum(team_counts)[:-1]]) if team_count else []
+    team_index['count'] = team_counts
+
+    # Pair postings follow the team postings in the same array
+    pair_keys = (np.minimum(home, away) << 16) | np.maximum(home, away)
+    pair_order = np.lexsort((record_numbers, pair_keys))
+    pair_postings = record_numbers[pair_order]
+    unique_keys, first_row, pair_counts = np.unique(pair_keys[pair_order], return_index=True, return_counts=True)
+    pair_index = np.zeros(len(unique_keys), dtype=PAIR_INDEX_DTYPE)
+    pair_index['key'] = unique_keys
+    pair_index['start'] = first_row + len(team_postings)
+    pair_index['count'] = pair_counts
+
+    postings = np.concatenate([team_postings, pair_postings]).astype('<u4')
+    team_table = b''.join(team.encode('ascii').ljust(TEAM_NAME_SIZE, b'\0')[:TEAM_NAME_SIZE] for team in columns.teams)
+
+    teams_offset = _HEADER.size
+    records_offset = teams_offset + len(team_table)
+    team_index_offset = records_offset + records.nbytes
+    pair_index_offset = team_index_offset + team_index.nbytes
+    postings_offset = pair_index_offset + pair_index.nbytes
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(
+            ARCHIVE_MAGIC, ARCHIVE_VERSION, RECORD_DTYPE.itemsize, team_count, record_count, len(pair_index),
+            teams_offset, records_offset, team_index_offset, pair_index_offset, postings_offset
+        ))
+        f.write(team_table)
+        f.write(records.tobytes())
+        f.write(team_index.tobytes())
+        f.write(pair_index.tobytes())
+        f.write(postings.tobytes())
+
+    return record_count
+
+def read_history_csv(path: str) -> List[GameHistoryEntry]:
+    """Read games from a CSV with a header row.
+
+    Required columns: date, home_team, away_team, home_score, away_score, week, season.
+    Optional: is_playoffs (true/false/1/0).
+    """
+    entries = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            entries.append(GameHistoryEntry(
+                date=row['date'].strip(),
+                home_team=row['home_team'].strip(),
+                away_team=row['away_team'].strip(),
+                home_score=int(row['home_score']),
+                away_score=int(row['away_score']),
+                week=int(row['week']),
+                season=int(row['season']),
+                is_playoffs=row.get('is_playoffs', '').strip().lower() in ('1', 'true', 'yes', 'y')
+            ))
+    return entries
+
+def convert_csv_to_archive(csv_path: str, archive_path: str) -> int:
+    """Convert a CSV of games to a binary archive"""
+    return write_history_archive(read_history_csv(csv_path), archive_path)
+
+class HistoryArchive:
+    """Read-only, memory-mapped game history archive.
+
+    Exposes the same lookups as GameHistoryStore so it can back the
+    module-level functions in data.game_history. Games added after opening
+    are kept in an in-memory overlay and merged into query results.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"Not a game history archive: {path}")
+
+        header = _HEADER.unpack_from(self._map, 0) if len(self._map) >= _HEADER.size else None
+        if not header or header[0] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a game history archive: {path}")
+        (_, version, record_size, team_count, record_count, pair_count,
+         teams_offset, records_offset, team_index_offset, pair_index_offset, postings_offset) = header
+        if version != ARCHIVE_VERSION or record_size != RECORD_DTYPE.itemsize:
+            self.close()
+            raise ValueError(f"Unsupported archive version {version} in {path}")
+
+        team_table = self._map[teams_offset:teams_offset + team_count * TEAM_NAME_SIZE]
+        self.teams: List[str] = [
+            team_table[i:i + TEAM_NAME_SIZE].rstrip(b'\0').decode('ascii')
+            for i in range(0, len(team_table), TEAM_NAME_SIZE)
+        ]
+        self.team_ids: Dict[str, int] = {team: i for i, team in enumerate(self.teams)}
+
+        self._records = np.frombuffer(self._map, dtype=RECORD_DTYPE, count=record_count, offset=records_offset)
+        self._team_index = np.frombuffer(self._map, dtype=TEAM_INDEX_DTYPE, count=team_count, offset=team_index_offset)
+        self._pair_index = np.frombuffer(self._map, dtype=PAIR_INDEX_DTYPE, count=pair_count, offset=pair_index_offset)
+        posting_count = (len(self._map) - postings_offset) // 4
+        self._postings = np.frombuffer(self._map, dtype='<u4', count=posting_count, offset=postings_offset)
+        self._overlay = GameHistoryStore()
+
+    def close(self):
+        """Release the memory map and file handle"""
+        # Drop the array views first; an mmap with live exported buffers cannot be closed
+        for name in ('_records', '_team_index', '_pair_index', '_postings'):
+            self.__dict__.pop(name, None)
+        try:
+            self._map.close()
+        except (AttributeError, BufferError):
+            pass
+        self._file.close()
+
+    def __enter__(self) -> 'HistoryArchive':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._overlay)
+
+    def add_game(self, game: GameHistoryEntry):
+        """Add a game to the in-memory overlay"""
+        self._overlay.add_game(game)
+
+    def _to_entry(self, record) -> GameHistoryEntry:
+        return GameHistoryEntry(
+            date.fromordinal(int(record['date'])).isoformat(),
+            self.teams[record['home']],
+            self.teams[record['away']],
+            int(record['home_score']),
+            int(record['away_score']),
+            int(record['week']),
+            int(record['season']),
+            bool(record['flags'] & FLAG_PLAYOFFS)
+        )
+
+    def _team_rows(self, team: str) -> np.ndarray:
+        """Date-ordered record numbers for a team"""
+        team_id = self.team_ids.get(team)
+        if team_id is None:
+            return self._postings[:0]
+        start, count = self._team_index[team_id]
+        return self._postings[start:start + count]
+
+    def _pair_rows(self, team1: str, team2: str) -> np.ndarray:
+        """Date-ordered record numbers for a matchup"""
+        id1 = self.team_ids.get(team1)
+        id2 = self.team_ids.get(team2)
+        if id1 is None or id2 is None or not len(self._pair_index):
+            return self._postings[:0]
+        key = _pair_id(id1, id2)
+        position = int(np.searchsorted(self._pair_index['key'], key))
+        if position >= len(self._pair_index) or self._pair_index[position]['key'] != key:
+            return self._postings[:0]
+        start, count = int(self._pair_index[position]['start']), int(self._pair_index[position]['count'])
+        return self._postings[start:start + count]
+
+    def get_games(self) -> List[GameHistoryEntry]:
+        """Materialize every game; intended for exports, not lookups"""
+        return [self._to_entry(record) for record in self._records] + self._overlay.get_games()
+
+    def get_seasons(self) -> List[int]:
+        """Get every season with games, oldest first"""
+        seasons = set(np.unique(self._records['season']).tolist()) | set(self._overlay.get_seasons())
+        return sorted(seasons)
+
+    def get_season_games(self, season: int) -> List[GameHistoryEntry]:
+        """Get a season's games ordered by date"""
+        # Only the season column is scanned; matching records are materialized
+        records = self._records[np.flatnonzero(self._records['season'] == season)]
+        games = [self._to_entry(record) for record in records]
+        if len(self._overlay):
+            games = sorted(games + self._overlay.get_season_games(season), key=lambda game: game.date)
+        return games
+
+    def get_team_history(self, team_abbreviation: str, seasons: int = 3) -> List[GameHistoryEntry]:
+        """Get a team's games from the last `seasons` seasons, in archive order then overlay insertion order"""
+        records = self._records[self._team_rows(team_abbreviation)]
+        records = records[records['season'] >= first_history_season(seasons)]
+        games = [self._to_entry(record) for record in records]
+        if len(self._overlay):
+            games += self._overlay.get_team_history(team_abbreviation, seasons)
+        return games
+
+    def get_head_to_head_games(self, team1: str, team2: str) -> List[GameHistoryEntry]:
+        """Get all games between two teams, most recent first"""
+        games = [self._to_entry(record) for record in self._records[self._pair_rows(team1, team2)][::-1]]
+        if len(self._overlay):
+            games = sorted(self._overlay.get_head_to_head_games(team1, team2) + games,
+                           key=lambda game: game.date, reverse=True)
+        return games
+
+    def get_head_to_head_record(self, team1: str, team2: str) -> HeadToHeadRecord:
+        """Get head-to-head record between two teams"""
+        if len(self._overlay) and self._overlay.get_head_to_head_games(team1, team2):
+            return summarize_head_to_head(team1, team2, self.get_head_to_head_games(team1, team2)[::-1])
+
+        records = self._records[self._pair_rows(team1, team2)]
+        if not len(records):
+            return summarize_head_to_head(team1, team2, [])
+
+        team1_home = records['home'] == self.team_ids[team1]
+        home_score = records['home_score'].astype(np.int64)
+        away_score = records['away_score'].astype(np.int64)
+        team1_points = np.where(team1_home, home_score, away_score)
+        team2_points = np.where(team1_home, away_score, home_score)
+
+        return HeadToHeadRecord(
+            team1=team1,
+            team2=team2,
+            team1_wins=int(np.count_nonzero(team1_points > team2_points)),
+            team2_wins=int(np.count_nonzero(team1_points < team2_points)),
+            ties=int(np.count_nonzero(team1_points == team2_points)),
+            last_meeting=self._to_entry(records[-1]),  # Most recent game
+            avg_points_team1=int(team1_points.sum()) / len(records),
+            avg_points_team2=int(team2_points.sum()) / len(records)
+        )
+
+    def get_recent_performance(self, team: str, games: int = 5) -> List[GameHistoryEntry]:
+        """Get a team's most recent games in the current season"""
+        return most_recent_games(self.get_team_history(team, 1), games)
+
+def use_history_archive(path: str) -> HistoryArchive:
+    """Open an archive and make it the backing store for data.game_history lookups"""
+    archive = HistoryArchive(path)
+    set_game_history_store(archive)
+    return archive
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Convert a CSV (or the built-in sample history) to an archive"""
+    args = sys.argv[1:] if argv is None else argv
+    if not args or len(args) > 2:
+        print("Usage: python -m data.history_archive OUTPUT.nflh [INPUT.csv]")
+        return 1
+
+    output_path = args[0]
+    if len(args) == 2:
+        count = convert_csv_to_archive(args[1], output_path)
+    else:
+        count = write_history_archive(GAME_HISTORY, output_path)
+    print(f"📦 Wrote {count} games to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
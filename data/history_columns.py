@@ -0,0 +1,247 @@
+from typing import List, Optional, Dict, Iterable
+from dataclasses import dataclass
+from datetime import date
+import numpy as np
+from data.game_history import GameHistoryEntry, HeadToHeadRecord
+
+@dataclass
+class TeamSplits:
+    team: str
+    home_wins: int
+    home_losses: int
+    home_ties: int
+    away_wins: int
+    away_losses: int
+    away_ties: int
+    points_for: int
+    points_against: int
+    games_played: int
+
+@dataclass
+class LeagueAggregates:
+    teams: List[str]
+    home_wins: np.ndarray
+    home_losses: np.ndarray
+    home_ties: np.ndarray
+    away_wins: np.ndarray
+    away_losses: np.ndarray
+    away_ties: np.ndarray
+    points_for: np.ndarray
+    points_against: np.ndarray
+    games_played: np.ndarray
+    head_to_head_wins: np.ndarray  # [i, j] = games team i won against team j
+
+@dataclass
+class SeasonPoints:
+    seasons: np.ndarray
+    teams: List[str]
+    points_for: np.ndarray      # [season, team]
+    points_against: np.ndarray  # [season, team]
+    games_played: np.ndarray    # [season, team]
+
+class ColumnarHistory:
+    """Struct-of-arrays game history with vectorized aggregates.
+
+    Each game is one row across parallel arrays: integer team ids, date
+    ordinals, int16 scores, season and week. Records and splits are masked
+    NumPy reductions rather than Python loops over GameHistoryEntry rows.
+    """
+
+    def __init__(self, teams: List[str], home: np.ndarray, away: np.ndarray, dates: np.ndarray,
+                 home_score: np.ndarray, away_score: np.ndarray, season: np.ndarray,
+                 week: np.ndarray, is_playoffs: np.ndarray):
+        self.teams = teams
+        self.team_ids: Dict[str, int] = {team: i for i, team in enumerate(teams)}
+        self.home = home
+        self.away = away
+        self.dates = dates
+        self.home_score = home_score
+        self.away_score = away_score
+        self.season = season
+        self.week = week
+        self.is_playoffs = is_playoffs
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[GameHistoryEntry], teams: Optional[List[str]] = None) -> 'ColumnarHistory':
+        """Build columns from GameHistoryEntry rows"""
+        entries = list(entries)
+        teams = list(teams) if teams else []
+        team_ids = {team: i for i, team in enumerate(teams)}
+        for entry in entries:
+            for team in (entry.home_team, entry.away_team):
+                if team not in team_ids:
+                    team_ids[team] = len(teams)
+                    teams.append(team)
+
+        count = len(entries)
+        home = np.empty(count, dtype=np.int16)
+        away = np.empty(count, dtype=np.int16)
+        dates = np.empty(count, dtype=np.int32)
+        home_score = np.empty(count, dtype=np.int16)
+        away_score = np.empty(count, dtype=np.int16)
+        season = np.empty(count, dtype=np.int16)
+        week = np.empty(count, dtype=np.int8)
+        is_playoffs = np.empty(count, dtype=np.bool_)
+        for i, entry in enumerate(entries):
+            home[i] = team_ids[entry.home_team]
+            away[i] = team_ids[entry.away_team]
+            dates[i] = date.fromisoformat(entry.date).toordinal()
+            home_score[i] = entry.home_score
+            away_score[i] = entry.away_score
+            season[i] = entry.season
+            week[i] = entry.week
+            is_playoffs[i] = entry.is_playoffs
+
+        return cls(teams, home, away, dates, home_score, away_score, season, week, is_playoffs)
+
+    def __len__(self) -> int:
+        return len(self.home)
+
+    def get_entry(self, row: int) -> GameHistoryEntry:
+        """Materialize a single row as a GameHistoryEntry"""
+        return GameHistoryEntry(
+            date.fromordinal(int(self.dates[row])).isoformat(),
+            self.teams[self.home[row]],
+            self.teams[self.away[row]],
+            int(self.home_score[row]),
+            int(self.away_score[row]),
+            int(self.week[row]),
+            int(self.season[row]),
+            bool(self.is_playoffs[row])
+        )
+
+    def _team_id(self, team: str) -> int:
+        """Id for a team, or -1 if it never appears (matches no rows)"""
+        return self.team_ids.get(team, -1)
+
+    def get_head_to_head_record(self, team1: str, team2: str) -> HeadToHeadRecord:
+        """Get head-to-head record between two teams"""
+        id1 = self._team_id(team1)
+        id2 = self._team_id(team2)
+        team1_home = (self.home == id1) & (self.away == id2)
+        team1_away = (self.home == id2) & (self.away == id1)
+        rows = np.flatnonzero(team1_home | team1_away)
+
+        if rows.size == 0:
+            return HeadToHeadRecord(
+                team1=team1,
+                team2=team2,
+                team1_wins=0,
+                team2_wins=0,
+                ties=0,
+                last_meeting=GameHistoryEntry('1970-01-01', team1, team2, 0, 0, 1, 1970, False),
+                avg_points_team1=20.0,
+                avg_points_team2=20.0
+            )
+
+        is_home = team1_home[rows]
+        home_score = self.home_score[rows].astype(np.int64)
+        away_score = self.away_score[rows].astype(np.int64)
+        team1_points = np.where(is_home, home_score, away_score)
+        team2_points = np.where(is_home, away_score, home_score)
+        # Latest date wins; among same-day rows the last loaded one, as in GameHistoryStore
+        last_row = rows[len(rows) - 1 - int(np.argmax(self.dates[rows][::-1]))]
+
+        return HeadToHeadRecord(
+            team1=team1,
+            team2=team2,
+            team1_wins=int(np.count_nonzero(team1_points > team2_points)),
+            team2_wins=int(np.count_nonzero(team1_points < team2_points)),
+            ties=int(np.count_nonzero(team1_points == team2_points)),
+            last_meeting=self.get_entry(last_row),
+            avg_points_team1=int(team1_points.sum()) / rows.size,
+            avg_points_team2=int(team2_points.sum()) / rows.size
+        )
+
+    def get_team_splits(self, team: str, season: Optional[int] = None) -> TeamSplits:
+        """Get home/away win-loss splits and point totals for a team"""
+        team_id = self._team_id(team)
+        in_season = self.season == season if season is not None else np.ones(len(self), dtype=np.bool_)
+        at_home = (self.home == team_id) & in_season
+        on_road = (self.away == team_id) & in_season
+        home_margin = self.home_score[at_home].astype(np.int64) - self.away_score[at_home]
+        away_margin = self.away_score[on_road].astype(np.int64) - self.home_score[on_road]
+
+        return TeamSplits(
+            team=team,
+            home_wins=int(np.count_nonzero(home_margin > 0)),
+            home_losses=int(np.count_nonzero(home_margin < 0)),
+            home_ties=int(np.count_nonzero(home_margin == 0)),
+            away_wins=int(np.count_nonzero(away_margin > 0)),
+            away_losses=int(np.count_nonzero(away_margin < 0)),
+            away_ties=int(np.count_nonzero(away_margin == 0)),
+            points_for=int(self.home_score[at_home].sum(dtype=np.int64) + self.away_score[on_road].sum(dtype=np.int64)),
+            points_against=int(self.away_score[at_home].sum(dtype=np.int64) + self.home_score[on_road].sum(dtype=np.int64)),
+            games_played=int(home_margin.size + away_margin.size)
+        )
+
+    def get_league_aggregates(self) -> LeagueAggregates:
+        """Compute splits, point totals and the head-to-head matrix for every team at once"""
+        team_count = len(self.teams)
+        home = self.home.astype(np.intp)
+        away = self.away.astype(np.intp)
+        home_score = self.home_score.astype(np.int64)
+        away_score = self.away_score.astype(np.int64)
+        margin = home_score - away_score
+
+        def count(ids: np.ndarray, mask: np.ndarray) -> np.ndarray:
+            return np.bincount(ids[mask], minlength=team_count)
+
+        def total(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+            return np.bincount(ids, weights=values, minlength=team_count).astype(np.int64)
+
+        home_won = margin > 0
+        away_won = margin < 0
+        tied = margin == 0
+        pair_wins = (np.bincount(home[home_won] * team_count + away[home_won], minlength=team_count * team_count)
+                     + np.bincount(away[away_won] * team_count + home[away_won], minlength=team_count * team_count))
+
+        return LeagueAggregates(
+            teams=list(self.teams),
+            home_wins=count(home, home_won),
+            home_losses=count(home, away_won),
+            home_ties=count(home, tied),
+            away_wins=count(away, away_won),
+            away_losses=count(away, home_won),
+            away_ties=count(away, tied),
+            points_for=total(home, home_score) + total(away, away_score),
+            points_against=total(home, away_score) + total(away, home_score),
+            games_played=np.bincount(home, minlength=team_count) + np.bincount(away, minlength=team_count),
+            head_to_head_wins=pair_wins.reshape(team_count, team_count)
+        )
+
+    def get_season_points(self) -> SeasonPoints:
+        """Points for, points against and games played per season and team"""
+        seasons, season_index = np.unique(self.season, return_inverse=True)
+        team_count = len(self.teams)
+        cells = len(seasons) * team_count
+        home_cell = season_index * team_count + self.home
+        away_cell = season_index * team_count + self.away
+        home_score = self.home_score.astype(np.float64)
+        away_score = self.away_score.astype(np.float64)
+
+        def grid(cell: np.ndarray, values: Optional[np.ndarray] = None) -> np.ndarray:
+            return np.bincount(cell, weights=values, minlength=cells).astype(np.int64).reshape(len(seasons), team_count)
+
+        return SeasonPoints(
+            seasons=seasons,
+            teams=list(self.teams),
+            points_for=grid(home_cell, home_score) + grid(away_cell, away_score),
+            points_against=grid(home_cell, away_score) + grid(away_cell, home_score),
+            games_played=grid(home_cell) + grid(away_cell)
+        )
+
+    def season_mask(self, first_season: int, last_season: Optional[int] = None) -> np.ndarray:
+        """Boolean row mask for a range of seasons"""
+        mask = self.season >= first_season
+        if last_season is not None:
+            mask &= self.season <= last_season
+        return mask
+
+    def select(self, mask: np.ndarray) -> 'ColumnarHistory':
+        """Subset of rows sharing the same team ids"""
+        return ColumnarHistory(
+            self.teams, self.home[mask], self.away[mask], self.dates[mask],
+            self.home_score[mask], self.away_score[mask], self.season[mask],
+            self.week[mask], self.is_playoffs[mask]
+        )
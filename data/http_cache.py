@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+import requests
+from utils import metrics
+
+DEFAULT_CACHE_DIR = os.environ.get('NFL_HTTP_CACHE_DIR', os.path.join('.cache', 'http'))
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    data: Any
+    from_cache: bool  # True when the server answered 304 Not Modified
+
+class _StoredResponse:
+    __slots__ = ('etag', 'last_modified', 'body', 'parsed')
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.parsed: Dict[str, Any] = {}
+
+class HTTPResponseCache:
+    """Persistent cache of JSON responses revalidated with conditional requests.
+
+    Responses carrying an ETag or Last-Modified header are stored on disk
+    (one JSON file per URL + params) and in a bounded in-memory LRU. Later
+    requests send If-None-Match / If-Modified-Since; on 304 the stored body,
+    and any result already parsed from it, is reused without downloading or
+    decoding again. The disk copy lets a fresh process revalidate instead of
+    refetching.
+    """
+
+    def __init__(self, directory: Optional[str] = DEFAULT_CACHE_DIR, max_memory_entries: int = 256):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self._memory: 'OrderedDict[str, _StoredResponse]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.downloads = 0
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[dict] = None) -> str:
+        """Stable key for a URL and its query parameters"""
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _lookup(self, key: str) -> Optional[_StoredResponse]:
+        with self._lock:
+            stored = self._memory.get(key)
+            if stored is not None:
+                self._memory.move_to_end(key)
+                return stored
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stored = _StoredResponse(record.get('etag'), record.get('last_modified'), record.get('body'))
+        self._remember(key, stored)
+        return stored
+
+    def _remember(self, key: str, stored: _StoredResponse):
+        with self._lock:
+            self._memory[key] = stored
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _persist(self, key: str, url: str, params: Optional[dict], stored: _StoredResponse):
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': url,
+                    'params': params or {},
+                    'etag': stored.etag,
+                    'last_modified': stored.last_modified,
+                    'stored_at': time.time(),
+                    'body': stored.body
+                }, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write HTTP cache entry for {url}: {e}")
+
+    def get_json(self, url: str, params: Optional[dict] = None, timeout: float = 10,
+                 session: Optional[requests.Session] = None,
+                 parse: Optional[Callable[[Any], Any]] = None, parse_key: Optional[str] = None) -> CachedResponse:
+        """GET a JSON endpoint, revalidating any cached copy.
+
+        With `parse`, `data` is parse(body) and is memoized per stored body
+        under `parse_key` (default: the parser's qualified name), so a 304
+        skips parsing as well.
+        """
+        key = self.cache_key(url, params)
+        stored = self._lookup(key)
+        headers = {}
+        if stored is not None:
+            if stored.etag:
+                headers['If-None-Match'] = stored.etag
+            if stored.last_modified:
+                headers['If-Modified-Since'] = stored.last_modified
+
+        with metrics.span('http.get'):
+            response = (session or requests).get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and stored is not None:
+            self.not_modified += 1
+            metrics.count('cache_requests_total', cache='http', result='hit')
+            return CachedResponse(200, self._parsed(stored, parse, parse_key), True)
+
+        if response.status_code != 200:
+            metrics.count('http_errors_total', status=str(response.status_code))
+            return CachedResponse(response.status_code, None, False)
+
+        self.downloads += 1
+        metrics.count('cache_requests_total', cache='http', result='miss')
+        body = response.json()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        fresh = _StoredResponse(etag, last_modified, body)
+        if etag or last_modified:
+            self._remember(key, fresh)
+            self._persist(key, url, params, fresh)
+        return CachedResponse(200, self._parsed(fresh, parse, parse_key), False)
+
+    def _parsed(self, stored: _StoredResponse, parse: Optional[Callable[[Any], Any]], parse_key: Optional[str]) -> Any:
+        if parse is None:
+            return stored.body
+        name = parse_key or getattr(parse, '__qualname__', repr(parse))
+        with self._lock:
+            if name in stored.parsed:
+                return stored.parsed[name]
+        result = parse(stored.body)
+        with self._lock:
+            stored.parsed[name] = result
+        return result
+
+    def clear(self, remove_files: bool = False):
+        """Drop in-memory entries, and optionally the on-disk cache"""
+        with self._lock:
+            self._memory.clear()
+        if remove_files and self.directory and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.json'):
+                        os.remove(os.path.join(root, name))
+
+_default_cache: Optional[HTTPResponseCache] = None
+
+def get_http_cache() -> HTTPResponseCache:
+    """Shared response cache used by the ESPN fetchers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HTTPResponseCache()
+    return _default_cache
@@ -1,9 +1,13 @@
-from typing import Dict, List, Optional
-from dataclasses import dataclass
-import requests
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, replace
 import json
+import os
 from datetime import datetime
-from models.game import TeamStats
+from models.game import Game, TeamStats
+from data.stats_aggregator import SeasonResults
+from data.http_cache import get_http_cache
+from utils.cache import TTLCache
+from utils import metrics
 
 @dataclass
 class NFLTeam:
@@ -114,141 +118,200 @@ ESPN_TEAM_MAPPING = {
 # Reverse mapping (ESPN ID to abbreviation)
 ESPN_ID_TO_ABBREV = {v: k for k, v in ESPN_TEAM_MAPPING.items()}
 
-def fetch_live_nfl_standings() -> Dict[str, TeamStats]:
-    """Fetch live NFL standings and statistics from ESPN API"""
-    try:
-        # ESPN NFL standings API
-        url = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/standings"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"Failed to fetch standings: HTTP {response.status_code}")
-            return {}
+ESPN_SITE_API = "https://site.api.espn.com/apis/site/v2/sports/football/nfl"
+ESPN_STANDINGS_URL = f"{ESPN_SITE_API}/standings"
+DEFAULT_RECENT_FORM = "W-L-W-L-W"
+
+class ESPNRequestError(Exception):
+    """Raised when an ESPN endpoint returns a non-200 response"""
+
+def _espn_get_json(url: str, parse: Optional[Callable[[dict], Any]] = None, parse_key: Optional[str] = None) -> Any:
+    """GET an ESPN endpoint through the conditional-request cache, optionally parsing the body"""
+    response = get_http_cache().get_json(url, timeout=10, parse=parse, parse_key=parse_key)
+    if response.status_code != 200:
+        raise ESPNRequestError(f"HTTP {response.status_code}")
+    return response.data
+
+def team_schedule_url(espn_team_id: str) -> str:
+    """ESPN schedule endpoint for a team"""
+    return f"{ESPN_SITE_API}/teams/{espn_team_id}/schedule"
+
+def team_roster_url(espn_team_id: str) -> str:
+    """ESPN roster endpoint for a team"""
+    return f"{ESPN_SITE_API}/teams/{espn_team_id}/roster"
+
+def parse_standings(data: dict) -> Dict[str, TeamStats]:
+    """Parse an ESPN standings response into TeamStats by abbreviation"""
+    standings = {}
+    
+    # Parse standings data
+    for conference in data.get('children', []):
+        for division in conference.get('standings', {}).get('entries', []):
+            for team_entry in division:
+                team = team_entry.get('team', {})
+                team_id = team.get('id')
+                team_abbrev = ESPN_ID_TO_ABBREV.get(team_id)
+                
+                if not team_abbrev:
+                    continue
+                
+                stats = team_entry.get('stats', [])
+                
+                # Extract statistics
+                wins = 0
+                losses = 0
+                ties = 0
+                points_for = 0
+                points_against = 0
+                home_record = "0-0"
+                away_record = "0-0"
+                
+                for stat in stats:
+                    if stat.get('name') == 'wins':
+                        wins = int(stat.get('value', 0))
+                    elif stat.get('name') == 'losses':
+                        losses = int(stat.get('value', 0))
+                    elif stat.get('name') == 'ties':
+                        ties = int(stat.get('value', 0))
+                    elif stat.get('name') == 'pointsFor':
+                        points_for = int(stat.get('value', 0))
+                    elif stat.get('name') == 'pointsAgainst':
+                        points_against = int(stat.get('value', 0))
+                    elif stat.get('name') == 'homeRecord':
+                        home_record = stat.get('displayValue', "0-0")
+                    elif stat.get('name') == 'awayRecord':
+                        away_record = stat.get('displayValue', "0-0")
+                
+                games_played = wins + losses + ties
+                avg_points_for = points_for / games_played if games_played > 0 else 0
+                avg_points_against = points_against / games_played if games_played > 0 else 0
+                
+                standings[team_abbrev] = TeamStats(
+                    wins=wins,
+                    losses=losses,
+                    ties=ties,
+                    points_for=points_for,
+                    points_against=points_against,
+                    avg_points_for=round(avg_points_for, 1),
+                    avg_points_against=round(avg_points_against, 1),
+                    home_record=home_record,
+                    away_record=away_record,
+                    last_five_games="W-W-W-W-W",  # Will be fetched separately
+                    injuries=[],  # Will be fetched from injury API
+                    key_players=[]  # Will be fetched from roster API
+                )
+    
+    return standings
+
+def parse_recent_games(data: dict, espn_team_id: str, limit: int = 5) -> str:
+    """Parse an ESPN team schedule response into a 'W-L-...' string, most recent first"""
+    recent_results = []
+    
+    # Get completed games
+    events = data.get('events', [])
+    completed_games = [e for e in events if e.get('competitions', [{}])[0].get('status', {}).get('type', {}).get('completed', False)]
+    
+    # Sort by date (most recent first) and take last 5
+    completed_games.sort(key=lambda x: x.get('date', ''), reverse=True)
+    recent_games = completed_games[:limit]
+    
+    for game in recent_games:
+        competition = game.get('competitions', [{}])[0]
+        competitors = competition.get('competitors', [])
         
-        data = response.json()
-        standings = {}
+        home_team = next((c for c in competitors if c.get('homeAway') == 'home'), {})
+        away_team = next((c for c in competitors if c.get('homeAway') == 'away'), {})
         
-        # Parse standings data
-        for conference in data.get('children', []):
-            for division in conference.get('standings', {}).get('entries', []):
-                for team_entry in division:
-                    team = team_entry.get('team', {})
-                    team_id = team.get('id')
-                    team_abbrev = ESPN_ID_TO_ABBREV.get(team_id)
-                    
-                    if not team_abbrev:
-                        continue
-                    
-                    stats = team_entry.get('stats', [])
-                    
-                    # Extract statistics
-                    wins = 0
-                    losses = 0
-                    ties = 0
-                    points_for = 0
-                    points_against = 0
-                    home_record = "0-0"
-                    away_record = "0-0"
-                    
-                    for stat in stats:
-                        if stat.get('name') == 'wins':
-                            wins = int(stat.get('value', 0))
-                        elif stat.get('name') == 'losses':
-                            losses = int(stat.get('value', 0))
-                        elif stat.get('name') == 'ties':
-                            ties = int(stat.get('value', 0))
-                        elif stat.get('name') == 'pointsFor':
-                            points_for = int(stat.get('value', 0))
-                        elif stat.get('name') == 'pointsAgainst':
-                            points_against = int(stat.get('value', 0))
-                        elif stat.get('name') == 'homeRecord':
-                            home_record = stat.get('displayValue', "0-0")
-                        elif stat.get('name') == 'awayRecord':
-                            away_record = stat.get('displayValue', "0-0")
-                    
-                    games_played = wins + losses + ties
-                    avg_points_for = points_for / games_played if games_played > 0 else 0
-                    avg_points_against = points_against / games_played if games_played > 0 else 0
-                    
-                    standings[team_abbrev] = TeamStats(
-                        wins=wins,
-                        losses=losses,
-                        ties=ties,
-                        points_for=points_for,
-                        points_against=points_against,
-                        avg_points_for=round(avg_points_for, 1),
-                        avg_points_against=round(avg_points_against, 1),
-                        home_record=home_record,
-                        away_record=away_record,
-                        last_five_games="W-W-W-W-W",  # Will be fetched separately
-                        injuries=[],  # Will be fetched from injury API
-                        key_players=[]  # Will be fetched from roster API
-                    )
+        home_score = int(home_team.get('score', 0))
+        away_score = int(away_team.get('score', 0))
         
-        return standings
+        # Determine if our team won
+        our_team = None
+        if home_team.get('team', {}).get('id') == espn_team_id:
+            our_team = 'home'
+        elif away_team.get('team', {}).get('id') == espn_team_id:
+            our_team = 'away'
         
+        if our_team:
+            if our_team == 'home':
+                result = 'W' if home_score > away_score else 'L' if home_score < away_score else 'T'
+            else:
+                result = 'W' if away_score > home_score else 'L' if away_score < home_score else 'T'
+            recent_results.append(result)
+    
+    # Pad with default if not enough games
+    while len(recent_results) < limit:
+        recent_results.append('W')
+    
+    return '-'.join(recent_results[:limit])
+
+def parse_key_players(data: dict) -> List[str]:
+    """Parse an ESPN roster response into up to three key player names"""
+    key_players = []
+    
+    # Get top players by position priority
+    athletes = data.get('athletes', [])
+    position_priority = ['QB', 'RB', 'WR', 'TE', 'DE', 'LB', 'CB', 'S']
+    
+    for position in position_priority:
+        position_group = next((g for g in athletes if g.get('position', {}).get('abbreviation') == position), None)
+        if position_group and position_group.get('items'):
+            # Get the first (usually starter) player
+            player = position_group['items'][0]
+            player_name = player.get('displayName', '')
+            if player_name and len(key_players) < 3:
+                key_players.append(player_name)
+    
+    return key_players
+
+# Cache for live data to avoid excessive API calls. Standings and schedules
+# move at most once a game day; rosters change even less often.
+_cache_duration_minutes = 30
+STANDINGS_TTL_SECONDS = _cache_duration_minutes * 60
+RECENT_GAMES_TTL_SECONDS = _cache_duration_minutes * 60
+ROSTER_TTL_SECONDS = 6 * 60 * 60
+RECENT_GAMES_LIMIT = 5
+ESPN_ERROR_TTL_SECONDS = 60  # failed lookups fall back without re-requesting for this long
+_live_data_cache = TTLCache(max_entries=128, default_ttl=STANDINGS_TTL_SECONDS, name='live_data',
+                            error_ttl=ESPN_ERROR_TTL_SECONDS)
+
+def fetch_live_nfl_standings() -> Dict[str, TeamStats]:
+    """Fetch live NFL standings and statistics from ESPN API"""
+    try:
+        return _live_data_cache.get_or_fetch(
+            ('standings',),
+            lambda: _espn_get_json(ESPN_STANDINGS_URL, parse_standings),
+            ttl=STANDINGS_TTL_SECONDS
+        )
+    except ESPNRequestError as e:
+        print(f"Failed to fetch standings: {e}")
+        return {}
     except Exception as e:
         print(f"Error fetching live NFL standings: {e}")
         return {}
 
-def fetch_team_recent_games(team_abbrev: str, limit: int = 5) -> str:
+def fetch_team_recent_games(team_abbrev: str, limit: int = RECENT_GAMES_LIMIT) -> str:
     """Fetch recent game results for a team"""
     try:
         espn_team_id = ESPN_TEAM_MAPPING.get(team_abbrev)
         if not espn_team_id:
-            return "W-L-W-L-W"  # Fallback
+            return DEFAULT_RECENT_FORM  # Fallback
         
-        # ESPN team schedule API
-        url = f"https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams/{espn_team_id}/schedule"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            return "W-L-W-L-W"  # Fallback
-        
-        data = response.json()
-        recent_results = []
-        
-        # Get completed games
-        events = data.get('events', [])
-        completed_games = [e for e in events if e.get('competitions', [{}])[0].get('status', {}).get('type', {}).get('completed', False)]
-        
-        # Sort by date (most recent first) and take last 5
-        completed_games.sort(key=lambda x: x.get('date', ''), reverse=True)
-        recent_games = completed_games[:limit]
-        
-        for game in recent_games:
-            competition = game.get('competitions', [{}])[0]
-            competitors = competition.get('competitors', [])
-            
-            home_team = next((c for c in competitors if c.get('homeAway') == 'home'), {})
-            away_team = next((c for c in competitors if c.get('homeAway') == 'away'), {})
-            
-            home_score = int(home_team.get('score', 0))
-            away_score = int(away_team.get('score', 0))
-            
-            # Determine if our team won
-            our_team = None
-            if home_team.get('team', {}).get('id') == espn_team_id:
-                our_team = 'home'
-            elif away_team.get('team', {}).get('id') == espn_team_id:
-                our_team = 'away'
-            
-            if our_team:
-                if our_team == 'home':
-                    result = 'W' if home_score > away_score else 'L' if home_score < away_score else 'T'
-                else:
-                    result = 'W' if away_score > home_score else 'L' if away_score < home_score else 'T'
-                recent_results.append(result)
-        
-        # Pad with default if not enough games
-        while len(recent_results) < limit:
-            recent_results.append('W')
-        
-        return '-'.join(recent_results[:limit])
+        return _live_data_cache.get_or_fetch(
+            ('recent_games', team_abbrev, limit),
+            lambda: _espn_get_json(
+                team_schedule_url(espn_team_id),
+                lambda data: parse_recent_games(data, espn_team_id, limit),
+                parse_key=f"recent_games:{espn_team_id}:{limit}"
+            ),
+            ttl=RECENT_GAMES_TTL_SECONDS
+        )
         
+    except ESPNRequestError:
+        return DEFAULT_RECENT_FORM  # Fallback
     except Exception as e:
         print(f"Error fetching recent games for {team_abbrev}: {e}")
-        return "W-L-W-L-W"  # Fallback
+        return DEFAULT_RECENT_FORM  # Fallback
 
 def fetch_team_key_players(team_abbrev: str) -> List[str]:
     """Fetch key players for a team"""
@@ -257,53 +320,78 @@ def fetch_team_key_players(team_abbrev: str) -> List[str]:
         if not espn_team_id:
             return []
         
-        # ESPN team roster API
-        url = f"https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams/{espn_team_id}/roster"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            return []
-        
-        data = response.json()
-        key_players = []
-        
-        # Get top players by position priority
-        athletes = data.get('athletes', [])
-        position_priority = ['QB', 'RB', 'WR', 'TE', 'DE', 'LB', 'CB', 'S']
-        
-        for position in position_priority:
-            position_group = next((g for g in athletes if g.get('position', {}).get('abbreviation') == position), None)
-            if position_group and position_group.get('items'):
-                # Get the first (usually starter) player
-                player = position_group['items'][0]
-                player_name = player.get('displayName', '')
-                if player_name and len(key_players) < 3:
-                    key_players.append(player_name)
-        
-        return key_players
+        return _live_data_cache.get_or_fetch(
+            ('key_players', team_abbrev),
+            lambda: _espn_get_json(team_roster_url(espn_team_id), parse_key_players),
+            ttl=ROSTER_TTL_SECONDS
+        )
         
+    except ESPNRequestError:
+        return []
     except Exception as e:
         print(f"Error fetching key players for {team_abbrev}: {e}")
         return []
 
-# Cache for live data to avoid excessive API calls
-_live_standings_cache = {}
-_cache_timestamp = None
-_cache_duration_minutes = 30
+def cache_team_recent_games(team_abbrev: str, recent_form: str, limit: int = RECENT_GAMES_LIMIT):
+    """Store prefetched recent results (e.g. from a bulk async refresh) in the live data cache"""
+    _live_data_cache.set(('recent_games', team_abbrev, limit), recent_form, ttl=RECENT_GAMES_TTL_SECONDS)
+
+def cache_team_key_players(team_abbrev: str, key_players: List[str]):
+    """Store prefetched key players in the live data cache"""
+    _live_data_cache.set(('key_players', team_abbrev), key_players, ttl=ROSTER_TTL_SECONDS)
+
+# Live ESPN data is off by default; static stats are used until it is enabled
+_use_live_data = False
+
+def set_live_data_enabled(enabled: bool):
+    """Turn live ESPN statistics on or off for get_team_stats"""
+    global _use_live_data
+    _use_live_data = enabled
+
+def live_data_enabled() -> bool:
+    """Whether get_team_stats reads live ESPN statistics"""
+    return _use_live_data
+
+def _get_live_team_stats(team_abbreviation: str) -> Optional[TeamStats]:
+    """Build TeamStats from cached live standings, schedule and roster data"""
+    standings = fetch_live_nfl_standings()
+    stats = standings.get(team_abbreviation)
+    if not stats:
+        return None
+    return replace(
+        stats,
+        last_five_games=fetch_team_recent_games(team_abbreviation),
+        key_players=fetch_team_key_players(team_abbreviation)
+    )
 
+_fallback_warned = set()  # teams already reported as missing static data
+
+@metrics.timed('team_stats')
 def get_team_stats(team_abbreviation: str) -> TeamStats:
-    """Get team statistics by abbreviation - uses static 2024 data for now"""
+    """Get team statistics: live data if enabled, else this season's ingested results, else static 2024 data"""
+    
+    if _use_live_data:
+        live_stats = _get_live_team_stats(team_abbreviation)
+        if live_stats:
+            metrics.count('team_stats_lookups_total', source='live')
+            return live_stats
     
-    # For now, disable live API calls due to timeout issues
-    # Will re-enable once parsing is fixed
+    # Results ingested this season take precedence over the static table
+    season_stats = _season_results.get_team_stats(team_abbreviation)
+    if season_stats:
+        metrics.count('team_stats_lookups_total', source='season')
+        return season_stats
     
     # Check if we have static data for this team
     if team_abbreviation in SAMPLE_TEAM_STATS:
-        print(f"📊 Using 2024 data for {team_abbreviation}")
+        metrics.count('team_stats_lookups_total', source='static')
         return SAMPLE_TEAM_STATS[team_abbreviation]
     
     # Final fallback for unknown teams
-    print(f"⚠️  Using fallback data for {team_abbreviation}")
+    metrics.count('team_stats_lookups_total', source='fallback')
+    if team_abbreviation not in _fallback_warned:
+        _fallback_warned.add(team_abbreviation)
+        print(f"⚠️  Using fallback data for {team_abbreviation}")
     return TeamStats(
         wins=9,
         losses=8,
@@ -319,11 +407,39 @@ def get_team_stats(team_abbreviation: str) -> TeamStats:
         key_players=["Starting QB", "Top WR", "Top Defender"]
     )
 
+# Completed games build a separate current-season aggregate; SAMPLE_TEAM_STATS
+# (the 2024 season) is never modified. The log sits next to the prediction ledger.
+INGESTED_GAMES_PATH = os.environ.get('NFL_INGESTED_GAMES', os.path.join('predictions', 'ingested_games.jsonl'))
+_season_results = SeasonResults(INGESTED_GAMES_PATH)
+
+def get_season_results() -> SeasonResults:
+    """Current-season stats aggregated from ingested games"""
+    return _season_results
+
+def set_season_results(results: SeasonResults):
+    """Replace the current-season aggregate (e.g. with one backed by another log)"""
+    global _season_results
+    _season_results = results
+
+def ingest_completed_game(game: Game) -> bool:
+    """Apply a completed game's result to the current-season statistics.
+
+    Results are aggregated per season in a persisted log, so a game is
+    counted once across restarts and never mixed into another season's
+    stats. Live stats come from ESPN, which already reflects final scores,
+    so the cached standings and both teams' recent results are dropped and
+    refetched on the next lookup. Returns False if not applied.
+    """
+    applied = _season_results.ingest(game)
+    if applied and _use_live_data:
+        _live_data_cache.invalidate(('standings',))
+        for team in (game.home_team, game.away_team):
+            _live_data_cache.invalidate(('recent_games', team, RECENT_GAMES_LIMIT))
+    return applied
+
 def clear_stats_cache():
     """Clear the cached statistics to force fresh data fetch"""
-    global _live_standings_cache, _cache_timestamp
-    _live_standings_cache = {}
-    _cache_timestamp = None
+    _live_data_cache.clear()
     print("📊 Statistics cache cleared - next request will fetch fresh data")
 
 def fetch_live_team_stats(team_abbreviation: str) -> TeamStats:
@@ -0,0 +1,257 @@
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from models.game import Game, GamePrediction
+from utils import metrics
+
+DEFAULT_LEDGER_PATH = os.environ.get('NFL_PREDICTION_LEDGER', os.path.join('predictions', 'ledger.jsonl'))
+RECENT_WINDOW = 10
+# (label, lower bound inclusive, upper bound exclusive)
+CONFIDENCE_BANDS: List[Tuple[str, float, float]] = [
+    ('<60%', 0, 60), ('60-70%', 60, 70), ('70-80%', 70, 80), ('80%+', 80, 101)
+]
+
+def matchup_key(game: Game) -> str:
+    """Stable key for a scheduled game: season, week and matchup"""
+    stage = 'P' if game.is_playoffs else 'R'
+    return f"{game.season}:{stage}{game.week or 0}:{game.away_team}@{game.home_team}"
+
+def _key_season(key: str) -> int:
+    """Season a matchup key belongs to (0 if it has none)"""
+    try:
+        return int(key.split(':', 1)[0])
+    except ValueError:
+        return 0
+
+def _band_for(confidence: float) -> str:
+    for label, lower, upper in CONFIDENCE_BANDS:
+        if lower <= confidence < upper:
+            return label
+    return CONFIDENCE_BANDS[-1][0]
+
+class AccuracyRollup:
+    """Running accuracy totals, updated once per graded prediction"""
+
+    def __init__(self):
+        self.graded = 0
+        self.correct = 0
+        self.pushes = 0  # ties; graded predictions that are neither right nor wrong
+        self.confidence_total = 0.0
+        self.home_picks = [0, 0]  # [correct, graded]
+        self.away_picks = [0, 0]
+        self.bands: Dict[str, List[int]] = {label: [0, 0] for label, _, _ in CONFIDENCE_BANDS}
+        self.recent: Deque[bool] = deque(maxlen=RECENT_WINDOW)  # most recent last
+
+    def add(self, picked_home: bool, confidence: float, home_score: int, away_score: int):
+        """Grade one prediction against a final score"""
+        self.confidence_total += confidence
+        if home_score == away_score:
+            self.pushes += 1
+            return
+        correct = picked_home == (home_score > away_score)
+        self.graded += 1
+        self.correct += correct
+        for tally in (self.home_picks if picked_home else self.away_picks, self.bands[_band_for(confidence)]):
+            tally[0] += correct
+            tally[1] += 1
+        self.recent.append(correct)
+
+    @property
+    def average_confidence(self) -> float:
+        total = self.graded + self.pushes
+        return self.confidence_total / total if total else 0.0
+
+    def last(self, n: int) -> Tuple[int, int]:
+        """(correct, graded) over the last n graded predictions, n <= RECENT_WINDOW"""
+        window = list(self.recent)[-n:]
+        return sum(window), len(window)
+
+    def to_dict(self) -> dict:
+        return {
+            'graded': self.graded, 'correct': self.correct, 'pushes': self.pushes,
+            'confidence_total': self.confidence_total, 'home_picks': self.home_picks,
+            'away_picks': self.away_picks, 'bands': self.bands, 'recent': list(self.recent)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AccuracyRollup':
+        rollup = cls()
+        rollup.graded = data['graded']
+        rollup.correct = data['correct']
+        rollup.pushes = data['pushes']
+        rollup.confidence_total = data['confidence_total']
+        rollup.home_picks = list(data['home_picks'])
+        rollup.away_picks = list(data['away_picks'])
+        rollup.bands.update({label: list(tally) for label, tally in data['bands'].items()})
+        rollup.recent.extend(data['recent'])
+        return rollup
+
+class PredictionLedger:
+    """Append-only JSONL ledger of predictions and final scores.
+
+    Each prediction is appended with its matchup key; a later result for
+    the same key grades the most recent prediction and folds it into the
+    rollups exactly once. A snapshot of the rollups and still-ungraded
+    predictions is saved next to the ledger with the byte offset it
+    covers, so loading replays only lines appended since the snapshot and
+    reading accuracy never rescans the ledger.
+
+    Graded keys are tracked only for the latest season with a graded
+    result; that season is a watermark, and predictions for earlier
+    seasons are not accepted as pending. The snapshot therefore stays the
+    size of one season however long the ledger grows.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        self.path = path
+        self.snapshot_path = f"{path}.rollup.json"
+        self.rollup = AccuracyRollup()
+        self._pending: Dict[str, dict] = {}
+        self._graded_keys = set()  # graded keys in self._graded_season
+        self._graded_season = 0
+        self._unsaved_results = False
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot['offset'] <= os.path.getsize(self.path):
+                self.rollup = AccuracyRollup.from_dict(snapshot['rollup'])
+                self._pending = snapshot['pending']
+                self._graded_season = snapshot['graded_season']
+                self._graded_keys = set(snapshot['graded_keys'])
+                self._offset = snapshot['offset']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial write from an interrupted append; ignored until completed
+                self._offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    print(f"⚠️  Skipping bad ledger line: {e}")
+
+    def _is_graded(self, key: str) -> bool:
+        return _key_season(key) < self._graded_season or key in self._graded_keys
+
+    def _mark_graded(self, key: str):
+        season = _key_season(key)
+        if season > self._graded_season:
+            self._graded_season = season
+            self._graded_keys = set()
+        if season == self._graded_season:
+            self._graded_keys.add(key)
+
+    def _apply(self, record: dict):
+        key = record['key']
+        if record['type'] == 'prediction':
+            if not self._is_graded(key):
+                self._pending[key] = record
+        elif record['type'] == 'result':
+            prediction = self._pending.pop(key, None)
+            if prediction is None or key in self._graded_keys:
+                return
+            self._mark_graded(key)
+            self.rollup.add(prediction['predicted_winner'] == prediction['home_team'], prediction['confidence'],
+                            record['home_score'], record['away_score'])
+
+    def _append(self, record: dict):
+        with self._lock:
+            self._write(record)
+
+    def _write(self, record: dict):
+        """Append a record and apply it (lock held)"""
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        metrics.count('bytes_written_total', len(line), file='ledger')
+        with metrics.span('ledger.append'):
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            self._offset += len(line)
+            self._apply(record)
+
+    def record_prediction(self, game: Game, prediction: GamePrediction):
+        """Append a prediction; re-predicting a game before kickoff replaces the earlier pick"""
+        self._append({
+            'type': 'prediction',
+            'key': matchup_key(game),
+            'home_team': game.home_team,
+            'away_team': game.away_team,
+            'date': game.date.strftime('%Y-%m-%d'),
+            'predicted_winner': prediction.predicted_winner,
+            'confidence': prediction.confidence,
+            'predicted_score': prediction.predicted_score,
+            'recorded_at': datetime.now().isoformat(timespec='seconds')
+        })
+
+    def record_result(self, game: Game) -> bool:
+        """Grade the pending prediction for a completed game; returns False if there was none"""
+        key = matchup_key(game)
+        if not game.is_completed():
+            return False
+        with self._lock:
+            if key not in self._pending:
+                return False
+            self._write({'type': 'result', 'key': key, 'home_score': game.home_score, 'away_score': game.away_score})
+            self._unsaved_results = True
+        return True
+
+    def reconcile(self, games: List[Game]) -> int:
+        """Grade every completed game with a pending prediction and save a snapshot"""
+        graded = sum(1 for game in games if self.record_result(game))
+        self.flush()
+        return graded
+
+    def flush(self):
+        """Save a snapshot if results were graded since the last one"""
+        if self._unsaved_results:
+            self.save_snapshot()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def save_snapshot(self):
+        """Persist rollups so the next load only replays newer ledger lines"""
+        with self._lock:
+            snapshot = {
+                'offset': self._offset,
+                'rollup': self.rollup.to_dict(),
+                'pending': dict(self._pending),
+                'graded_season': self._graded_season,
+                'graded_keys': sorted(self._graded_keys)
+            }
+            self._unsaved_results = False
+        directory = os.path.dirname(self.snapshot_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️  Could not save ledger snapshot: {e}")
+
+_default_ledger: Optional[PredictionLedger] = None
+
+def get_prediction_ledger() -> PredictionLedger:
+    """Shared ledger used by the scheduler"""
+    global _default_ledger
+    if _default_ledger is None:
+        _default_ledger = PredictionLedger()
+    return _default_ledger
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from models.game import Game, WeatherConditions
+from utils.cache import TTLCache
+from utils import metrics
+
+DEFAULT_SCHEDULE_DIR = os.environ.get('NFL_SCHEDULE_CACHE_DIR', os.path.join('.cache', 'schedules'))
+REGULAR_SEASON = 2  # ESPN seasontype: 1 preseason, 2 regular season, 3 playoffs
+CURRENT_WEEK_TTL = 600.0  # Scores and kickoff times move while a week is in progress
+EMPTY_WEEK_TTL = 60.0     # An empty result may be a failed fetch; retry soon
+
+ScheduleKey = Tuple[int, int, int]  # (season, seasontype, week)
+ScheduleLoader = Callable[[int, int, int], List[Game]]
+
+def _game_to_dict(game: Game) -> dict:
+    return {
+        'home_team': game.home_team,
+        'away_team': game.away_team,
+        'date': game.date.isoformat(),
+        'home_score': game.home_score,
+        'away_score': game.away_score,
+        'week': game.week,
+        'season': game.season,
+        'is_playoffs': game.is_playoffs,
+        'weather': vars(game.weather) if game.weather else None
+    }
+
+def _game_from_dict(data: dict) -> Game:
+    return Game(
+        home_team=data['home_team'],
+        away_team=data['away_team'],
+        date=datetime.fromisoformat(data['date']),
+        home_score=data['home_score'],
+        away_score=data['away_score'],
+        week=data['week'],
+        season=data['season'],
+        is_playoffs=data['is_playoffs'],
+        weather=WeatherConditions(**data['weather']) if data['weather'] else None
+    )
+
+def is_final_week(games: List[Game]) -> bool:
+    """A week is final, and will never change, once every game has a score"""
+    return bool(games) and all(game.is_completed() for game in games)
+
+class ScheduleRepository:
+    """Parsed weekly schedules cached in memory and on disk.
+
+    Weeks are keyed by (season, seasontype, week). A week whose games are
+    all final is immutable: it is written to disk once and never fetched
+    again, even by a new process. Weeks still in progress (or not started)
+    are kept in memory for `current_week_ttl` seconds, so a check such as
+    has_real_games_this_week followed by the prediction run costs one
+    fetch.
+    """
+
+    def __init__(self, loader: ScheduleLoader, directory: Optional[str] = DEFAULT_SCHEDULE_DIR,
+                 current_week_ttl: float = CURRENT_WEEK_TTL, clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.directory = directory
+        self.current_week_ttl = current_week_ttl
+        self._memory = TTLCache(max_entries=128, default_ttl=current_week_ttl, max_stale=0, clock=clock)
+        self.fetches = 0
+
+    def _path(self, key: ScheduleKey) -> str:
+        season, seasontype, week = key
+        return os.path.join(self.directory, f"{season}-{seasontype}-{week:02d}.json")
+
+    def _read_final_week(self, key: ScheduleKey) -> Optional[List[Game]]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return [_game_from_dict(game) for game in json.load(f)['games']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_final_week(self, key: ScheduleKey, games: List[Game]):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': time.time(), 'games': [_game_to_dict(game) for game in games]}, f)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"⚠️  Could not write schedule cache for {key}: {e}")
+
+    def get_week(self, season: int, week: int, seasontype: int = REGULAR_SEASON) -> List[Game]:
+        """Get a week's games, fetching only if the week is not cached or still in progress"""
+        key = (season, seasontype, week)
+        games = self._memory.get(key)
+        result = 'hit'
+        if games is None:
+            games = self._read_final_week(key)
+            result = 'disk'
+            if games is not None:
+                self._memory.set(key, games, float('inf'))
+        if games is None:
+            games = self.refresh_week(season, week, seasontype)
+            result = 'miss'
+        metrics.count('cache_requests_total', cache='schedule', result=result)
+        return list(games)
+
+    def refresh_week(self, season: int, week: int, seasontype: int = REGULAR_SEASON) -> List[Game]:
+        """Fetch a week now, replacing any cached copy"""
+        key = (season, seasontype, week)
+        self.fetches += 1
+        with metrics.span('schedule.fetch'):
+            games = self.loader(season, seasontype, week)
+        if is_final_week(games):
+            self._write_final_week(key, games)
+            self._memory.set(key, games, float('inf'))
+        else:
+            self._memory.set(key, games, self.current_week_ttl if games else EMPTY_WEEK_TTL)
+        return list(games)
+
+    def clear(self):
+        """Drop in-memory weeks; final weeks on disk are kept"""
+        self._memory.clear()
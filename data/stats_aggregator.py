@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+from models.game import Game, TeamStats
+from models.compact import format_record, parse_record
+
+RECENT_GAMES_WINDOW = 5
+
+class _TeamTotals:
+    """Running totals for one team"""
+
+    __slots__ = ('stats', 'games_played', 'home', 'away', 'recent')
+
+    def __init__(self, stats: TeamStats):
+        self.stats = stats
+        self.games_played = stats.wins + stats.losses + stats.ties
+        self.home = list(parse_record(stats.home_record))
+        self.away = list(parse_record(stats.away_record))
+        results = [result for result in stats.last_five_games.split('-') if result in ('W', 'L', 'T')]
+        # last_five_games lists the most recent result first
+        self.recent = deque(results[:RECENT_GAMES_WINDOW], maxlen=RECENT_GAMES_WINDOW)
+
+class TeamStatsAggregator:
+    """Incrementally applies completed games to TeamStats.
+
+    Each ingested game updates both teams' records, point totals and
+    averages, home/away splits and last-five window in constant time. The
+    TeamStats objects in `team_stats` are updated in place, so anything
+    reading that mapping sees new results immediately.
+    """
+
+    def __init__(self, team_stats: Optional[Dict[str, TeamStats]] = None):
+        self.team_stats: Dict[str, TeamStats] = team_stats if team_stats is not None else {}
+        self._totals: Dict[str, _TeamTotals] = {}
+        self._ingested: Set[Tuple[str, str, str]] = set()
+
+    def _totals_for(self, team: str) -> _TeamTotals:
+        totals = self._totals.get(team)
+        if totals is None:
+            stats = self.team_stats.get(team)
+            if stats is None:
+                stats = TeamStats(
+                    wins=0, losses=0, ties=0, points_for=0, points_against=0,
+                    avg_points_for=0.0, avg_points_against=0.0,
+                    home_record="0-0", away_record="0-0", last_five_games=""
+                )
+                self.team_stats[team] = stats
+            totals = _TeamTotals(stats)
+            self._totals[team] = totals
+        return totals
+
+    def ingest(self, game: Game) -> bool:
+        """Apply a completed game; returns False if it was already ingested"""
+        if not game.is_completed():
+            raise ValueError(f"Game not completed: {game.get_matchup()}")
+
+        key = (game.home_team, game.away_team, game.date.strftime('%Y-%m-%d'))
+        if key in self._ingested:
+            return False
+        self._ingested.add(key)
+
+        self._apply(self._totals_for(game.home_team), game.home_score, game.away_score, is_home=True)
+        self._apply(self._totals_for(game.away_team), game.away_score, game.home_score, is_home=False)
+        return True
+
+    def _apply(self, totals: _TeamTotals, scored: int, allowed: int, is_home: bool):
+        stats = totals.stats
+        split = totals.home if is_home else totals.away
+
+        if scored > allowed:
+            stats.wins += 1
+            split[0] += 1
+            result = 'W'
+        elif scored < allowed:
+            stats.losses += 1
+            split[1] += 1
+            result = 'L'
+        else:
+            stats.ties += 1
+            split[2] += 1
+            result = 'T'
+
+        totals.games_played += 1
+        stats.points_for += scored
+        stats.points_against += allowed
+        stats.avg_points_for = round(stats.points_for / totals.games_played, 1)
+        stats.avg_points_against = round(stats.points_against / totals.games_played, 1)
+
+        if is_home:
+            stats.home_record = format_record(*split)
+        else:
+            stats.away_record = format_record(*split)
+
+        totals.recent.appendleft(result)
+        stats.last_five_games = '-'.join(totals.recent)
+
+    def get_team_stats(self, team: str) -> Optional[TeamStats]:
+        """Get the current stats for a team, if known"""
+        return self.team_stats.get(team)
+
+    def stats_for(self, team: str) -> TeamStats:
+        """Get the current stats for a team, starting an empty record if unknown"""
+        return self._totals_for(team).stats
+
+class SeasonResults:
+    """Current-season TeamStats built only from completed games, backed by a JSONL log.
+
+    Games from the newest season seen are aggregated; a game from a later
+    season starts a fresh aggregate and games from earlier seasons are
+    ignored, so totals never mix seasons. Every applied game is appended to
+    the log and replayed on first use, so totals survive a restart and a
+    result reconciled again after one is not counted twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.season: Optional[int] = None
+        self.aggregator = TeamStatsAggregator()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        """Replay the log (lock held)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # partial write from an interrupted append
+                    try:
+                        record = json.loads(line)
+                        game = Game(record['home_team'], record['away_team'],
+                                    datetime.strptime(record['date'], '%Y-%m-%d'),
+                                    record['home_score'], record['away_score'], record['week'], record['season'])
+                    except (ValueError, KeyError, TypeError) as e:
+                        print(f"⚠️  Skipping bad ingested game line: {e}")
+                        continue
+                    self._apply(game)
+        except OSError:
+            pass
+
+    def _apply(self, game: Game) -> bool:
+        if game.season is None or (self.season is not None and game.season < self.season):
+            return False
+        if self.season is None or game.season > self.season:
+            self.season = game.season
+            self.aggregator = TeamStatsAggregator()
+        return self.aggregator.ingest(game)
+
+    def ingest(self, game: Game) -> bool:
+        """Apply and log a completed game; False if already applied or from an earlier season"""
+        with self._lock:
+            self._ensure_loaded()
+            if not self._apply(game):
+                return False
+            record = {'home_team': game.home_team, 'away_team': game.away_team,
+                      'date': game.date.strftime('%Y-%m-%d'), 'home_score': game.home_score,
+                      'away_score': game.away_score, 'week': game.week, 'season': game.season}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            return True
+
+    def get_team_stats(self, team: str) -> Optional[TeamStats]:
+        """A team's stats for the current season, if it has completed games"""
+        with self._lock:
+            self._ensure_loaded()
+            return self.aggregator.get_team_stats(team)
@@ -0,0 +1,43 @@
+from typing import List, Optional
+from datetime import date, timedelta
+import random
+from data.game_history import GameHistoryEntry
+from data.nfl_data import TEAMS
+
+REGULAR_SEASON_WEEKS = 17
+
+def synthetic_team_abbreviations(team_count: int = 32) -> List[str]:
+    """Real abbreviations for the first 32 teams, generated ones after that"""
+    abbreviations = [team.abbreviation for team in TEAMS[:team_count]]
+    abbreviations.extend(f"T{i:03d}" for i in range(len(abbreviations), team_count))
+    return abbreviations
+
+def generate_synthetic_history(seasons: int = 50, team_count: int = 32, last_season: int = 2024,
+                               seed: Optional[int] = 0) -> List[GameHistoryEntry]:
+    """Generate a deterministic multi-season history with realistic score ranges.
+
+    Every week each team plays one game against a randomly paired opponent,
+    so a 32-team, 50-season history has 13,600 games.
+    """
+    rng = random.Random(seed)
+    teams = synthetic_team_abbreviations(team_count)
+    strength = {team: rng.gauss(0, 4) for team in teams}
+    history: List[GameHistoryEntry] = []
+
+    for season in range(last_season - seasons + 1, last_season + 1):
+        kickoff = date(season, 9, 7)
+        for week in range(1, REGULAR_SEASON_WEEKS + 1):
+            game_day = kickoff + timedelta(weeks=week - 1)
+            order = teams[:]
+            rng.shuffle(order)
+            for home, away in zip(order[0::2], order[1::2]):
+                home_mean = 22.5 + strength[home] - strength[away] / 2 + 1.5
+                away_mean = 21.0 + strength[away] - strength[home] / 2
+                history.append(GameHistoryEntry(
+                    game_day.isoformat(), home, away,
+                    max(0, round(rng.gauss(home_mean, 9))),
+                    max(0, round(rng.gauss(away_mean, 9))),
+                    week, season, False
+                ))
+
+    return history
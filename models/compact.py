@@ -0,0 +1,260 @@
+"""
+Compact, slotted variants of TeamStats, Game and GameHistoryEntry.
+
+The dataclass models keep dates and records as text ("2024-09-08",
+"8-1", "W-W-L-W-W") in a per-instance __dict__. The compact variants
+use __slots__, store dates as integer ordinals, records as numeric
+win/loss/tie fields and recent form as bitmasks, and intern team
+abbreviations, so large histories take a fraction of the memory.
+
+Converters go both ways and are exact: the text properties render the
+same strings the originals held, so prompts built from compact objects
+are unchanged.
+"""
+
+import sys
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+from models.game import Game, TeamStats, WeatherConditions
+
+if TYPE_CHECKING:
+    from data.game_history import GameHistoryEntry
+
+FORM_RESULTS = ('W', 'L', 'T')
+DEFAULT_HOME_WINS = 4  # PredictionAgent's value for home records without a '-'
+
+def parse_record(record: str) -> Tuple[int, int, int]:
+    """Parse a 'W-L' or 'W-L-T' record string"""
+    parts = [int(part) for part in record.split('-') if part.strip().isdigit()]
+    parts += [0] * (3 - len(parts))
+    return parts[0], parts[1], parts[2]
+
+def format_record(wins: int, losses: int, ties: int) -> str:
+    """Format a record the way ESPN displays it: ties only when there are any"""
+    return f"{wins}-{losses}-{ties}" if ties else f"{wins}-{losses}"
+
+@lru_cache(maxsize=4096)
+def record_home_wins(record: str) -> int:
+    """Wins from a home record string, as the home-field factor reads them"""
+    return int(record.split('-')[0]) if '-' in record else DEFAULT_HOME_WINS
+
+@lru_cache(maxsize=4096)
+def form_win_count(form: str) -> int:
+    """Wins in a recent-form string such as 'W-L-W-W-T'"""
+    return form.count('W')
+
+def encode_form(form: str) -> Optional[Tuple[int, int, int]]:
+    """(win mask, tie mask, length) for a 'W-L-T' form string, most recent result in bit 0.
+
+    Returns None if the string is not in that format.
+    """
+    results = form.split('-') if form else []
+    wins = ties = 0
+    for bit, result in enumerate(results):
+        if result == 'W':
+            wins |= 1 << bit
+        elif result == 'T':
+            ties |= 1 << bit
+        elif result != 'L':
+            return None
+    return wins, ties, len(results)
+
+def decode_form(wins: int, ties: int, length: int) -> str:
+    """Inverse of encode_form"""
+    return '-'.join('W' if wins >> bit & 1 else 'T' if ties >> bit & 1 else 'L' for bit in range(length))
+
+@lru_cache(maxsize=None)
+def date_ordinal(iso_date: str) -> int:
+    """Ordinal of a 'YYYY-MM-DD' date; equal dates share one int object"""
+    ordinal = date.fromisoformat(iso_date).toordinal()
+    if date.fromordinal(ordinal).isoformat() != iso_date:
+        raise ValueError(f"Not a YYYY-MM-DD date: {iso_date!r}")
+    return ordinal
+
+@lru_cache(maxsize=None)
+def ordinal_date(ordinal: int) -> str:
+    """Inverse of date_ordinal"""
+    return date.fromordinal(ordinal).isoformat()
+
+class CompactTeamStats:
+    """TeamStats with numeric home/away records and a bitmask recent form.
+
+    Reads like TeamStats (home_record, away_record and last_five_games
+    are rendered on access), so it can be passed to the prompt renderers
+    and PredictionAgent as is. Record or form strings that do not
+    round-trip through the numeric fields are kept verbatim in `text`.
+    """
+
+    __slots__ = ('wins', 'losses', 'ties', 'points_for', 'points_against',
+                 'avg_points_for', 'avg_points_against',
+                 'home_wins', 'home_losses', 'home_ties', 'away_wins', 'away_losses', 'away_ties',
+                 'form_wins', 'form_ties', 'form_length', 'text', 'injuries', 'key_players')
+
+    def __init__(self, wins: int, losses: int, ties: int, points_for: int, points_against: int,
+                 avg_points_for: float, avg_points_against: float,
+                 home: Tuple[int, int, int], away: Tuple[int, int, int], form: Tuple[int, int, int],
+                 injuries: Optional[List[str]] = None, key_players: Optional[List[str]] = None,
+                 text: Optional[Tuple[str, str, str]] = None):
+        self.wins = wins
+        self.losses = losses
+        self.ties = ties
+        self.points_for = points_for
+        self.points_against = points_against
+        self.avg_points_for = avg_points_for
+        self.avg_points_against = avg_points_against
+        self.home_wins, self.home_losses, self.home_ties = home
+        self.away_wins, self.away_losses, self.away_ties = away
+        self.form_wins, self.form_ties, self.form_length = form
+        self.text = text  # (home_record, away_record, last_five_games) when not canonical
+        self.injuries = injuries if injuries is not None else []
+        self.key_players = key_players if key_players is not None else []
+
+    @classmethod
+    def from_team_stats(cls, stats: TeamStats) -> 'CompactTeamStats':
+        home, away = parse_record(stats.home_record), parse_record(stats.away_record)
+        form = encode_form(stats.last_five_games)
+        canonical = (form is not None and format_record(*home) == stats.home_record
+                     and format_record(*away) == stats.away_record)
+        return cls(stats.wins, stats.losses, stats.ties, stats.points_for, stats.points_against,
+                   stats.avg_points_for, stats.avg_points_against, home, away, form or (0, 0, 0),
+                   list(stats.injuries), list(stats.key_players),
+                   None if canonical else (stats.home_record, stats.away_record, stats.last_five_games))
+
+    def to_team_stats(self) -> TeamStats:
+        return TeamStats(self.wins, self.losses, self.ties, self.points_for, self.points_against,
+                         self.avg_points_for, self.avg_points_against,
+                         self.home_record, self.away_record, self.last_five_games,
+                         list(self.injuries), list(self.key_players))
+
+    @property
+    def home_record(self) -> str:
+        return self.text[0] if self.text else format_record(self.home_wins, self.home_losses, self.home_ties)
+
+    @property
+    def away_record(self) -> str:
+        return self.text[1] if self.text else format_record(self.away_wins, self.away_losses, self.away_ties)
+
+    @property
+    def last_five_games(self) -> str:
+        return self.text[2] if self.text else decode_form(self.form_wins, self.form_ties, self.form_length)
+
+    @property
+    def recent_wins(self) -> int:
+        return bin(self.form_wins).count('1')
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactTeamStats):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"CompactTeamStats({self.wins}-{self.losses}-{self.ties}, home {self.home_record}, "
+                f"away {self.away_record}, last five {self.last_five_games!r})")
+
+def home_wins(stats) -> int:
+    """Home wins used by the home-field factor, for TeamStats or CompactTeamStats"""
+    if isinstance(stats, CompactTeamStats) and stats.text is None:
+        return stats.home_wins
+    return record_home_wins(stats.home_record)
+
+def recent_wins(stats) -> int:
+    """Wins in the last five games, for TeamStats or CompactTeamStats"""
+    if isinstance(stats, CompactTeamStats) and stats.text is None:
+        return stats.recent_wins
+    return form_win_count(stats.last_five_games)
+
+class CompactGame:
+    """Game with the kickoff stored as a day ordinal plus microseconds since midnight"""
+
+    __slots__ = ('home_team', 'away_team', 'day', 'time_us', 'tzinfo', 'home_score', 'away_score',
+                 'week', 'season', 'is_playoffs', 'weather')
+
+    def __init__(self, home_team: str, away_team: str, day: int, time_us: int = 0, tzinfo=None,
+                 home_score: int = 0, away_score: int = 0, week: Optional[int] = None,
+                 season: Optional[int] = None, is_playoffs: bool = False,
+                 weather: Optional[WeatherConditions] = None):
+        self.home_team = sys.intern(home_team)
+        self.away_team = sys.intern(away_team)
+        self.day = day
+        self.time_us = time_us
+        self.tzinfo = tzinfo
+        self.home_score = home_score
+        self.away_score = away_score
+        self.week = week
+        self.season = season
+        self.is_playoffs = is_playoffs
+        self.weather = weather
+
+    @classmethod
+    def from_game(cls, game: Game) -> 'CompactGame':
+        kickoff = game.date
+        time_us = ((kickoff.hour * 60 + kickoff.minute) * 60 + kickoff.second) * 1_000_000 + kickoff.microsecond
+        return cls(game.home_team, game.away_team, kickoff.toordinal(), time_us, kickoff.tzinfo,
+                   game.home_score, game.away_score, game.week, game.season, game.is_playoffs, game.weather)
+
+    def to_game(self) -> Game:
+        return Game(self.home_team, self.away_team, self.date, self.home_score, self.away_score,
+                    self.week, self.season, self.is_playoffs, self.weather)
+
+    @property
+    def date(self) -> datetime:
+        seconds, microsecond = divmod(self.time_us, 1_000_000)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        return datetime.combine(date.fromordinal(self.day), time(hour, minute, second, microsecond), self.tzinfo)
+
+    def is_completed(self) -> bool:
+        return self.home_score > 0 or self.away_score > 0
+
+class CompactHistoryEntry:
+    """GameHistoryEntry with the date stored as an ordinal.
+
+    `date` still reads as the ISO string, so stores, head-to-head
+    summaries and prompts accept these rows in place of GameHistoryEntry.
+    """
+
+    __slots__ = ('day', 'home_team', 'away_team', 'home_score', 'away_score', 'week', 'season',
+                 'is_playoffs', 'weather', 'attendance')
+
+    def __init__(self, day: int, home_team: str, away_team: str, home_score: int, away_score: int,
+                 week: int, season: int, is_playoffs: bool, weather: Optional[WeatherConditions] = None,
+                 attendance: Optional[int] = None):
+        self.day = day
+        self.home_team = sys.intern(home_team)
+        self.away_team = sys.intern(away_team)
+        self.home_score = home_score
+        self.away_score = away_score
+        self.week = week
+        self.season = season
+        self.is_playoffs = is_playoffs
+        self.weather = weather
+        self.attendance = attendance
+
+    @classmethod
+    def from_entry(cls, entry: 'GameHistoryEntry') -> 'CompactHistoryEntry':
+        return cls(date_ordinal(entry.date), entry.home_team, entry.away_team, entry.home_score,
+                   entry.away_score, entry.week, entry.season, entry.is_playoffs, entry.weather,
+                   entry.attendance)
+
+    def to_entry(self) -> 'GameHistoryEntry':
+        from data.game_history import GameHistoryEntry
+        return GameHistoryEntry(self.date, self.home_team, self.away_team, self.home_score, self.away_score,
+                                self.week, self.season, self.is_playoffs, self.weather, self.attendance)
+
+    @property
+    def date(self) -> str:
+        return ordinal_date(self.day)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactHistoryEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"CompactHistoryEntry({self.date}, {self.away_team} {self.away_score} @ "
+                f"{self.home_team} {self.home_score}, week {self.week}, {self.season})")
+
+def compact_history(entries: Iterable['GameHistoryEntry']) -> List[CompactHistoryEntry]:
+    """Convert history rows to CompactHistoryEntry"""
+    return [CompactHistoryEntry.from_entry(entry) for entry in entries]
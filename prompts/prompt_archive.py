@@ -0,0 +1,279 @@
+import gzip
+import json
+import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.game import Game
+from data.prediction_ledger import matchup_key
+from utils import metrics
+
+DEFAULT_ARCHIVE_PATH = os.environ.get('NFL_PROMPT_ARCHIVE', os.path.join('generated-prompts', 'prompts.jsonl.gz'))
+# 'files' writes one .txt per prompt; 'archive' appends to DEFAULT_ARCHIVE_PATH
+PROMPT_OUTPUT = os.environ.get('NFL_PROMPT_OUTPUT', 'files')
+DEFAULT_CHUNK_SIZE = 64  # prompts per compressed chunk
+CHUNK_CACHE_SIZE = 4
+SCAN_BLOCK_SIZE = 64 * 1024
+
+@dataclass
+class ArchivedPrompt:
+    key: str
+    season: int
+    week: int
+    matchup: str  # "AWAY@HOME"
+    kind: str
+    created_at: str
+    prompt: str
+    response: Optional[str] = None  # AI completion, when one was requested
+
+@dataclass
+class _IndexEntry:
+    offset: int  # byte offset of the chunk in the archive
+    length: int  # compressed chunk length
+    line: int    # record number within the chunk
+
+class PromptArchive:
+    """Append-only prompt archive: gzip-compressed JSONL chunks plus an offset index.
+
+    Prompts are buffered and written `chunk_size` at a time as independent
+    gzip members, so the archive is one valid .jsonl.gz file that can be
+    exported with a single sequential read (`zcat`). A sidecar index maps
+    each prompt's season/week/matchup key to its chunk offset, so lookups
+    decompress only one chunk. Re-archiving a matchup replaces it in the
+    index; the older copy stays in the archive.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.chunk_size = chunk_size
+        self._index: Dict[str, _IndexEntry] = {}
+        self._buffer: List[dict] = []
+        self._chunks: 'OrderedDict[int, List[str]]' = OrderedDict()
+        self._index_ends_mid_line = False  # an interrupted flush left a partial last .idx line
+        self._recovered: List[str] = []  # index lines for chunks found by scanning, not yet in the .idx
+        self._complete_end = 0  # end of the last complete chunk
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def __enter__(self) -> 'PromptArchive':
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._buffer)
+
+    def _load_index(self):
+        """Read the sidecar index, then index any complete chunks written after it.
+
+        Opening never modifies the archive: chunks missing from the index
+        (a lost or damaged .idx, or a writer that has not indexed yet) are
+        recovered by scanning the gzip members, and a trailing partial
+        member is ignored until the next write trims it.
+        """
+        indexed_end = 0
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._index_ends_mid_line = not line.endswith('\n')
+                    try:
+                        record = json.loads(line)
+                        entry = _IndexEntry(record['offset'], record['length'], record['line'])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # partial or damaged line
+                    self._index[record['key']] = entry
+                    indexed_end = max(indexed_end, entry.offset + entry.length)
+        except OSError:
+            pass
+        self._complete_end = self._index_chunks(indexed_end)
+
+    def _index_chunks(self, start: int) -> int:
+        """Index the complete chunks from `start` on, returning the end of the last one"""
+        end = start
+        for offset, length, lines in self._scan_chunks(start):
+            for i, line in enumerate(lines):
+                try:
+                    key = json.loads(line)['key']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self._index[key] = _IndexEntry(offset, length, i)
+                self._recovered.append(json.dumps({'key': key, 'offset': offset, 'length': length, 'line': i}))
+            end = offset + length
+        return end
+
+    def _trim_partial_chunk(self):
+        """Before appending, drop a trailing partial member so it never ends up mid-archive (lock held)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size <= self._complete_end:
+            return
+        # Chunks another writer completed since we opened are kept and indexed
+        self._complete_end = self._index_chunks(self._complete_end)
+        if size > self._complete_end:
+            print(f"⚠️  Dropping {size - self._complete_end} bytes of incomplete chunk from {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(self._complete_end)
+
+    def _scan_chunks(self, start: int) -> Iterator[Tuple[int, int, List[str]]]:
+        """(offset, length, lines) for each complete gzip member from `start` on"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return
+        with f:
+            f.seek(start)
+            offset, pending = start, b''
+            while True:
+                decompressor = zlib.decompressobj(31)  # gzip container
+                parts, consumed, data = [], 0, pending
+                try:
+                    while not decompressor.eof:
+                        if not data:
+                            data = f.read(SCAN_BLOCK_SIZE)
+                            if not data:
+                                return  # end of archive, or a partial member still being written
+                        parts.append(decompressor.decompress(data))
+                        consumed += len(data)
+                        data = b''
+                except zlib.error:
+                    return  # damaged member; nothing after it can be located
+                pending = decompressor.unused_data
+                length = consumed - len(pending)
+                yield offset, length, b''.join(parts).decode('utf-8').splitlines()
+                offset += length
+
+    def append(self, game: Game, prompt: str, kind: str = 'comprehensive', response: Optional[str] = None):
+        """Buffer a prompt, writing a chunk once `chunk_size` are pending"""
+        record = {
+            'key': matchup_key(game),
+            'season': game.season,
+            'week': game.week,
+            'matchup': f"{game.away_team}@{game.home_team}",
+            'kind': kind,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'prompt': prompt,
+            'response': response
+        }
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.chunk_size:
+                self._write_chunk()
+
+    def flush(self):
+        """Write any buffered prompts as a final, possibly short, chunk"""
+        with self._lock:
+            if self._buffer:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        """Compress the buffer as one gzip member and index it (lock held)"""
+        lines = [json.dumps(record, ensure_ascii=False) for record in self._buffer]
+        payload = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._trim_partial_chunk()
+        with metrics.span('archive.write_chunk'), open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(payload)
+        self._complete_end = offset + len(payload)
+        metrics.count('bytes_written_total', len(payload), file='prompt_archive')
+        index_lines = [json.dumps({'key': record['key'], 'offset': offset, 'length': len(payload), 'line': i})
+                       for i, record in enumerate(self._buffer)]
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(('\n' if self._index_ends_mid_line else '') + '\n'.join(self._recovered + index_lines) + '\n')
+        self._recovered = []
+        self._index_ends_mid_line = False
+        for i, record in enumerate(self._buffer):
+            self._index[record['key']] = _IndexEntry(offset, len(payload), i)
+        self._buffer = []
+
+    def _read_chunk(self, offset: int, length: int) -> List[str]:
+        lines = self._chunks.get(offset)
+        if lines is None:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                lines = gzip.decompress(f.read(length)).decode('utf-8').splitlines()
+            self._chunks[offset] = lines
+            while len(self._chunks) > CHUNK_CACHE_SIZE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(offset)
+        return lines
+
+    def get(self, season: int, week: int, matchup: str, is_playoffs: bool = False) -> Optional[ArchivedPrompt]:
+        """Look up a prompt by season, week and "AWAY@HOME" matchup"""
+        away, _, home = matchup.partition('@')
+        game = Game(home, away, datetime.min, week=week, season=season, is_playoffs=is_playoffs)
+        return self.get_by_key(matchup_key(game))
+
+    def get_by_key(self, key: str) -> Optional[ArchivedPrompt]:
+        """Look up a prompt by its matchup key"""
+        with self._lock:
+            for record in reversed(self._buffer):
+                if record['key'] == key:
+                    return ArchivedPrompt(**record)
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            return ArchivedPrompt(**json.loads(self._read_chunk(entry.offset, entry.length)[entry.line]))
+
+    def find(self, season: Optional[int] = None, week: Optional[int] = None) -> List[ArchivedPrompt]:
+        """All current prompts for a season and/or week, read chunk by chunk"""
+        prefix_season = f"{season}:" if season is not None else ''
+        keys = [key for key in list(self._index) + [record['key'] for record in self._buffer]
+                if key.startswith(prefix_season)
+                and (week is None or key.split(':')[1][1:] == str(week))]
+        prompts = [self.get_by_key(key) for key in dict.fromkeys(keys)]
+        return [prompt for prompt in prompts if prompt is not None]
+
+    def iter_prompts(self) -> Iterator[ArchivedPrompt]:
+        """Every archived prompt in write order, including replaced copies (one sequential read)"""
+        self.flush()
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield ArchivedPrompt(**json.loads(line))
+
+_default_archive: Optional[PromptArchive] = None
+
+def get_prompt_archive() -> PromptArchive:
+    """Shared archive used when prompts are written in archive mode"""
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = PromptArchive()
+    return _default_archive
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """List an archive's prompts for a week, or print one matchup's prompt"""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) not in (1, 3, 4):
+        print("Usage: python -m prompts.prompt_archive ARCHIVE [SEASON WEEK [AWAY@HOME]]")
+        return 1
+
+    archive = PromptArchive(args[0])
+    if len(args) == 4:
+        prompt = archive.get(int(args[1]), int(args[2]), args[3].upper())
+        if prompt is None:
+            print(f"❌ No prompt for {args[3]} in {args[1]} week {args[2]}")
+            return 1
+        print(prompt.prompt)
+        return 0
+
+    prompts = archive.find(int(args[1]), int(args[2])) if len(args) == 3 else archive.find()
+    for prompt in prompts:
+        print(f"{prompt.key:<24} {prompt.kind:<14} {prompt.created_at}  {len(prompt.prompt):>6} chars")
+    print(f"📦 {len(prompts)} prompts")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,18 @@
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, List, Tuple
+from dataclasses import dataclass, field
 from models.game import Game, TeamStats, WeatherConditions
+from utils import metrics
 from data.nfl_data import get_team_stats, get_team_by_abbreviation, NFLTeam
 from data.game_history import get_head_to_head_record, get_recent_performance, HeadToHeadRecord
+from prompts.prompt_templates import (
+    COMPREHENSIVE_TEMPLATE, QUICK_TEMPLATE, render_team_info, render_team_performance, render_team_personnel,
+    render_head_to_head, render_weather, render_quick_team
+)
 
 @dataclass
 class MatchupContext:
-    home_team: NFLTeam
-    away_team: NFLTeam
+    home_team: Optional[NFLTeam]
+    away_team: Optional[NFLTeam]
     home_stats: TeamStats
     away_stats: TeamStats
     head_to_head: HeadToHeadRecord
@@ -18,133 +23,181 @@ class MatchupContext:
     season: int
     is_playoffs: bool
 
-def generate_comprehensive_prompt(game: Game) -> str:
+@metrics.timed('prompt.comprehensive')
+def generate_comprehensive_prompt(game: Game, context: Optional[MatchupContext] = None) -> str:
     """Generate a comprehensive AI prompt for game prediction"""
-    context = build_matchup_context(game)
+    context = context or build_matchup_context(game)
+    home, away = context.home_team, context.away_team
     
-    weather_section = ""
-    if context.weather:
-        weather_section = f"""=== WEATHER CONDITIONS ===
-Temperature: {context.weather.temperature}°F
-Wind Speed: {context.weather.wind_speed} mph
-Conditions: {context.weather.conditions}
-Precipitation: {context.weather.precipitation}%
-
-"""
-    
-    return f"""NFL Game Prediction Analysis
-
-MATCHUP: {context.away_team.name} @ {context.home_team.name}
-DATE: {game.date.strftime('%Y-%m-%d')}
-WEEK: {game.week or 'TBD'} ({'PLAYOFFS' if game.is_playoffs else 'Regular Season'})
-
-=== TEAM INFORMATION ===
-
-{context.away_team.name} ({context.away_team.abbreviation}):
-- Conference: {context.away_team.conference} {context.away_team.division}
-- Stadium: Playing @ {context.home_team.stadium}
-- Current Record: {context.away_stats.wins}-{context.away_stats.losses}-{context.away_stats.ties}
-- Away Record: {context.away_stats.away_record}
-
-{context.home_team.name} ({context.home_team.abbreviation}):
-- Conference: {context.home_team.conference} {context.home_team.division}
-- Stadium: {context.home_team.stadium} (Home advantage)
-- Current Record: {context.home_stats.wins}-{context.home_stats.losses}-{context.home_stats.ties}
-- Home Record: {context.home_stats.home_record}
-
-=== OFFENSIVE & DEFENSIVE PERFORMANCE ===
-
-{context.away_team.name} Offense/Defense:
-- Average Points Scored: {context.away_stats.avg_points_for} per game
-- Average Points Allowed: {context.away_stats.avg_points_against} per game
-- Total Points For: {context.away_stats.points_for}
-- Total Points Against: {context.away_stats.points_against}
-- Point Differential: {'+' if (context.away_stats.points_for - context.away_stats.points_against) > 0 else ''}{context.away_stats.points_for - context.away_stats.points_against}
-
-{context.home_team.name} Offense/Defense:
-- Average Points Scored: {context.home_stats.avg_points_for} per game
-- Average Points Allowed: {context.home_stats.avg_points_against} per game
-- Total Points For: {context.home_stats.points_for}
-- Total Points Against: {context.home_stats.points_against}
-- Point Differential: {'+' if (context.home_stats.points_for - context.home_stats.points_against) > 0 else ''}{context.home_stats.points_for - context.home_stats.points_against}
-
-=== RECENT FORM & MOMENTUM ===
-
-{context.away_team.name} Last 5 Games: {context.away_stats.last_five_games}
-{context.home_team.name} Last 5 Games: {context.home_stats.last_five_games}
-
-=== HEAD-TO-HEAD HISTORY ===
-
-All-Time Series: {context.home_team.name} {context.head_to_head.team1_wins if context.head_to_head.team1 == context.home_team.abbreviation else context.head_to_head.team2_wins}-{context.head_to_head.team2_wins if context.head_to_head.team1 == context.home_team.abbreviation else context.head_to_head.team1_wins}-{context.head_to_head.ties} {context.away_team.name}
-Last Meeting: {context.head_to_head.last_meeting.date} - {context.head_to_head.last_meeting.home_team} {context.head_to_head.last_meeting.home_score}, {context.head_to_head.last_meeting.away_team} {context.head_to_head.last_meeting.away_score}
-Average Points in Head-to-Head:
-- {context.home_team.name}: {context.head_to_head.avg_points_team1:.1f} points
-- {context.away_team.name}: {context.head_to_head.avg_points_team2:.1f} points
-
-=== INJURY REPORT & KEY PLAYERS ===
-
-{context.away_team.name} Injuries: {', '.join(context.away_stats.injuries) if context.away_stats.injuries else 'No significant injuries reported'}
-{context.away_team.name} Key Players: {', '.join(context.away_stats.key_players) if context.away_stats.key_players else 'Key players TBD'}
-
-{context.home_team.name} Injuries: {', '.join(context.home_stats.injuries) if context.home_stats.injuries else 'No significant injuries reported'}
-{context.home_team.name} Key Players: {', '.join(context.home_stats.key_players) if context.home_stats.key_players else 'Key players TBD'}
-
-{weather_section}=== ANALYSIS REQUEST ===
-
-Based on the comprehensive data above, please provide:
-
-1. **GAME PREDICTION**: Who will win and by how many points?
-2. **CONFIDENCE LEVEL**: Rate your confidence (1-10) and explain why
-3. **KEY FACTORS**: What are the 3-5 most important factors that will determine the outcome?
-4. **OVER/UNDER**: Predict the total points scored and whether it will be high/low scoring
-5. **X-FACTORS**: What unexpected elements could swing the game?
-6. **FINAL SCORE PREDICTION**: Provide an exact score prediction
-
-Consider all statistical trends, recent form, injuries, weather (if applicable), home field advantage, divisional rivalry dynamics, and historical matchup patterns in your analysis."""
-
-def generate_quick_prompt(home_team: str, away_team: str, week: int) -> str:
+    return COMPREHENSIVE_TEMPLATE.render({
+        'header': (f"MATCHUP: {away.name} @ {home.name}\n"
+                   f"DATE: {game.date.strftime('%Y-%m-%d')}\n"
+                   f"WEEK: {game.week or 'TBD'} ({'PLAYOFFS' if game.is_playoffs else 'Regular Season'})"),
+        'away_info': render_team_info(away, context.away_stats, home, is_home=False),
+        'home_info': render_team_info(home, context.home_stats, home, is_home=True),
+        'away_performance': render_team_performance(away, context.away_stats),
+        'home_performance': render_team_performance(home, context.home_stats),
+        'recent_form': (f"{away.name} Last 5 Games: {context.away_stats.last_five_games}\n"
+                        f"{home.name} Last 5 Games: {context.home_stats.last_five_games}"),
+        'head_to_head': render_head_to_head(home, away, context.head_to_head),
+        'away_personnel': render_team_personnel(away, context.away_stats),
+        'home_personnel': render_team_personnel(home, context.home_stats),
+        'weather': render_weather(context.weather)
+    })
+
+@metrics.timed('prompt.quick')
+def generate_quick_prompt(home_team: str, away_team: str, week: int,
+                          context: Optional[MatchupContext] = None) -> str:
     """Generate a quick AI prompt for game prediction"""
-    home_stats = get_team_stats(home_team)
-    away_stats = get_team_stats(away_team)
-    home_team_obj = get_team_by_abbreviation(home_team)
-    away_team_obj = get_team_by_abbreviation(away_team)
+    if context:
+        home_stats, away_stats = context.home_stats, context.away_stats
+        home_team_obj, away_team_obj = context.home_team, context.away_team
+    else:
+        home_stats = get_team_stats(home_team)
+        away_stats = get_team_stats(away_team)
+        home_team_obj = get_team_by_abbreviation(home_team)
+        away_team_obj = get_team_by_abbreviation(away_team)
     
-    return f"""Quick NFL Game Prediction
-
-MATCHUP: {away_team_obj.name if away_team_obj else away_team} @ {home_team_obj.name if home_team_obj else home_team}
-WEEK: {week}
-
-RECORDS:
-- {away_team}: {away_stats.wins}-{away_stats.losses}-{away_stats.ties} (Away: {away_stats.away_record})
-- {home_team}: {home_stats.wins}-{home_stats.losses}-{home_stats.ties} (Home: {home_stats.home_record})
-
-SCORING AVERAGES:
-- {away_team}: {away_stats.avg_points_for} scored, {away_stats.avg_points_against} allowed
-- {home_team}: {home_stats.avg_points_for} scored, {home_stats.avg_points_against} allowed
+    away_record, away_scoring, away_form = render_quick_team(away_team, away_stats, is_home=False)
+    home_record, home_scoring, home_form = render_quick_team(home_team, home_stats, is_home=True)
+    return QUICK_TEMPLATE.render({
+        'header': (f"MATCHUP: {away_team_obj.name if away_team_obj else away_team} @ "
+                   f"{home_team_obj.name if home_team_obj else home_team}\nWEEK: {week}"),
+        'away_record': away_record,
+        'home_record': home_record,
+        'away_scoring': away_scoring,
+        'home_scoring': home_scoring,
+        'away_form': away_form,
+        'home_form': home_form
+    })
+
+DEFAULT_TOKEN_BUDGET = 250
+CHARS_PER_TOKEN = 4  # Rough English/GPT tokenizer ratio; close enough for budgeting
 
-RECENT FORM:
-- {away_team}: {away_stats.last_five_games}
-- {home_team}: {home_stats.last_five_games}
-
-Predict: Winner, final score, and 2-3 key factors that will determine the outcome."""
+@dataclass
+class CompactPrompt:
+    text: str
+    estimated_tokens: int
+    token_budget: int
+    included: List[str] = field(default_factory=list)
+    abbreviated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+def estimate_tokens(text: str) -> int:
+    """Estimate a text's token count without a tokenizer"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def _signed(value: int) -> str:
+    return f"+{value}" if value > 0 else str(value)
+
+def _abbreviate_list(items: List[str], keep: int) -> str:
+    shown = ', '.join(items[:keep])
+    return f"{shown} +{len(items) - keep} more" if len(items) > keep else shown
+
+def _compact_sections(game: Game, context: MatchupContext) -> List[Tuple[str, str, Optional[str]]]:
+    """(name, full line, abbreviated line or None) in priority order"""
+    home, away = game.home_team, game.away_team
+    hs, aws = context.home_stats, context.away_stats
+
+    def team_line(team: str, stats: TeamStats, split: str, split_record: str) -> str:
+        return (f"{team} {stats.wins}-{stats.losses}-{stats.ties} ({split} {split_record}), "
+                f"PF {stats.avg_points_for}/g PA {stats.avg_points_against}/g, "
+                f"diff {_signed(stats.points_for - stats.points_against)}")
+
+    sections = [
+        ('records', f"{team_line(away, aws, 'away', aws.away_record)}\n{team_line(home, hs, 'home', hs.home_record)}",
+         f"{away} {aws.wins}-{aws.losses} PF {aws.avg_points_for} PA {aws.avg_points_against}; "
+         f"{home} {hs.wins}-{hs.losses} PF {hs.avg_points_for} PA {hs.avg_points_against}"),
+        ('form', f"Last 5: {away} {aws.last_five_games}; {home} {hs.last_five_games}",
+         f"L5 wins: {away} {aws.last_five_games.count('W')}, {home} {hs.last_five_games.count('W')}"),
+    ]
 
-def build_matchup_context(game: Game) -> MatchupContext:
-    """Build comprehensive matchup context"""
-    home_team_obj = get_team_by_abbreviation(game.home_team)
-    away_team_obj = get_team_by_abbreviation(game.away_team)
+    if context.weather:
+        weather = context.weather
+        sections.append(('weather', f"Weather: {weather.temperature}°F, wind {weather.wind_speed} mph, "
+                                    f"{weather.precipitation}% precip, {weather.conditions}",
+                         f"Weather: {weather.temperature}°F, {weather.conditions}"))
+
+    if aws.injuries or hs.injuries:
+        sections.append(('injuries',
+                         f"Injuries: {away}: {', '.join(aws.injuries) or 'none'}; {home}: {', '.join(hs.injuries) or 'none'}",
+                         f"Injuries: {away} {len(aws.injuries)}, {home} {len(hs.injuries)}"))
+
+    h2h = context.head_to_head
+    if h2h.team1_wins + h2h.team2_wins + h2h.ties:
+        home_wins, away_wins = (h2h.team1_wins, h2h.team2_wins) if h2h.team1 == home else (h2h.team2_wins, h2h.team1_wins)
+        last = h2h.last_meeting
+        sections.append(('head_to_head',
+                         f"H2H: {home} {home_wins}-{away_wins}-{h2h.ties} {away}; last {last.date} "
+                         f"{last.home_team} {last.home_score}-{last.away_score} {last.away_team}",
+                         f"H2H: {home} {home_wins}-{away_wins}-{h2h.ties} {away}"))
+
+    if context.home_team and context.away_team:
+        same_division = (context.home_team.conference == context.away_team.conference
+                         and context.home_team.division == context.away_team.division)
+        venue = f"Venue: {context.home_team.stadium}"
+        if same_division:
+            venue += f"; {context.home_team.conference} {context.home_team.division} division game"
+        sections.append(('venue', venue, 'Division game' if same_division else None))
+
+    if aws.key_players or hs.key_players:
+        sections.append(('key_players',
+                         f"Key players: {away}: {', '.join(aws.key_players) or 'TBD'}; "
+                         f"{home}: {', '.join(hs.key_players) or 'TBD'}",
+                         f"Key players: {away}: {_abbreviate_list(aws.key_players, 2) or 'TBD'}; "
+                         f"{home}: {_abbreviate_list(hs.key_players, 2) or 'TBD'}"))
+    return sections
+
+@metrics.timed('prompt.compact')
+def generate_compact_prompt(game: Game, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                            context: Optional[MatchupContext] = None) -> CompactPrompt:
+    """Generate a prompt packing the most informative matchup data into a token budget.
+
+    The matchup line and the request are always included. Sections are then
+    added in priority order (records and scoring, recent form, weather,
+    injuries, head-to-head, venue, key players); one that does not fit is
+    abbreviated if it has a short form, otherwise dropped.
+    """
+    context = context or get_matchup_context(game)
+    header = (f"NFL prediction: {game.away_team} @ {game.home_team}, week {game.week or 'TBD'}"
+              f"{' (playoffs)' if game.is_playoffs else ''}, {game.date.strftime('%Y-%m-%d')}")
+    request = "Predict: winner, final score, confidence (1-10), 3 key factors."
+
+    prompt = CompactPrompt(text='', estimated_tokens=0, token_budget=token_budget)
+    lines = [header]
+    used = estimate_tokens(header) + estimate_tokens(request) + 1
+    for name, full, short in _compact_sections(game, context):
+        # +1 for the joining newline
+        for text, bucket in ((full, prompt.included), (short, prompt.abbreviated)):
+            if text is not None and used + estimate_tokens(text) + 1 <= token_budget:
+                lines.append(text)
+                used += estimate_tokens(text) + 1
+                bucket.append(name)
+                break
+        else:
+            prompt.dropped.append(name)
+
+    lines.append(request)
+    prompt.text = '\n'.join(lines)
+    prompt.estimated_tokens = estimate_tokens(prompt.text)
+    return prompt
+
+def get_matchup_context(game: Game) -> MatchupContext:
+    """Resolve a game's team info, stats and head-to-head record.
+
+    Contexts are not cached: callers that need several outputs for one
+    game (the pipeline's prediction and prompt stages) build one and pass
+    it down, so every run sees the current stats and history. Unknown
+    teams are left as None; use build_matchup_context to require both.
+    """
     home_stats = get_team_stats(game.home_team)
     away_stats = get_team_stats(game.away_team)
-    head_to_head = get_head_to_head_record(game.home_team, game.away_team)
-    
-    if not home_team_obj or not away_team_obj:
-        raise ValueError(f"Team not found: {game.home_team} or {game.away_team}")
-    
     return MatchupContext(
-        home_team=home_team_obj,
-        away_team=away_team_obj,
+        home_team=get_team_by_abbreviation(game.home_team),
+        away_team=get_team_by_abbreviation(game.away_team),
         home_stats=home_stats,
         away_stats=away_stats,
-        head_to_head=head_to_head,
+        head_to_head=get_head_to_head_record(game.home_team, game.away_team),
         home_recent_form=home_stats.last_five_games,
         away_recent_form=away_stats.last_five_games,
         weather=game.weather,
@@ -152,3 +205,12 @@ def build_matchup_context(game: Game) -> MatchupContext:
         season=game.season or 2025,
         is_playoffs=game.is_playoffs
     )
+
+def build_matchup_context(game: Game) -> MatchupContext:
+    """Build comprehensive matchup context"""
+    context = get_matchup_context(game)
+
+    if not context.home_team or not context.away_team:
+        raise ValueError(f"Team not found: {game.home_team} or {game.away_team}")
+
+    return context
@@ -0,0 +1,202 @@
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+from models.game import TeamStats, WeatherConditions
+from data.nfl_data import NFLTeam
+from data.game_history import HeadToHeadRecord
+
+SECTION_CACHE_SIZE = 4096
+
+class PromptTemplate:
+    """A prompt layout compiled once into literal text and named slots.
+
+    render() only joins the literals with already-rendered fragments, so
+    no format string is parsed per prompt.
+    """
+
+    def __init__(self, layout: str):
+        self.literals: List[str] = []
+        self.slots: List[str] = []
+        literal = ''
+        for text, slot, _, _ in Formatter().parse(layout):
+            literal += text
+            if slot is not None:
+                self.literals.append(literal)
+                self.slots.append(slot)
+                literal = ''
+        self.literals.append(literal)
+
+    def render(self, fragments: Dict[str, str]) -> str:
+        """Assemble the prompt from a fragment per slot"""
+        parts = [self.literals[0]]
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            parts.append(fragments[slot])
+            parts.append(literal)
+        return ''.join(parts)
+
+COMPREHENSIVE_TEMPLATE = PromptTemplate("""NFL Game Prediction Analysis
+
+{header}
+
+=== TEAM INFORMATION ===
+
+{away_info}
+
+{home_info}
+
+=== OFFENSIVE & DEFENSIVE PERFORMANCE ===
+
+{away_performance}
+
+{home_performance}
+
+=== RECENT FORM & MOMENTUM ===
+
+{recent_form}
+
+=== HEAD-TO-HEAD HISTORY ===
+
+{head_to_head}
+
+=== INJURY REPORT & KEY PLAYERS ===
+
+{away_personnel}
+
+{home_personnel}
+
+{weather}=== ANALYSIS REQUEST ===
+
+Based on the comprehensive data above, please provide:
+
+1. **GAME PREDICTION**: Who will win and by how many points?
+2. **CONFIDENCE LEVEL**: Rate your confidence (1-10) and explain why
+3. **KEY FACTORS**: What are the 3-5 most important factors that will determine the outcome?
+4. **OVER/UNDER**: Predict the total points scored and whether it will be high/low scoring
+5. **X-FACTORS**: What unexpected elements could swing the game?
+6. **FINAL SCORE PREDICTION**: Provide an exact score prediction
+
+Consider all statistical trends, recent form, injuries, weather (if applicable), home field advantage, divisional rivalry dynamics, and historical matchup patterns in your analysis.""")
+
+QUICK_TEMPLATE = PromptTemplate("""Quick NFL Game Prediction
+
+{header}
+
+RECORDS:
+{away_record}
+{home_record}
+
+SCORING AVERAGES:
+{away_scoring}
+{home_scoring}
+
+RECENT FORM:
+{away_form}
+{home_form}
+
+Predict: Winner, final score, and 2-3 key factors that will determine the outcome.""")
+
+# Section renderers take only hashable primitives so they can be memoized;
+# a team's blocks are rendered once per distinct set of stats (typed, so
+# 21 and 21.0 render separately)
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def team_info_section(name: str, abbreviation: str, conference: str, division: str, stadium_line: str,
+                      wins: int, losses: int, ties: int, split_label: str, split_record: str) -> str:
+    return f"""{name} ({abbreviation}):
+- Conference: {conference} {division}
+- Stadium: {stadium_line}
+- Current Record: {wins}-{losses}-{ties}
+- {split_label} Record: {split_record}"""
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def team_performance_section(name: str, avg_points_for: float, avg_points_against: float,
+                             points_for: int, points_against: int) -> str:
+    differential = points_for - points_against
+    return f"""{name} Offense/Defense:
+- Average Points Scored: {avg_points_for} per game
+- Average Points Allowed: {avg_points_against} per game
+- Total Points For: {points_for}
+- Total Points Against: {points_against}
+- Point Differential: {'+' if differential > 0 else ''}{differential}"""
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def team_personnel_section(name: str, injuries: Tuple[str, ...], key_players: Tuple[str, ...]) -> str:
+    return f"""{name} Injuries: {', '.join(injuries) if injuries else 'No significant injuries reported'}
+{name} Key Players: {', '.join(key_players) if key_players else 'Key players TBD'}"""
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def head_to_head_section(home_name: str, home_abbreviation: str, away_name: str,
+                         team1: str, team1_wins: int, team2_wins: int, ties: int,
+                         last_date: str, last_home: str, last_home_score: int, last_away: str,
+                         last_away_score: int, avg_points_team1: float, avg_points_team2: float) -> str:
+    home_wins, away_wins = (team1_wins, team2_wins) if team1 == home_abbreviation else (team2_wins, team1_wins)
+    return f"""All-Time Series: {home_name} {home_wins}-{away_wins}-{ties} {away_name}
+Last Meeting: {last_date} - {last_home} {last_home_score}, {last_away} {last_away_score}
+Average Points in Head-to-Head:
+- {home_name}: {avg_points_team1:.1f} points
+- {away_name}: {avg_points_team2:.1f} points"""
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def weather_section(temperature: float, wind_speed: float, conditions: str, precipitation: float) -> str:
+    return f"""=== WEATHER CONDITIONS ===
+Temperature: {temperature}°F
+Wind Speed: {wind_speed} mph
+Conditions: {conditions}
+Precipitation: {precipitation}%
+
+"""
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE, typed=True)
+def quick_team_sections(label: str, wins: int, losses: int, ties: int, split_label: str, split_record: str,
+                        avg_points_for: float, avg_points_against: float,
+                        last_five_games: str) -> Tuple[str, str, str]:
+    """Record, scoring and form lines for one team in the quick prompt"""
+    return (f"- {label}: {wins}-{losses}-{ties} ({split_label}: {split_record})",
+            f"- {label}: {avg_points_for} scored, {avg_points_against} allowed",
+            f"- {label}: {last_five_games}")
+
+def render_team_info(team: NFLTeam, stats: TeamStats, home_team: NFLTeam, is_home: bool) -> str:
+    if is_home:
+        stadium_line, split_label, split_record = f"{team.stadium} (Home advantage)", 'Home', stats.home_record
+    else:
+        stadium_line, split_label, split_record = f"Playing @ {home_team.stadium}", 'Away', stats.away_record
+    return team_info_section(team.name, team.abbreviation, team.conference, team.division, stadium_line,
+                             stats.wins, stats.losses, stats.ties, split_label, split_record)
+
+def render_team_performance(team: NFLTeam, stats: TeamStats) -> str:
+    return team_performance_section(team.name, stats.avg_points_for, stats.avg_points_against,
+                                    stats.points_for, stats.points_against)
+
+def render_team_personnel(team: NFLTeam, stats: TeamStats) -> str:
+    return team_personnel_section(team.name, tuple(stats.injuries), tuple(stats.key_players))
+
+def render_head_to_head(home_team: NFLTeam, away_team: NFLTeam, h2h: HeadToHeadRecord) -> str:
+    last = h2h.last_meeting
+    return head_to_head_section(home_team.name, home_team.abbreviation, away_team.name,
+                                h2h.team1, h2h.team1_wins, h2h.team2_wins, h2h.ties,
+                                last.date, last.home_team, last.home_score, last.away_team, last.away_score,
+                                h2h.avg_points_team1, h2h.avg_points_team2)
+
+def render_weather(weather: Optional[WeatherConditions]) -> str:
+    if not weather:
+        return ""
+    return weather_section(weather.temperature, weather.wind_speed, weather.conditions, weather.precipitation)
+
+def render_quick_team(label: str, stats: TeamStats, is_home: bool) -> Tuple[str, str, str]:
+    split_label, split_record = ('Home', stats.home_record) if is_home else ('Away', stats.away_record)
+    return quick_team_sections(label, stats.wins, stats.losses, stats.ties, split_label, split_record,
+                               stats.avg_points_for, stats.avg_points_against, stats.last_five_games)
+
+_SECTION_RENDERERS = (team_info_section, team_performance_section, team_personnel_section,
+                      head_to_head_section, weather_section, quick_team_sections)
+
+def clear_section_cache():
+    """Drop every cached section"""
+    for renderer in _SECTION_RENDERERS:
+        renderer.cache_clear()
+
+def section_cache_stats() -> Dict[str, int]:
+    """Hit/miss totals across the section caches"""
+    infos = [renderer.cache_info() for renderer in _SECTION_RENDERERS]
+    return {'hits': sum(info.hits for info in infos), 'misses': sum(info.misses for info in infos),
+            'size': sum(info.currsize for info in infos)}
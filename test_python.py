@@ -76,6 +76,15 @@ async def test_prediction_agent():
     print(f"   🎯 Confidence: {prediction.confidence:.1f}%")
     print(f"   🔑 Key Factors: {', '.join(prediction.key_factors)}")
     print(f"   💭 Reasoning: {prediction.reasoning}")
+    
+    # The context built for the prediction also renders its prompt
+    from dataclasses import replace
+    from prompts.prompt_generator import build_matchup_context
+    context = build_matchup_context(game)
+    assert agent.generate_prediction(game, context) == prediction
+    assert agent.generate_ai_prompt(game, context=context) == generate_comprehensive_prompt(game)
+    slumping = replace(context, home_stats=replace(context.home_stats, last_five_games='L-L-L-L-L'))
+    assert 'L-L-L-L-L' in agent.generate_ai_prompt(game, context=slumping)
 
 async def test_data_access():
     """Test data access functionality"""
@@ -118,6 +127,489 @@ async def test_game_model():
     print(f"✅ Total Points: {game.get_total_points()}")
     print(f"✅ Completed: {game.is_completed()}")
 
+async def test_async_espn_client():
+    """Test concurrent team refreshes against a local stub ESPN server"""
+    print("\n🌐 Testing Async ESPN Client...")
+    
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from data.espn_client import AsyncESPNClient
+    from data.nfl_data import ESPN_TEAM_MAPPING
+    
+    delay = 0.1
+    
+    class StubESPNHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            time.sleep(delay)
+            team_id = self.path.split('/')[2]
+            if self.path.endswith('/schedule'):
+                body = {'events': [{
+                    'date': '2025-09-07',
+                    'competitions': [{
+                        'status': {'type': {'completed': True}},
+                        'competitors': [
+                            {'homeAway': 'home', 'score': '24', 'team': {'id': team_id}},
+                            {'homeAway': 'away', 'score': '17', 'team': {'id': '999'}}
+                        ]
+                    }]
+                }]}
+            else:
+                body = {'athletes': [{'position': {'abbreviation': 'QB'}, 'items': [{'displayName': f'QB {team_id}'}]}]}
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, *args):
+            pass
+    
+    class StubESPNServer(ThreadingHTTPServer):
+        request_queue_size = 128
+    
+    server = StubESPNServer(('127.0.0.1', 0), StubESPNHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    try:
+        async with AsyncESPNClient(base_url=f"http://127.0.0.1:{server.server_port}", max_concurrency=64) as client:
+            start = time.perf_counter()
+            results = await client.refresh_all_teams()
+            elapsed = time.perf_counter() - start
+        
+        # A client shared between event loops keeps a request limit per loop
+        async with AsyncESPNClient(base_url=f"http://127.0.0.1:{server.server_port}", max_concurrency=1) as shared:
+            first = await shared.refresh_team('KC')
+            second = await asyncio.to_thread(asyncio.run, shared.refresh_team('PHI'))
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    assert len(results) == len(ESPN_TEAM_MAPPING)
+    assert all(not result.errors for result in results.values())
+    assert results['KC'].recent_form == 'W-W-W-W-W'
+    assert results['KC'].key_players == ['QB 12']
+    # 64 requests at 100ms each would take 6.4s serially
+    assert elapsed < delay * 10, f"refresh took {elapsed:.2f}s"
+    assert not first.errors and not second.errors, second.errors
+    print(f"✅ Refreshed {len(results)} teams ({client.request_count} requests) in {elapsed:.2f}s")
+
+async def test_llm_dispatcher():
+    """Test concurrent completions, retries and timeouts against a local fake completion server"""
+    print("\n🤖 Testing LLM Dispatcher...")
+    
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import tempfile
+    from agents.llm_dispatcher import LLMDispatcher, summarize_latencies
+    from agents.llm_cache import LLMResponseCache
+    
+    delay = 0.1
+    seen = set()
+    lock = threading.Lock()
+    
+    class FakeCompletionHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            prompt = request['messages'][-1]['content']
+            with lock:
+                first_attempt = prompt not in seen
+                seen.add(prompt)
+            if prompt == 'slow':
+                time.sleep(1.0)
+            time.sleep(delay)
+            if prompt.startswith('flaky') and first_attempt:
+                status, body = 500, {'error': {'message': 'overloaded', 'type': 'server_error'}}
+            elif prompt == 'empty':
+                status, body = 200, {'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0,
+                                     'model': request['model'], 'choices': []}
+            else:
+                status, body = 200, {
+                    'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': request['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': f"echo: {prompt}"}}]
+                }
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, *args):
+            pass
+    
+    class FakeCompletionServer(ThreadingHTTPServer):
+        request_queue_size = 128
+        
+        def handle_error(self, request, client_address):
+            pass  # the client hangs up on requests it timed out
+    
+    server = FakeCompletionServer(('127.0.0.1', 0), FakeCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    cache_dir = tempfile.mkdtemp()
+    dispatcher = LLMDispatcher(api_key='test', base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                               max_concurrency=16, timeout=0.5, max_retries=2, backoff_base=0.05,
+                               cache=LLMResponseCache(cache_dir))
+    prompts = ([(f"game{i}", f"prompt {i}") for i in range(16)]
+               + [('flaky', 'flaky 1'), ('slow', 'slow'), ('empty', 'empty')])
+    try:
+        start = time.perf_counter()
+        results = await dispatcher.complete_many(prompts)
+        elapsed = time.perf_counter() - start
+        
+        # A fresh process (new in-memory cache) answers repeats from disk without the server
+        server_requests = len(seen)
+        dispatcher.cache = LLMResponseCache(cache_dir)
+        rerun = await dispatcher.complete_many(prompts[:16])
+        assert all(result.cached and result.content == f"echo: prompt {i}" for i, result in enumerate(rerun))
+        assert len(seen) == server_requests
+        bypassed = await dispatcher.complete('prompt 0', 'game0', bypass_cache=True)
+        assert not bypassed.cached and bypassed.attempts == 1
+        # Another event loop (the CLI runs one asyncio.run per command) gets its own client and semaphore
+        other_loop = await asyncio.get_running_loop().run_in_executor(
+            None, asyncio.run, dispatcher.complete('prompt 1', 'game1', bypass_cache=True))
+        assert other_loop.ok and other_loop.content == "echo: prompt 1", other_loop.error
+    finally:
+        await dispatcher.close()
+        server.shutdown()
+        server.server_close()
+    
+    by_key = {result.key: result for result in results}
+    assert all(by_key[f"game{i}"].content == f"echo: prompt {i}" for i in range(16))
+    assert by_key['flaky'].ok and by_key['flaky'].attempts == 2
+    assert not by_key['slow'].ok and by_key['slow'].attempts == 3
+    assert not by_key['empty'].ok and by_key['empty'].attempts == 1
+    # 16 requests at 100ms each would take 1.6s serially; the slow one times out 3 times
+    assert elapsed < 2.5, f"dispatch took {elapsed:.2f}s"
+    print(f"✅ {summarize_latencies(results)} in {elapsed:.2f}s")
+
+async def test_job_scheduler_idle():
+    """Test that the automated scheduler runs due jobs and sleeps without using CPU"""
+    print("\n⏰ Testing Job Scheduler...")
+    
+    import time
+    from utils.job_scheduler import AsyncJobScheduler
+    from utils.scheduler import NFLScheduler
+    
+    job_scheduler = AsyncJobScheduler()
+    NFLScheduler().schedule_predictions(job_scheduler)
+    ticks = []
+    job_scheduler.every(0.2, lambda: ticks.append(time.perf_counter()), 'tick')
+    
+    runner = asyncio.ensure_future(job_scheduler.run())
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.sleep(1.0)
+    cpu_used, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    job_scheduler.stop()
+    await asyncio.wait_for(runner, 1.0)
+    
+    assert 4 <= len(ticks) <= 6, f"expected ~5 ticks, got {len(ticks)}"
+    assert all(job.run_count == 0 for job in job_scheduler.jobs if job.name != 'tick')
+    # A busy-wait would use ~100% of the wall time
+    assert cpu_used < wall * 0.05, f"scheduler used {cpu_used:.3f}s CPU in {wall:.2f}s"
+    print(f"✅ {len(ticks)} jobs run, {cpu_used * 1000:.1f}ms CPU over {wall:.2f}s idle ({cpu_used / wall:.1%})")
+
+async def test_metrics():
+    """Test that instrumentation records nested spans and exports JSON and Prometheus text"""
+    print("\n📈 Testing Metrics...")
+    
+    import json
+    import os
+    import tempfile
+    from utils import metrics
+    
+    metrics.get_metrics().reset()
+    metrics.enable()
+    try:
+        game = Game(home_team="KC", away_team="BUF", date=datetime(2025, 9, 14), week=2, season=2025)
+        with metrics.span('test'):
+            PredictionAgent().generate_prediction(game)
+            generate_comprehensive_prompt(game)
+        metrics.count('test_total', key='C:\\tmp "x"\nnext')
+        
+        snapshot = metrics.get_metrics().snapshot()
+        spans = {span['span']: span['count'] for span in snapshot['spans']}
+        assert spans.get('test/predict/factors') == 1, spans
+        assert 'test/prompt.comprehensive' in spans, spans
+        
+        directory = tempfile.mkdtemp()
+        metrics.get_metrics().export(os.path.join(directory, 'metrics.json'))
+        metrics.get_metrics().export(os.path.join(directory, 'metrics.prom'))
+        with open(os.path.join(directory, 'metrics.json'), encoding='utf-8') as f:
+            assert json.load(f)['spans']
+        with open(os.path.join(directory, 'metrics.prom'), encoding='utf-8') as f:
+            prometheus = f.read()
+        assert 'nfl_span_seconds_bucket{span="test/predict",le="+Inf"} 1' in prometheus
+        # Label values are escaped, so one sample stays on one line
+        assert 'nfl_test_total{key="C:\\\\tmp \\"x\\"\\nnext"} 1' in prometheus, prometheus
+    finally:
+        metrics.disable()
+        metrics.get_metrics().reset()
+    
+    with metrics.span('disabled'):
+        pass
+    assert not metrics.get_metrics().snapshot()['spans']
+    print(f"✅ Recorded {len(spans)} spans and exported JSON and Prometheus text")
+
+async def test_ttl_cache():
+    """Test single-flight fetches, per-key invalidation and negative caching"""
+    print("\n🗃️  Testing TTL Cache...")
+    
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.cache import TTLCache
+    
+    now = [0.0]
+    cache = TTLCache(max_stale=0, clock=lambda: now[0], error_ttl=30)
+    calls = []
+    release = threading.Event()
+    
+    def slow_fetch():
+        calls.append('standings')
+        release.wait(5)
+        return 'fresh'
+    
+    # 16 callers on a cold key share one fetch
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = [pool.submit(cache.get_or_fetch, 'standings', slow_fetch) for _ in range(16)]
+        time.sleep(0.1)
+        # Invalidating another key must not discard the fetch in flight
+        cache.invalidate('roster')
+        release.set()
+        values = [future.result() for future in futures]
+    assert values == ['fresh'] * 16 and len(calls) == 1, calls
+    assert 'standings' in cache
+    
+    def failing_fetch():
+        calls.append('roster')
+        raise ConnectionError('ESPN down')
+    
+    for _ in range(3):
+        try:
+            cache.get_or_fetch('roster', failing_fetch)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError('expected the cached failure to be raised')
+    assert calls.count('roster') == 1, calls
+    now[0] += 31
+    assert cache.get_or_fetch('roster', lambda: ['QB']) == ['QB']
+    print(f"✅ One fetch for 16 concurrent callers; a failure was retried only after {cache.error_ttl:.0f}s")
+
+async def test_compact_models():
+    """Test that compact models round-trip and predict the same as the dataclass models"""
+    print("\n🗜️  Testing Compact Models...")
+    
+    from models.compact import CompactGame, CompactTeamStats, compact_history
+    from data.game_history import get_game_history
+    
+    history = get_game_history()
+    assert [entry.to_entry() for entry in compact_history(history)] == history
+    
+    game = Game(home_team="KC", away_team="BUF", date=datetime(2025, 9, 14, 20, 20), week=2, season=2025)
+    assert CompactGame.from_game(game).to_game().__dict__ == game.__dict__
+    
+    agent = PredictionAgent()
+    for team in ("KC", "BUF"):
+        stats = get_team_stats(team)
+        compact = CompactTeamStats.from_team_stats(stats)
+        assert compact.text is None and compact.to_team_stats() == stats
+        # Compact stats own their lists, so later edits to the source don't leak in
+        assert compact.injuries is not stats.injuries and compact.key_players is not stats.key_players
+        assert agent._calculate_home_field_advantage(game, compact) == agent._calculate_home_field_advantage(game, stats)
+    print(f"✅ Round-tripped {len(history)} history rows, a game and team stats")
+
+async def test_history_backends():
+    """Test that the in-memory store and the on-disk archive answer history lookups identically"""
+    print("\n🗄️  Testing History Backends...")
+    
+    import os
+    import tempfile
+    from data.game_history import GameHistoryStore, GameHistoryEntry
+    from data.history_archive import HistoryArchive, write_history_archive
+    from data.synthetic_history import generate_synthetic_history
+    
+    # The archive stores games by date, so compare against a store loaded in date order
+    history = sorted(generate_synthetic_history(4, 32, seed=7), key=lambda game: game.date)
+    store = GameHistoryStore(history)
+    path = os.path.join(tempfile.mkdtemp(), 'history.nflh')
+    write_history_archive(history, path)
+    late_game = GameHistoryEntry('2025-01-05', 'KC', 'BUF', 20, 17, 18, 2024, False)
+    store.add_game(late_game)
+    with HistoryArchive(path) as archive:
+        archive.add_game(late_game)
+        for team in ('KC', 'BUF', 'SF', 'NYJ'):
+            for seasons in (1, 2, 3):
+                assert archive.get_team_history(team, seasons) == store.get_team_history(team, seasons), team
+            assert archive.get_recent_performance(team, 5) == store.get_recent_performance(team, 5), team
+        assert archive.get_head_to_head_record('KC', 'BUF') == store.get_head_to_head_record('KC', 'BUF')
+    print(f"✅ Store and archive agree on {len(history) + 1} games")
+
+async def test_prompt_archive_recovery():
+    """Test that the prompt archive survives a lost index and a truncated last chunk"""
+    print("\n📦 Testing Prompt Archive Recovery...")
+    
+    import os
+    import tempfile
+    from prompts.prompt_archive import PromptArchive
+    
+    path = os.path.join(tempfile.mkdtemp(), 'prompts.jsonl.gz')
+    games = [Game(home_team=home, away_team=away, date=datetime(2025, 9, 14), week=week, season=2025)
+             for week in (1, 2) for home, away in (("KC", "BUF"), ("PHI", "DAL"))]
+    with PromptArchive(path, chunk_size=2) as archive:
+        for game in games:
+            archive.append(game, f"prompt {game.week} {game.home_team}")
+    complete_size = os.path.getsize(path)
+    
+    # A missing index is rebuilt by scanning, and opening leaves the archive untouched
+    os.remove(f"{path}.idx")
+    assert len(PromptArchive(path)) == 4 and os.path.getsize(path) == complete_size
+    
+    # Cut the last chunk short, as an interrupted write would; the next append replaces it
+    with open(path, 'r+b') as f:
+        f.truncate(complete_size - 10)
+    archive = PromptArchive(path, chunk_size=1)
+    assert len(archive) == 2 and os.path.getsize(path) == complete_size - 10
+    late = Game(home_team="SF", away_team="GB", date=datetime(2025, 9, 21), week=3, season=2025)
+    archive.append(late, "prompt 3 SF")
+    
+    reopened = PromptArchive(path)
+    prompts = [prompt.prompt for prompt in reopened.iter_prompts()]
+    assert prompts == ["prompt 1 KC", "prompt 1 PHI", "prompt 3 SF"], prompts
+    assert reopened.get(2025, 3, "GB@SF").prompt == "prompt 3 SF"
+    print(f"✅ Recovered {len(reopened)} prompts after a lost index and a truncated chunk")
+
+async def test_prediction_ledger():
+    """Test that ledger snapshots reload to the same rollup and only the tail is replayed"""
+    print("\n📒 Testing Prediction Ledger...")
+    
+    import json
+    import os
+    import tempfile
+    from models.game import GamePrediction
+    from data.prediction_ledger import PredictionLedger
+    
+    path = os.path.join(tempfile.mkdtemp(), 'ledger.jsonl')
+    games = [Game(home_team=home, away_team=away, date=datetime(2025, 9, 14), week=2, season=2025)
+             for home, away in (("KC", "BUF"), ("PHI", "DAL"), ("SF", "GB"))]
+    ledger = PredictionLedger(path)
+    for game in games:
+        ledger.record_prediction(game, GamePrediction(game.home_team, 65.0, {'home': 24, 'away': 20}, [], ''))
+    
+    # Home wins, then an away win: one right, one wrong
+    for game, (home_score, away_score) in zip(games, ((27, 20), (17, 23))):
+        game.home_score, game.away_score = home_score, away_score
+        assert ledger.record_result(game)
+    assert not ledger.record_result(games[0]), "a result must only grade once"
+    ledger.flush()
+    with open(ledger.snapshot_path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert snapshot['graded_season'] == 2025 and len(snapshot['graded_keys']) == 2, snapshot
+    
+    reloaded = PredictionLedger(path)
+    assert (reloaded.rollup.correct, reloaded.rollup.graded, reloaded.pending_count) == (1, 2, 1)
+    
+    # A result appended after the snapshot is replayed from the snapshot's offset
+    games[2].home_score, games[2].away_score = 30, 10
+    assert reloaded.record_result(games[2])
+    tail = PredictionLedger(path)
+    assert (tail.rollup.correct, tail.rollup.graded, tail.pending_count) == (2, 3, 0)
+    
+    # Without a snapshot, a full replay reaches the same totals
+    os.remove(ledger.snapshot_path)
+    replayed = PredictionLedger(path)
+    assert replayed.rollup.to_dict() == tail.rollup.to_dict()
+    
+    # Seasons before the graded watermark are closed
+    old = Game(home_team="KC", away_team="BUF", date=datetime(2024, 9, 15), week=2, season=2024)
+    replayed.record_prediction(old, GamePrediction("KC", 70.0, {'home': 24, 'away': 20}, [], ''))
+    assert replayed.pending_count == 0
+    print(f"✅ Reloaded {tail.rollup.graded} graded predictions from a snapshot and a full replay")
+    
+async def test_season_results():
+    """Test that ingested results are counted once, survive a restart and never mix seasons"""
+    print("\n🧮 Testing Season Results...")
+    
+    import os
+    import tempfile
+    from data.stats_aggregator import SeasonResults
+    
+    path = os.path.join(tempfile.mkdtemp(), 'ingested_games.jsonl')
+    game = Game(home_team="KC", away_team="BUF", date=datetime(2025, 9, 14), home_score=27, away_score=20,
+                week=2, season=2025)
+    results = SeasonResults(path)
+    assert results.ingest(game)
+    assert not results.ingest(game), "the same game must only count once"
+    
+    # A restart replays the log, so reconciling the game again is still a no-op
+    restarted = SeasonResults(path)
+    assert not restarted.ingest(game)
+    kc = restarted.get_team_stats("KC")
+    assert (kc.wins, kc.losses, kc.points_for) == (1, 0, 27), kc
+    
+    # Earlier seasons are ignored; a later one starts fresh totals
+    last_season = Game(home_team="KC", away_team="DEN", date=datetime(2024, 12, 1), home_score=10, away_score=3,
+                       week=13, season=2024)
+    assert not restarted.ingest(last_season)
+    assert restarted.get_team_stats("KC").wins == 1
+    next_season = Game(home_team="BUF", away_team="KC", date=datetime(2026, 9, 13), home_score=31, away_score=17,
+                       week=1, season=2026)
+    assert restarted.ingest(next_season)
+    kc = restarted.get_team_stats("KC")
+    assert (kc.wins, kc.losses, restarted.season) == (0, 1, 2026), kc
+    with open(path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    print(f"✅ Ingested each game once across a restart and kept {restarted.season} totals separate")
+    
+async def test_pipeline_matches_sequential():
+    """Test that the staged weekly pipeline produces the same predictions and prompts as one game at a time"""
+    print("\n🏭 Testing Prediction Pipeline...")
+    
+    import os
+    import tempfile
+    from data.prediction_ledger import PredictionLedger
+    from utils.scheduler import NFLScheduler
+    
+    games = [Game(home_team=home, away_team=away, date=datetime(2025, 9, 14), week=2, season=2025)
+             for home, away in (("KC", "BUF"), ("PHI", "DAL"), ("SF", "GB"), ("BAL", "PIT"))]
+    
+    async def source():
+        return games
+    
+    directory = tempfile.mkdtemp()
+    scheduler = NFLScheduler()
+    scheduler.prediction_ledger = PredictionLedger(os.path.join(directory, 'ledger.jsonl'))
+    scheduler.prompt_output = 'files'
+    cwd = os.getcwd()
+    os.chdir(directory)  # prompt files go to ./generated-prompts
+    try:
+        assert await scheduler._run_prediction_pipeline(source) == len(games)
+    finally:
+        os.chdir(cwd)
+    
+    agent = scheduler.prediction_agent
+    pending = scheduler.prediction_ledger._pending
+    for game in games:
+        expected = agent.generate_prediction(game)
+        recorded = pending[f"2025:R2:{game.away_team}@{game.home_team}"]
+        assert (recorded['predicted_winner'], recorded['confidence'], recorded['predicted_score']) == (
+            expected.predicted_winner, expected.confidence, expected.predicted_score), recorded
+        with open(os.path.join(directory, 'generated-prompts', scheduler._generate_prompt_filename(game)),
+                  encoding='utf-8') as f:
+            assert f.read() == generate_comprehensive_prompt(game)
+    print(f"✅ Pipeline matched per-game predictions and prompts for {len(games)} games")
+
 async def run_all_tests():
     """Run all tests"""
     print("🧪 NFL PREDICTION APP - PYTHON VERSION TESTS")
@@ -128,6 +620,17 @@ async def run_all_tests():
         await test_data_access()
         await test_prediction_agent()
         await test_prompt_generation()
+        await test_async_espn_client()
+        await test_llm_dispatcher()
+        await test_job_scheduler_idle()
+        await test_metrics()
+        await test_ttl_cache()
+        await test_compact_models()
+        await test_history_backends()
+        await test_prompt_archive_recovery()
+        await test_prediction_ledger()
+        await test_season_results()
+        await test_pipeline_matches_sequential()
         
         print("\n🎉 ALL TESTS COMPLETED SUCCESSFULLY!")
         print("✅ Python version is working correctly")
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from utils import metrics
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'stale_until', 'error')
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, error: Optional[Exception] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.error = error  # set on negative entries, which re-raise until they expire
+
+class _Fetch:
+    """A synchronous fetch in progress; other callers for the same key wait on it"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+
+class TTLCache:
+    """Size-bounded LRU cache with per-key TTLs and stale-while-revalidate.
+
+    A fresh entry is returned directly. An expired entry that is still
+    within `max_stale` seconds of expiring is returned immediately while a
+    background thread refetches it; a failed refresh keeps the stale value.
+    Anything older, or missing, is fetched synchronously, once per key:
+    concurrent callers for a key that is already being fetched wait for
+    that fetch instead of starting their own. Exceptions from the fetch
+    function propagate to every waiting caller; with `error_ttl` set, the
+    failure is also cached for that long so an unreachable upstream is not
+    retried on every lookup.
+    """
+
+    def __init__(self, max_entries: int = 128, default_ttl: float = 1800.0, max_stale: float = 86400.0,
+                 clock: Callable[[], float] = time.monotonic, name: str = 'ttl', error_ttl: float = 0.0):
+        self.name = name  # `cache` label on the cache_requests_total metric
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self.error_ttl = error_ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, _CacheEntry]' = OrderedDict()
+        self._refreshing: Dict[Hashable, threading.Thread] = {}
+        self._fetching: Dict[Hashable, _Fetch] = {}
+        self._lock = threading.Lock()
+        # Bumped by clear() and, per key, by invalidate() so in-flight fetches don't resurrect dropped keys
+        self._generation = 0
+        self._key_generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.error is None and entry.expires_at > self._clock()
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]):
+        expires_at = self._clock() + (self.default_ttl if ttl is None else ttl)
+        self._put(key, _CacheEntry(value, expires_at, expires_at + self.max_stale))
+
+    def _store_error(self, key: Hashable, error: Exception):
+        """Cache a failed fetch for error_ttl seconds, without stale serving (lock held)"""
+        expires_at = self._clock() + self.error_ttl
+        self._put(key, _CacheEntry(None, expires_at, expires_at, error))
+
+    def _put(self, key: Hashable, entry: _CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _token(self, key: Hashable) -> Tuple[int, int]:
+        """Generation a fetch must still match to store its result (lock held)"""
+        return self._generation, self._key_generations.get(key, 0)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a fresh value without fetching"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.error is not None or entry.expires_at <= self._clock():
+                return default
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Get a cached value, serving stale data while it is refreshed in the background"""
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self._clock()
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    metrics.count('cache_requests_total', cache=self.name, result='error')
+                    raise entry.error
+                self.hits += 1
+                metrics.count('cache_requests_total', cache=self.name, result='hit')
+                return entry.value
+            if entry is not None and entry.stale_until > now:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._start_refresh(key, fetch, ttl)
+                metrics.count('cache_requests_total', cache=self.name, result='stale')
+                return entry.value
+            self.misses += 1
+            pending = self._fetching.get(key)
+            if pending is None:
+                pending = self._fetching[key] = _Fetch()
+                token = self._token(key)
+            else:
+                token = None
+        metrics.count('cache_requests_total', cache=self.name, result='miss')
+
+        if token is None:
+            # Another caller is already fetching this key
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._fetching[key]
+                if token == self._token(key):
+                    if pending.error is None:
+                        self._store(key, pending.value, ttl)
+                    elif self.error_ttl > 0:
+                        self._store_error(key, pending.error)
+            pending.done.set()
+        return pending.value
+
+    def _start_refresh(self, key: Hashable, fetch: Callable[[], Any], ttl: Optional[float]):
+        """Refetch a key on a daemon thread unless a refresh is already running (lock held)"""
+        if key in self._refreshing:
+            return
+        token = self._token(key)
+
+        def refresh():
+            try:
+                value = fetch()
+            except Exception as e:
+                print(f"⚠️  Background refresh failed for {key!r}: {e}")
+                value = None
+                failed = True
+            else:
+                failed = False
+            with self._lock:
+                self._refreshing.pop(key, None)
+                if not failed and token == self._token(key):
+                    self._store(key, value, ttl)
+
+        thread = threading.Thread(target=refresh, name=f"cache-refresh-{key}", daemon=True)
+        self._refreshing[key] = thread
+        thread.start()
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None):
+        """Block until in-flight background refreshes finish"""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single key; fetches of it already in flight are discarded"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._key_generations[key] = self._key_generations.get(key, 0) + 1
+
+    def clear(self):
+        """Drop every entry; refreshes already in flight are discarded"""
+        with self._lock:
+            self._entries.clear()
+            self._key_generations.clear()
+            self._generation += 1
@@ -0,0 +1,127 @@
+import asyncio
+import inspect
+import signal
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Optional, Union
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+# Long waits are split so wall-clock changes (DST, NTP, suspend) are noticed within this many seconds
+MAX_SLEEP_SECONDS = 3600.0
+
+JobFunction = Callable[[], Union[Any, Awaitable[Any]]]
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: JobFunction
+    next_run: datetime
+    interval: Optional[timedelta] = None  # fixed-interval jobs
+    at: Optional[str] = None              # "HH:MM" for daily/weekly jobs
+    weekday: Optional[int] = None         # 0 = Monday for weekly jobs
+    run_count: int = 0
+
+    def schedule_next(self, now: datetime):
+        """Advance next_run past `now`"""
+        if self.interval is not None:
+            while self.next_run <= now:
+                self.next_run += self.interval
+        else:
+            self.next_run = _next_time_of_day(now, self.at, self.weekday)
+
+def _next_time_of_day(now: datetime, at: str, weekday: Optional[int] = None) -> datetime:
+    hour, minute = (int(part) for part in at.split(':'))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if weekday is not None:
+        candidate += timedelta(days=(weekday - now.weekday()) % 7)
+    if candidate <= now:
+        candidate += timedelta(days=7 if weekday is not None else 1)
+    return candidate
+
+class AsyncJobScheduler:
+    """Event-driven job scheduler for asyncio.
+
+    run() sleeps until the earliest due job (or until stop() is called)
+    instead of polling, so an idle scheduler uses no CPU. Coroutine jobs
+    are awaited on the loop; plain functions run in the default executor.
+    A failing job is reported and rescheduled.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now):
+        self.jobs: List[ScheduledJob] = []
+        self._clock = clock
+        self._stop: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def every_day(self, at: str, func: JobFunction, name: Optional[str] = None) -> ScheduledJob:
+        """Run a job daily at a local 'HH:MM' time"""
+        return self._add(ScheduledJob(name or func.__name__, func, _next_time_of_day(self._clock(), at), at=at))
+
+    def every_week(self, weekday: str, at: str, func: JobFunction, name: Optional[str] = None) -> ScheduledJob:
+        """Run a job weekly on a weekday ('tuesday') at a local 'HH:MM' time"""
+        day = WEEKDAYS.index(weekday.lower())
+        return self._add(ScheduledJob(name or func.__name__, func, _next_time_of_day(self._clock(), at, day),
+                                      at=at, weekday=day))
+
+    def every(self, seconds: float, func: JobFunction, name: Optional[str] = None) -> ScheduledJob:
+        """Run a job every `seconds`, starting one interval from now"""
+        interval = timedelta(seconds=seconds)
+        return self._add(ScheduledJob(name or func.__name__, func, self._clock() + interval, interval=interval))
+
+    def _add(self, job: ScheduledJob) -> ScheduledJob:
+        self.jobs.append(job)
+        if self._wakeup is not None:
+            self._wakeup.set()  # re-plan the current sleep around the new job
+        return job
+
+    def next_job(self) -> Optional[ScheduledJob]:
+        return min(self.jobs, key=lambda job: job.next_run, default=None)
+
+    def stop(self):
+        """Ask run() to return after any job in progress"""
+        if self._stop is not None:
+            self._stop.set()
+
+    def install_signal_handlers(self, signals=(signal.SIGINT, signal.SIGTERM)):
+        """Stop cleanly on SIGINT/SIGTERM (call from inside the running loop)"""
+        loop = asyncio.get_running_loop()
+        for sig in signals:
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops have no add_signal_handler
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self.stop))
+
+    async def _run_job(self, job: ScheduledJob):
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(None, job.func)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as e:
+            print(f"❌ Scheduled job '{job.name}' failed: {e}")
+        job.run_count += 1
+
+    async def run(self):
+        """Run due jobs until stop() is called"""
+        self._stop = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        while not self._stop.is_set():
+            job = self.next_job()
+            delay = MAX_SLEEP_SECONDS
+            if job is not None:
+                delay = min(delay, (job.next_run - self._clock()).total_seconds())
+
+            if delay > 0:
+                self._wakeup.clear()
+                stop_wait = asyncio.ensure_future(self._stop.wait())
+                wakeup_wait = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait({stop_wait, wakeup_wait}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                stop_wait.cancel()
+                wakeup_wait.cancel()
+                continue
+
+            await self._run_job(job)
+            job.schedule_next(self._clock())
@@ -0,0 +1,225 @@
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Set NFL_METRICS_FILE to record metrics and write them there on exit (.json, otherwise Prometheus text)
+METRICS_FILE = os.environ.get('NFL_METRICS_FILE')
+PREFIX = 'nfl_'
+# Latency buckets in seconds, from in-memory lookups up to slow HTTP calls
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+MetricKey = Tuple[str, Labels]
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'sum': self.sum, 'max': self.max,
+                'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)}}
+
+def _escape_label_value(value) -> str:
+    """Escape a label value for the Prometheus text format: backslash, double quote and newline"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(labels: Labels, extra: str = '') -> str:
+    parts = [f'{name}="{_escape_label_value(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+class MetricsRegistry:
+    """Thread-safe counters and latency histograms, keyed by name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[MetricKey, float] = {}
+        self.histograms: Dict[MetricKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: float, labels: Labels):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        """Counters, histograms and a per-span time breakdown, slowest total first"""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+            spans = [{'span': dict(labels)['span'], 'count': histogram.count, 'total': histogram.sum,
+                      'mean': histogram.sum / histogram.count, 'max': histogram.max}
+                     for (name, labels), histogram in self.histograms.items() if name == 'span_seconds']
+        spans.sort(key=lambda span: span['total'], reverse=True)
+        return {'counters': counters, 'histograms': histograms, 'spans': spans}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} counter")
+                    typed.add(name)
+                lines.append(f"{PREFIX}{name}{_label_text(labels)} {value:g}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    bucket_labels = _label_text(labels, 'le="%s"' % bound)
+                    lines.append(f"{PREFIX}{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {histogram.sum:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str):
+        """Write a snapshot as JSON (.json) or Prometheus text (any other extension)"""
+        content = (json.dumps(self.snapshot(), indent=2) if path.endswith('.json') else self.to_prometheus())
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+_registry = MetricsRegistry()
+_enabled = bool(METRICS_FILE)
+_export_path: Optional[str] = METRICS_FILE
+_current_span: contextvars.ContextVar = contextvars.ContextVar('nfl_span', default='')
+
+def get_metrics() -> MetricsRegistry:
+    """Shared registry the instrumented modules record into"""
+    return _registry
+
+def is_enabled() -> bool:
+    return _enabled
+
+def enable(export_path: Optional[str] = None):
+    """Start recording; with `export_path`, flush() and interpreter exit write the metrics there"""
+    global _enabled, _export_path
+    _enabled = True
+    if export_path:
+        _export_path = export_path
+
+def disable():
+    """Stop recording; instrumentation calls return immediately"""
+    global _enabled
+    _enabled = False
+
+def flush() -> Optional[str]:
+    """Write the metrics to the configured export path, if any"""
+    if not _enabled or not _export_path:
+        return None
+    try:
+        _registry.export(_export_path)
+    except OSError as e:
+        print(f"⚠️  Could not write metrics to {_export_path}: {e}")
+        return None
+    return _export_path
+
+atexit.register(flush)
+
+def count(name: str, value: float = 1, **labels: str):
+    """Increment a counter"""
+    if _enabled:
+        _registry.count(name, value, tuple(sorted(labels.items())))
+
+def observe(name: str, seconds: float, **labels: str):
+    """Record a latency sample"""
+    if _enabled:
+        _registry.observe(name, seconds, tuple(sorted(labels.items())))
+
+class _Span:
+    __slots__ = ('name', 'path', 'token', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> '_Span':
+        parent = _current_span.get()
+        self.path = f"{parent}/{self.name}" if parent else self.name
+        self.token = _current_span.set(self.path)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.start
+        _current_span.reset(self.token)
+        labels = (('span', self.path),)
+        _registry.observe('span_seconds', elapsed, labels)
+        if exc_type is not None:
+            _registry.count('span_errors_total', 1, labels)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str):
+    """Time a block as a span nested under the caller's current span.
+
+    Spans follow contextvars, so nesting holds across await points and
+    into pipeline threads; time is recorded under the full path, e.g.
+    "pipeline.context/team_stats".
+    """
+    return _Span(name) if _enabled else _NOOP_SPAN
+
+def timed(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording every call of a function as a span"""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple
+from utils import metrics
+
+_DONE = object()  # end-of-stream marker passed down the queues
+
+@dataclass
+class PipelineStage:
+    name: str
+    func: Callable[[Any], Any]  # item -> item; a coroutine function is awaited on the loop
+    concurrency: int = 1
+    in_thread: bool = False  # run a blocking function on the pipeline's thread pool
+
+@dataclass
+class StageTiming:
+    name: str
+    items: int = 0
+    failures: int = 0
+    busy: float = 0.0     # summed per-item time; exceeds wall time when items overlap
+    slowest: float = 0.0
+
+    def record(self, elapsed: float, failed: bool = False):
+        self.items += 1
+        self.failures += failed
+        self.busy += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+@dataclass
+class PipelineReport:
+    stages: List[StageTiming]
+    wall: float = 0.0
+    produced: int = 0  # items the source yielded
+    completed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """Per-stage timing table"""
+        lines = [f"⏱️  Pipeline: {self.completed} items in {self.wall:.2f}s"
+                 f"{f' ({len(self.errors)} failed)' if self.errors else ''}"]
+        for stage in self.stages:
+            average = stage.busy / stage.items if stage.items else 0.0
+            lines.append(f"   {stage.name:<10} {stage.items:>3} items  avg {average * 1000:>7.1f}ms  "
+                         f"max {stage.slowest * 1000:>7.1f}ms  busy {stage.busy:.2f}s")
+        return '\n'.join(lines)
+
+async def run_pipeline(source: Callable[[], Awaitable[Iterable[Any]]], stages: List[PipelineStage],
+                       queue_size: int = 4, source_name: str = 'source') -> Tuple[List[Any], PipelineReport]:
+    """Stream items from `source` through `stages` concurrently.
+
+    Stages are connected by queues holding at most `queue_size` items, so a
+    slow stage holds back the ones before it instead of letting work pile
+    up. Each stage runs `concurrency` workers. An item whose stage raises is
+    dropped and its error recorded. Returns the last stage's outputs in
+    completion order and a timing report.
+    """
+    loop = asyncio.get_running_loop()
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    source_timing = StageTiming(source_name)
+    report = PipelineReport([source_timing] + [StageTiming(stage.name) for stage in stages])
+    results: List[Any] = []
+    thread_count = sum(stage.concurrency for stage in stages if stage.in_thread)
+    executor = ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix='pipeline') if thread_count else None
+
+    async def feed():
+        start = time.perf_counter()
+        try:
+            items = list(await source())
+        except Exception as e:
+            source_timing.record(time.perf_counter() - start, failed=True)
+            report.errors.append(f"{source_name}: {e}")
+            items = []
+        else:
+            source_timing.record(time.perf_counter() - start)
+        report.produced = len(items)
+        for item in items:
+            await queues[0].put(item)
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(_DONE)
+
+    async def worker(index: int):
+        stage, timing = stages[index], report.stages[index + 1]
+        while True:
+            item = await queues[index].get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                with metrics.span(f"pipeline.{stage.name}"):
+                    if inspect.iscoroutinefunction(stage.func):
+                        output = await stage.func(item)
+                    elif stage.in_thread:
+                        # Copy the context so spans opened in the thread nest under this stage's span
+                        output = await loop.run_in_executor(executor, contextvars.copy_context().run, stage.func, item)
+                    else:
+                        output = stage.func(item)
+            except Exception as e:
+                timing.record(time.perf_counter() - start, failed=True)
+                report.errors.append(f"{stage.name}: {e}")
+                continue
+            timing.record(time.perf_counter() - start)
+            if index + 1 < len(stages):
+                await queues[index + 1].put(output)
+            else:
+                results.append(output)
+
+    async def run_stage(index: int):
+        await asyncio.gather(*(worker(index) for _ in range(stages[index].concurrency)))
+        if index + 1 < len(stages):
+            for _ in range(stages[index + 1].concurrency):
+                await queues[index + 1].put(_DONE)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(feed(), *(run_stage(index) for index in range(len(stages))))
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+    report.wall = time.perf_counter() - start
+    report.completed = len(results)
+    return results, report
@@ -0,0 +1,239 @@
+import cProfile
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PROFILE_DIR = os.environ.get('NFL_PROFILE_DIR', 'profiles')
+PROFILE_MODES = ('deterministic', 'sample')
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROJECT_PACKAGES = ('agents', 'data', 'models', 'prompts', 'utils', 'app')
+TOP_FUNCTIONS = 15
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STDLIB = os.path.normcase(sysconfig.get_paths()['stdlib'])
+# Leaf frames that mean a thread is blocked waiting (event loop select, idle pool workers, locks)
+_IDLE_LEAVES = {('selectors', 'select'), ('threading', 'wait'), ('queue', 'get'),
+                ('concurrent.futures.thread', '_worker'), ('threading', '_wait_for_tstate_lock')}
+
+@lru_cache(maxsize=None)
+def classify(filename: str) -> Tuple[str, str]:
+    """Dotted module name for a code object's file, and its report group.
+
+    The group is the project package ('agents', 'data', ...), 'stdlib' or
+    'third-party'.
+    """
+    if filename.startswith('<') or filename == '~':
+        return ('<built-in>' if filename == '~' else filename), 'stdlib'  # cProfile built-ins, <frozen ...>
+    path = os.path.normcase(os.path.abspath(filename))
+    group = 'third-party'
+    if 'site-packages' in path:
+        path = path.split('site-packages', 1)[1].lstrip(os.sep)
+    elif path.startswith(_STDLIB):
+        path, group = os.path.relpath(path, _STDLIB), 'stdlib'
+    elif path.startswith(os.path.normcase(REPO_ROOT)):
+        path = os.path.relpath(path, os.path.normcase(REPO_ROOT))
+    else:
+        path = os.path.basename(path)
+    module = (path[:-3] if path.endswith('.py') else path).replace(os.sep, '.')
+    if module.endswith('.__init__'):
+        module = module[:-9]
+    if module.split('.', 1)[0] in PROJECT_PACKAGES:
+        group = module.split('.', 1)[0]
+    return module, group
+
+@dataclass
+class FunctionStat:
+    module: str
+    function: str
+    group: str
+    calls: int = 0
+    self_time: float = 0.0   # seconds (deterministic) or samples (sampling)
+    total_time: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.module}:{self.function}"
+
+class StackSampler:
+    """Samples every thread's Python stack on a background thread.
+
+    Works the same for synchronous code, coroutines (the running task's
+    await chain is on the loop thread's stack) and executor threads.
+    Samples are kept as collapsed stacks: "thread;outer;...;leaf" -> count.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, Tuple[str, str, str]] = {}  # code object -> (module, function, group)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _label(self, code) -> Tuple[str, str, str]:
+        label = self._labels.get(code)
+        if label is None:
+            module, group = classify(code.co_filename)
+            label = self._labels[code] = (module, code.co_name, group)
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                frames.reverse()
+                self.stacks[(names.get(ident, f'thread-{ident}'),) + tuple(frames)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> List[str]:
+        """Lines in the folded format read by flamegraph.pl, speedscope and inferno"""
+        return [f"{';'.join([stack[0]] + [f'{module}:{function}' for module, function, _ in stack[1:]])} {count}"
+                for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+
+    def function_stats(self) -> Tuple[List[FunctionStat], int]:
+        """Per-function sample counts from non-idle samples, and the idle sample count"""
+        stats: Dict[Tuple[str, str, str], FunctionStat] = {}
+        idle = 0
+        for stack, count in self.stacks.items():
+            frames = stack[1:]
+            if not frames or frames[-1][:2] in _IDLE_LEAVES:
+                idle += count
+                continue
+            for position, key in enumerate(frames):
+                stat = stats.get(key)
+                if stat is None:
+                    stat = stats[key] = FunctionStat(*key)
+                if key not in frames[position + 1:]:  # count recursive frames once
+                    stat.total_time += count
+            stats[frames[-1]].self_time += count
+            stats[frames[-1]].calls += count
+        return list(stats.values()), idle
+
+def _cprofile_stats(profile: cProfile.Profile) -> List[FunctionStat]:
+    stats = pstats.Stats(profile)
+    functions = []
+    for (filename, _, function), (_, calls, self_time, total_time, _) in stats.stats.items():
+        module, group = classify(filename)
+        functions.append(FunctionStat(module, function, group, calls, self_time, total_time))
+    return functions
+
+@dataclass
+class ProfileSession:
+    label: str
+    mode: str
+    started_at: datetime = field(default_factory=datetime.now)
+    wall: float = 0.0
+    report_path: str = ''
+    collapsed_path: str = ''
+    pstats_path: str = ''
+
+def format_report(session: ProfileSession, functions: List[FunctionStat], unit: str, idle: int = 0) -> str:
+    """Per-package totals, then the hottest functions overall and within each project package"""
+    def amount(value: float) -> str:
+        return f"{value:>9.4f}s" if unit == 's' else f"{int(value):>8} samples"
+
+    lines = [f"PROFILE: {session.label} ({session.mode}, {session.wall:.2f}s wall)",
+             f"Started: {session.started_at.isoformat(timespec='seconds')}", '']
+    if idle:
+        lines += [f"Idle/waiting samples excluded: {idle}", '']
+
+    by_package: Dict[str, float] = defaultdict(float)
+    for stat in functions:
+        by_package[stat.group] += stat.self_time
+    grand_total = sum(by_package.values()) or 1
+    lines.append("SELF TIME BY PACKAGE")
+    for package, value in sorted(by_package.items(), key=lambda item: -item[1]):
+        lines.append(f"  {package:<14} {amount(value)}  {value / grand_total:6.1%}")
+
+    def table(title: str, rows: List[FunctionStat]):
+        lines.extend(['', title, f"  {'calls':>9} {'self':>17} {'total':>17}  function"])
+        for stat in rows:
+            calls = f"{stat.calls:>9}" if unit == 's' else f"{'':>9}"
+            lines.append(f"  {calls} {amount(stat.self_time):>17} {amount(stat.total_time):>17}  {stat.label}")
+
+    table(f"TOP {TOP_FUNCTIONS} BY TOTAL TIME",
+          sorted(functions, key=lambda stat: -stat.total_time)[:TOP_FUNCTIONS])
+    for package in PROJECT_PACKAGES:
+        rows = [stat for stat in functions if stat.group == package]
+        if rows:
+            table(f"{package.upper()} ({len(rows)} functions, by self time)",
+                  sorted(rows, key=lambda stat: -stat.self_time)[:TOP_FUNCTIONS])
+    return '\n'.join(lines) + '\n'
+
+@contextmanager
+def profile_command(label: str, mode: str = 'deterministic', directory: str = PROFILE_DIR,
+                    interval: float = SAMPLE_INTERVAL) -> Iterator[ProfileSession]:
+    """Profile the enclosed block and write a report, collapsed stacks and (deterministic) a .pstats dump.
+
+    'deterministic' traces every call on the calling thread with cProfile,
+    which is where asyncio.run drives the event loop and its coroutines.
+    Both modes also sample every thread's stack, so thread-pool work and
+    the flamegraph input are covered either way; 'sample' uses only the
+    sampler and has far lower overhead.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}; use one of {PROFILE_MODES}")
+    session = ProfileSession(label, mode)
+    sampler = StackSampler(interval)
+    profile = cProfile.Profile() if mode == 'deterministic' else None
+
+    start = time.perf_counter()
+    sampler.start()
+    if profile:
+        profile.enable()
+    try:
+        yield session
+    finally:
+        if profile:
+            profile.disable()
+        sampler.stop()
+        session.wall = time.perf_counter() - start
+
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', label).strip('-') or 'interactive'
+        base = os.path.join(directory, f"{session.started_at.strftime('%Y%m%d-%H%M%S')}-{slug}")
+        if profile:
+            report = format_report(session, _cprofile_stats(profile), 's')
+            session.pstats_path = f"{base}.pstats"
+            profile.dump_stats(session.pstats_path)
+        else:
+            functions, idle = sampler.function_stats()
+            report = format_report(session, functions, 'samples', idle)
+        session.report_path = f"{base}.txt"
+        with open(session.report_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        session.collapsed_path = f"{base}.collapsed"
+        with open(session.collapsed_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sampler.collapsed()) + '\n')
+
+        print(f"\n🔬 Profiled {label} in {session.wall:.2f}s ({mode}, {sampler.samples} stack samples)")
+        print(f"   📄 Report: {session.report_path}")
+        print(f"   🔥 Collapsed stacks: {session.collapsed_path}")
+        if session.pstats_path:
+            print(f"   📊 pstats: {session.pstats_path}")
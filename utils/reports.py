@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+# Console reports that need no scheduler, so cheap CLI commands can print them without the prediction stack.
+# The ledger module (and the models behind it) is only loaded by the accuracy report.
+if TYPE_CHECKING:
+    from data.prediction_ledger import PredictionLedger
+
+def print_prediction_accuracy(ledger: 'PredictionLedger'):
+    """Show prediction accuracy statistics"""
+    from data.prediction_ledger import CONFIDENCE_BANDS
+    rollup = ledger.rollup
+
+    def rate(correct: int, graded: int) -> str:
+        return f"{correct / graded * 100:.1f}% ({correct}/{graded})" if graded else "n/a (0 games)"
+
+    print("\n📊 PREDICTION ACCURACY STATISTICS")
+    print("==================================")
+    if not rollup.graded and not rollup.pushes:
+        print(f"📭 No graded predictions yet ({ledger.pending_count} awaiting final scores)")
+        return
+    print(f"🎯 Overall Accuracy: {rate(rollup.correct, rollup.graded)}")
+    print(f"🏠 Home Team Predictions: {rate(*rollup.home_picks)}")
+    print(f"✈️  Away Team Predictions: {rate(*rollup.away_picks)}")
+    print(f"📈 Average Confidence: {rollup.average_confidence:.1f}%")
+    for label, _, _ in CONFIDENCE_BANDS:
+        print(f"🎲 Confidence {label}: {rate(*rollup.bands[label])}")
+    if rollup.pushes:
+        print(f"🤝 Ties (not graded): {rollup.pushes}")
+    print("\n📅 Recent Form:")
+    for n in (10, 5):
+        correct, graded = rollup.last(n)
+        if graded:
+            print(f"   Last {n} Predictions: {correct}-{graded - correct} ({correct / graded * 100:.0f}%)")
+    print(f"⏳ Awaiting final scores: {ledger.pending_count}")
+
+def print_live_scores():
+    """Show live scores (mock implementation)"""
+    print("\n📺 LIVE NFL SCORES")
+    print("==================")
+    print("🔴 LIVE: KC 21 - BUF 14 (Q3 8:45)")
+    print("🔴 LIVE: SF 10 - LAR 7 (Q2 2:30)")
+    print("✅ FINAL: BAL 28 - PIT 21")
+    print("✅ FINAL: DAL 31 - NYG 17")
+    print("⏰ UPCOMING: GB @ CHI (8:20 PM ET)")
+
+def print_api_status():
+    """Check API status"""
+    print("\n🌐 API STATUS CHECK")
+    print("===================")
+    print("🟢 NFL Schedule API: OPERATIONAL")
+    print("🟢 NFL Stats API: OPERATIONAL")
+    print("🟡 Weather API: LIMITED (Rate limited)")
+    print("🔴 OpenAI API: NOT CONFIGURED")
+    print("🟢 Internal Systems: ALL SYSTEMS GO")
+    print(f"⏰ Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
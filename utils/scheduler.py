@@ -1,47 +1,68 @@
-import schedule
-import time
 import asyncio
+from dataclasses import dataclass
+from functools import partial
 from datetime import datetime, timedelta
-from typing import List, Optional
-import requests
-from models.game import Game, WeatherConditions
+from typing import Awaitable, Callable, List, Optional
+from models.game import Game, GamePrediction, WeatherConditions
 from agents.prediction_agent import PredictionAgent
-from data.nfl_data import TEAMS
-from prompts.prompt_generator import generate_comprehensive_prompt
+from data.nfl_data import TEAMS, ingest_completed_game, live_data_enabled
+from data.http_cache import get_http_cache
+from data.prediction_ledger import get_prediction_ledger
+from data.schedule_repository import ScheduleRepository
+from prompts.prompt_archive import PROMPT_OUTPUT, get_prompt_archive
+from prompts.prompt_generator import generate_comprehensive_prompt, build_matchup_context, MatchupContext
+from utils.job_scheduler import AsyncJobScheduler
+from utils.pipeline import PipelineStage, run_pipeline
+from utils import metrics
+from utils.reports import print_prediction_accuracy, print_live_scores, print_api_status
 import os
 
+CONTEXT_STAGE_CONCURRENCY = 16  # a full week of games resolves live data at once
+PIPELINE_QUEUE_SIZE = 4
+
+@dataclass
+class _GameRun:
+    """One game's state as it moves through the prediction pipeline"""
+    game: Game
+    context: MatchupContext
+    prediction: Optional[GamePrediction] = None
+    prompt: str = ''
+    ai_response: Optional[str] = None
+
 class NFLScheduler:
     """Scheduler for automated NFL predictions"""
     
     def __init__(self):
         self.prediction_agent = PredictionAgent()
+        self.prediction_ledger = get_prediction_ledger()
+        self.schedule_repository = ScheduleRepository(self._load_espn_week)
+        self.prompt_output = PROMPT_OUTPUT
         self.current_week = 1
         self.current_season = 2025
         print("NFL Scheduler initialized")
 
-    def schedule_predictions(self):
+    def schedule_predictions(self, job_scheduler: Optional[AsyncJobScheduler] = None) -> AsyncJobScheduler:
         """Schedule automated predictions"""
+        job_scheduler = job_scheduler or AsyncJobScheduler()
+        
         # Schedule predictions for Tuesday at 10:00 AM ET
-        schedule.every().tuesday.at("10:00").do(self._run_weekly_predictions_job)
+        job_scheduler.every_week('tuesday', "10:00", self.run_weekly_predictions, 'weekly predictions')
         
         # Schedule daily checks for updated schedules
-        schedule.every().day.at("08:00").do(self._check_schedule_updates)
+        job_scheduler.every_day("08:00", self._check_schedule_updates, 'schedule updates')
         
         print("📅 Scheduled automated predictions:")
         print("   - Weekly predictions: Every Tuesday at 10:00 AM ET")
         print("   - Schedule updates: Daily at 8:00 AM ET")
-        
-        # Keep running
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        return job_scheduler
 
-    def _run_weekly_predictions_job(self):
-        """Job wrapper for weekly predictions"""
-        try:
-            asyncio.run(self.run_weekly_predictions())
-        except Exception as e:
-            print(f"Error running weekly predictions: {e}")
+    async def run_automated(self, job_scheduler: Optional[AsyncJobScheduler] = None):
+        """Run scheduled predictions until SIGINT/SIGTERM, sleeping between jobs"""
+        job_scheduler = self.schedule_predictions(job_scheduler)
+        job_scheduler.install_signal_handlers()
+        next_job = job_scheduler.next_job()
+        print(f"⏰ Next job: {next_job.name} at {next_job.next_run.strftime('%Y-%m-%d %H:%M')}")
+        await job_scheduler.run()
 
     def _check_schedule_updates(self):
         """Check for schedule updates"""
@@ -52,13 +73,7 @@ class NFLScheduler:
         """Run predictions for the current week"""
         print(f"\n🎯 Running predictions for Week {self.current_week}...")
         
-        games = self._generate_sample_weekly_schedule(self.current_week)
-        
-        for game in games:
-            try:
-                await self._predict_and_save_game(game)
-            except Exception as e:
-                print(f"Error predicting game {game.get_matchup()}: {e}")
+        await self._run_prediction_pipeline(self._sample_schedule_source(self.current_week), sample=True)
         
         print(f"✅ Completed predictions for Week {self.current_week}")
         self._advance_week()
@@ -67,20 +82,16 @@ class NFLScheduler:
         """Run predictions using real NFL schedule"""
         print(f"\n🎯 Running real predictions for Week {self.current_week}...")
         
-        # In a real implementation, this would fetch from NFL API
-        games = await self._fetch_real_nfl_schedule(self.current_week, self.current_season)
+        if self.current_week > 1:
+            await self.reconcile_results(self.current_week - 1, self.current_season)
+        
+        fetched = await self._run_prediction_pipeline(self._real_schedule_source(self.current_week, self.current_season))
         
-        if not games:
+        if not fetched:
             print("📅 No games found, falling back to sample schedule")
             await self.run_weekly_predictions()
             return
         
-        for game in games:
-            try:
-                await self._predict_and_save_game(game)
-            except Exception as e:
-                print(f"Error predicting game {game.get_matchup()}: {e}")
-        
         print(f"✅ Completed real predictions for Week {self.current_week}")
         self._advance_week()
 
@@ -88,13 +99,7 @@ class NFLScheduler:
         """Predict games for a specific week"""
         print(f"\n🎯 Running predictions for Week {week}...")
         
-        games = self._generate_sample_weekly_schedule(week)
-        
-        for game in games:
-            try:
-                await self._predict_and_save_game(game)
-            except Exception as e:
-                print(f"Error predicting game {game.get_matchup()}: {e}")
+        await self._run_prediction_pipeline(self._sample_schedule_source(week), sample=True)
         
         print(f"✅ Completed predictions for Week {week}")
 
@@ -102,21 +107,25 @@ class NFLScheduler:
         """Predict games for a specific week using real schedule"""
         print(f"\n🎯 Running real predictions for Week {week}...")
         
-        games = await self._fetch_real_nfl_schedule(week, self.current_season)
+        fetched = await self._run_prediction_pipeline(self._real_schedule_source(week, self.current_season))
         
-        if not games:
+        if not fetched:
             print("📅 No real games found, falling back to sample schedule")
             await self.predict_specific_week(week)
             return
         
-        for game in games:
-            try:
-                await self._predict_and_save_game(game)
-            except Exception as e:
-                print(f"Error predicting game {game.get_matchup()}: {e}")
-        
         print(f"✅ Completed real predictions for Week {week}")
 
+    def _sample_schedule_source(self, week: int) -> Callable[[], Awaitable[List[Game]]]:
+        async def source() -> List[Game]:
+            return self._generate_sample_weekly_schedule(week)
+        return source
+
+    def _real_schedule_source(self, week: int, season: int) -> Callable[[], Awaitable[List[Game]]]:
+        async def source() -> List[Game]:
+            return await self._fetch_real_nfl_schedule(week, season)
+        return source
+
     async def has_real_games_this_week(self) -> bool:
         """Check if real games are available for current week"""
         games = await self._fetch_real_nfl_schedule(self.current_week, self.current_season)
@@ -127,29 +136,113 @@ class NFLScheduler:
         games = await self._fetch_real_nfl_schedule(week, season)
         return len(games) > 0
 
-    async def _predict_and_save_game(self, game: Game):
-        """Predict a single game and save the prompt"""
-        print(f"🤖 Generating prediction for {game.get_matchup()}...")
-        
-        # Generate comprehensive prompt
-        prompt = generate_comprehensive_prompt(game)
-        
-        # Save prompt to file
-        filename = self._generate_prompt_filename(game)
-        filepath = os.path.join("generated-prompts", filename)
-        
-        os.makedirs("generated-prompts", exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(prompt)
-        
-        print(f"📝 Saved prompt: {filename}")
+    async def _run_prediction_pipeline(self, source: Callable[[], Awaitable[List[Game]]], sample: bool = False) -> int:
+        """Fetch, build context, predict, render and save a week's games as a staged pipeline.
+
+        Games stream through the stages concurrently, so a week takes about
+        as long as its slowest game rather than the sum. Returns the number
+        of games the source produced. Games from the made-up `sample`
+        schedule share matchup keys with real games, so they are not
+        recorded in the prediction ledger.
+        """
+        stages = [
+            # Context building can hit ESPN when live data is on, so it runs on threads
+            PipelineStage('context', self._build_context_stage, concurrency=CONTEXT_STAGE_CONCURRENCY, in_thread=True),
+            PipelineStage('predict', self._predict_stage),
+            PipelineStage('prompt', self._render_prompt_stage),
+        ]
+        dispatcher = self.prediction_agent.llm_dispatcher
+        if dispatcher:
+            stages.append(PipelineStage('llm', self._llm_stage, concurrency=dispatcher.max_concurrency))
+        stages.append(PipelineStage('persist', partial(self._persist_stage, record=not sample),
+                                    concurrency=2, in_thread=True))
         
+        with metrics.span('weekly_run'):
+            if live_data_enabled():
+                await self._refresh_live_data()
+            _, report = await run_pipeline(source, stages, queue_size=PIPELINE_QUEUE_SIZE, source_name='schedule')
+            if self.prompt_output == 'archive':
+                get_prompt_archive().flush()
+            self.prediction_ledger.flush()
+        metrics.count('games_predicted_total', report.completed)
+        exported = metrics.flush()
+        if exported:
+            print(f"📈 Metrics written to {exported}")
+        for error in report.errors:
+            print(f"Error predicting game: {error}")
+        if report.produced:
+            print(report.summary())
+        return report.produced
+
+    async def _refresh_live_data(self):
+        """Prefetch every team's recent form and key players in parallel before contexts are built"""
+        from data.espn_client import refresh_league_live_data
+        await refresh_league_live_data()
+
+    def _build_context_stage(self, game: Game) -> '_GameRun':
+        print(f"🤖 Generating prediction for {game.get_matchup()}...")
+        try:
+            # Resolve stats and history once for both the prompt and the prediction
+            return _GameRun(game, build_matchup_context(game))
+        except Exception as e:
+            raise RuntimeError(f"{game.get_matchup()}: {e}") from e
+
+    def _predict_stage(self, run: '_GameRun') -> '_GameRun':
         # Generate prediction using local algorithm
-        prediction = self.prediction_agent.generate_prediction(game)
+        run.prediction = self.prediction_agent.generate_prediction(run.game, run.context)
+        return run
+
+    def _render_prompt_stage(self, run: '_GameRun') -> '_GameRun':
+        run.prompt = generate_comprehensive_prompt(run.game, run.context)
+        return run
+
+    async def _llm_stage(self, run: '_GameRun') -> '_GameRun':
+        result = await self.prediction_agent.llm_dispatcher.complete(run.prompt, run.game.get_matchup())
+        if not result.ok:
+            print(f"Error getting AI prediction for {run.game.get_matchup()}: {result.error}")
+        run.ai_response = result.content
+        return run
+
+    def _persist_stage(self, run: '_GameRun', record: bool = True) -> '_GameRun':
+        game, prediction = run.game, run.prediction
+        if self.prompt_output == 'archive':
+            get_prompt_archive().append(game, run.prompt, response=run.ai_response)
+            saved = f"{get_prompt_archive().path} ({game.away_team}@{game.home_team})"
+        else:
+            saved = filename = self._generate_prompt_filename(game)
+            os.makedirs("generated-prompts", exist_ok=True)
+            with metrics.span('write_prompt_file'):
+                with open(os.path.join("generated-prompts", filename), 'w', encoding='utf-8') as f:
+                    f.write(run.prompt)
+                if run.ai_response:
+                    with open(os.path.join("generated-prompts", filename[:-4] + "_ai.txt"), 'w', encoding='utf-8') as f:
+                        f.write(run.ai_response)
+            if metrics.is_enabled():
+                written = len(run.prompt.encode('utf-8')) + len((run.ai_response or '').encode('utf-8'))
+                metrics.count('bytes_written_total', written, file='prompt')
         
-        print(f"   🏆 Prediction: {prediction.predicted_winner} wins {prediction.predicted_score['home']}-{prediction.predicted_score['away']}")
-        print(f"   📊 Confidence: {prediction.confidence:.1f}%")
+        # Finished games grade the pick made before kickoff instead of adding a hindsight one
+        if game.is_completed():
+            self.prediction_ledger.record_result(game)
+            ingest_completed_game(game)
+        elif record:
+            self.prediction_ledger.record_prediction(game, prediction)
+        
+        print(f"📝 Saved prompt: {saved}\n"
+              f"   🏆 Prediction: {prediction.predicted_winner} wins {prediction.predicted_score['home']}-{prediction.predicted_score['away']}\n"
+              f"   📊 Confidence: {prediction.confidence:.1f}%")
+        return run
+
+    async def reconcile_results(self, week: int, season: int) -> int:
+        """Grade ledger predictions against a week's final scores and apply them to team stats"""
+        games = await self._fetch_real_nfl_schedule(week, season)
+        graded = self.prediction_ledger.reconcile(games)
+        if graded:
+            print(f"📒 Graded {graded} predictions from Week {week}")
+        applied = sum(1 for game in games if game.is_completed() and ingest_completed_game(game))
+        if applied:
+            print(f"📊 Applied {applied} results from Week {week} to team stats")
+        return graded
 
     def _generate_prompt_filename(self, game: Game) -> str:
         """Generate filename for saved prompt"""
@@ -191,21 +284,26 @@ class NFLScheduler:
         return games
 
     async def _fetch_real_nfl_schedule(self, week: int, season: int) -> List[Game]:
-        """Fetch real NFL schedule from ESPN API"""
+        """Fetch real NFL schedule, served from the schedule cache when possible"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.schedule_repository.get_week, season, week)
+
+    def _load_espn_week(self, season: int, seasontype: int, week: int) -> List[Game]:
+        """Fetch and parse one week of the ESPN scoreboard"""
         try:
             # ESPN API for NFL games
             url = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
             params = {
                 'dates': f'{season}',
-                'seasontype': 2,  # Regular season
+                'seasontype': seasontype,
                 'week': week
             }
             
             print(f"🌐 Fetching NFL schedule from ESPN API for Week {week}, {season}...")
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_cache().get_json(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = response.data
                 games = self._parse_espn_api_response(data, week, season)
                 if games:
                     print(f"✅ Found {len(games)} real NFL games")
@@ -328,40 +426,17 @@ class NFLScheduler:
 
     def show_prediction_accuracy(self):
         """Show prediction accuracy statistics"""
-        print("\n📊 PREDICTION ACCURACY STATISTICS")
-        print("==================================")
-        print("🎯 Overall Accuracy: 67.3% (37/55 games)")
-        print("🏠 Home Team Predictions: 71.2% (19/27)")
-        print("✈️  Away Team Predictions: 62.5% (18/28)")
-        print("📈 Average Confidence: 74.8%")
-        print("🎲 High Confidence (>80%): 82.1% (23/28)")
-        print("🎲 Low Confidence (<60%): 45.5% (5/11)")
-        print("\n📅 Recent Form:")
-        print("   Last 10 Predictions: 7-3 (70%)")
-        print("   Last 5 Predictions: 4-1 (80%)")
+        print_prediction_accuracy(self.prediction_ledger)
 
     def show_live_scores(self):
         """Show live scores (mock implementation)"""
-        print("\n📺 LIVE NFL SCORES")
-        print("==================")
-        print("🔴 LIVE: KC 21 - BUF 14 (Q3 8:45)")
-        print("🔴 LIVE: SF 10 - LAR 7 (Q2 2:30)")
-        print("✅ FINAL: BAL 28 - PIT 21")
-        print("✅ FINAL: DAL 31 - NYG 17")
-        print("⏰ UPCOMING: GB @ CHI (8:20 PM ET)")
+        print_live_scores()
 
     def check_api_status(self):
         """Check API status"""
-        print("\n🌐 API STATUS CHECK")
-        print("===================")
-        print("🟢 NFL Schedule API: OPERATIONAL")
-        print("🟢 NFL Stats API: OPERATIONAL")
-        print("🟡 Weather API: LIMITED (Rate limited)")
-        print("🔴 OpenAI API: NOT CONFIGURED")
-        print("🟢 Internal Systems: ALL SYSTEMS GO")
-        print(f"⏰ Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print_api_status()
 
 def run_scheduler():
     """Run the NFL scheduler"""
     scheduler = NFLScheduler()
-    scheduler.schedule_predictions()
+    asyncio.run(scheduler.run_automated())